@@ -0,0 +1,82 @@
+"""
+Microbenchmark dos metadados dos campos dos models.
+
+Compara o acesso aos campos pelos metadados calculados uma única vez por classe (MetadadosCampos) com a inspeção do
+mapper do SQLAlchemy a cada chamada, como era feito antes.
+
+Uso:
+    python -m src.benchmarks.campos_model [repeticoes]
+"""
+import sys
+from datetime import datetime
+from timeit import timeit
+
+from sqlalchemy import inspect
+
+from src.database.models.sensor import LeituraSensor
+
+
+def _get_field_inspecionando(cls, field_name: str):
+    for column in inspect(cls).c:
+        if column.name == field_name:
+            return column
+
+    raise ValueError(field_name)
+
+
+def _display_name_inspecionando(cls, field_name: str) -> str:
+    field = _get_field_inspecionando(cls, field_name)
+    return field.info.get('label', field.name).title() if field.info else field.name.title()
+
+
+def _to_dict_inspecionando(instancia) -> dict:
+    return {column.key: getattr(instancia, column.key) for column in inspect(instancia).mapper.column_attrs}
+
+
+def executar(repeticoes: int = 100000) -> list[tuple[str, float, float]]:
+    """
+    Executa os casos do benchmark.
+    :param repeticoes: Quantidade de chamadas de cada caso.
+    :return: Lista de (caso, segundos inspecionando, segundos com metadados).
+    """
+    leitura = LeituraSensor(id=1, sensor_id=1, data_leitura=datetime(2025, 1, 1), valor=1.0)
+
+    # a primeira chamada calcula os metadados, que não entram na medição
+    LeituraSensor.metadados_campos()
+
+    casos = [
+        (
+            "fields()",
+            lambda: [column for column in inspect(LeituraSensor).c],
+            LeituraSensor.fields,
+        ),
+        (
+            "get_field('valor')",
+            lambda: _get_field_inspecionando(LeituraSensor, 'valor'),
+            lambda: LeituraSensor.get_field('valor'),
+        ),
+        (
+            "get_field_display_name('valor')",
+            lambda: _display_name_inspecionando(LeituraSensor, 'valor'),
+            lambda: LeituraSensor.get_field_display_name('valor'),
+        ),
+        (
+            "to_dict()",
+            lambda: _to_dict_inspecionando(leitura),
+            leitura.to_dict,
+        ),
+    ]
+
+    return [
+        (nome, timeit(antes, number=repeticoes), timeit(depois, number=repeticoes))
+        for nome, antes, depois in casos
+    ]
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print(f"{'caso':<34}{'inspect (µs)':>14}{'metadados (µs)':>16}{'ganho':>8}")
+
+    for nome, antes, depois in executar(repeticoes):
+        print(f"{nome:<34}{antes / repeticoes * 1e6:>14.2f}{depois / repeticoes * 1e6:>16.2f}{antes / depois:>7.1f}x")
@@ -0,0 +1,336 @@
+"""
+Teste de carga da API de ingestão (api_basica.py), simulando uma frota de ESP32.
+
+Cada dispositivo simulado segue o protocolo do sketch (src/wokwi/src/sketch.cpp): uma chamada a /init com o chip ID
+e, em seguida, um POST em /leitura a cada intervalo, com lux, temperatura, vibração média e acelerômetro.
+
+Os envios seguem uma agenda fixa (início + k * intervalo) e a latência é medida a partir do horário agendado. Assim,
+quando a API fica lenta e os envios atrasam, o atraso entra na latência em vez de reduzir a carga sem aparecer nas
+medições.
+
+Uso:
+    python -m src.benchmarks.carga_ingestao --dispositivos 500 --intervalo 5 --duracao 60
+    python -m src.benchmarks.carga_ingestao --servidor-local /tmp/carga.db --salvar-baseline baseline.json
+    python -m src.benchmarks.carga_ingestao --servidor-local /tmp/carga.db --comparar baseline.json
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import httpx
+import numpy as np
+
+# métricas comparadas com a baseline: (nome, True se maior é melhor)
+METRICAS_BASELINE = [
+    ('requisicoes_por_segundo', True),
+    ('p50_ms', False),
+    ('p95_ms', False),
+    ('p99_ms', False),
+    ('taxa_erros', False),
+]
+
+
+@dataclass
+class MedicoesEndpoint:
+    """
+    Medições das requisições de um endpoint.
+
+    Args:
+        latencias (list[float]): Latência de cada requisição concluída, em segundos.
+        status (Counter): Quantidade de respostas por status HTTP. Falhas de conexão e timeouts são contados pelo
+            nome da exceção.
+    """
+    latencias: list[float] = field(default_factory=list)
+    status: Counter = field(default_factory=Counter)
+
+    def registrar(self, latencia: float, status: int | str):
+        self.latencias.append(latencia)
+        self.status[status] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.status.values())
+
+    @property
+    def erros(self) -> int:
+        return sum(quantidade for status, quantidade in self.status.items() if not (isinstance(status, int) and 200 <= status < 300))
+
+    def resumo(self, segundos: float) -> dict:
+        """
+        :param segundos: Duração da medição, usada no cálculo da vazão.
+        :return: Vazão, percentis de latência e taxa de erros.
+        """
+        latencias = np.array(self.latencias) * 1000 if self.latencias else np.zeros(1)
+        p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+
+        return {
+            'requisicoes': self.total,
+            'requisicoes_por_segundo': (self.total - self.erros) / segundos if segundos else 0.0,
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(latencias.max()),
+            'taxa_erros': self.erros / self.total if self.total else 0.0,
+            'status': {str(status): quantidade for status, quantidade in sorted(self.status.items(), key=str)},
+        }
+
+
+@dataclass
+class ConfiguracaoCarga:
+    """
+    Args:
+        url (str): URL base da API.
+        dispositivos (int): Quantidade de ESP32 simulados.
+        intervalo (float): Segundos entre as leituras de um dispositivo (o sketch usa 5).
+        duracao (float): Segundos de envio de leituras, após o /init de todos os dispositivos.
+        max_conexoes (int): Conexões HTTP simultâneas com a API.
+        timeout (float): Timeout de cada requisição, em segundos.
+        seed (int): Seed dos chip IDs e dos valores das leituras.
+    """
+    url: str = "http://127.0.0.1:8180"
+    dispositivos: int = 100
+    intervalo: float = 5.0
+    duracao: float = 30.0
+    max_conexoes: int = 200
+    timeout: float = 10.0
+    seed: int = 0
+
+
+def _chip_ids(quantidade: int, seed: int) -> list[str]:
+    """
+    Gera chip IDs no formato do sketch (ESP.getEfuseMac() em 16 dígitos hexadecimais).
+    """
+    rng = np.random.default_rng(seed)
+    return [f"{int(valor):016X}" for valor in rng.integers(0, 2**48, quantidade, dtype=np.int64)]
+
+
+def _leitura(serial: str, rng: np.random.Generator) -> dict:
+    acelerometro = rng.normal([0.0, 0.0, 1.0], 0.05)
+
+    return {
+        'serial': serial,
+        'lux': float(rng.integers(0, 2000)),
+        'temperatura': float(rng.normal(25, 2)),
+        'vibracao_media': float(abs(rng.normal(0.1, 0.05))),
+        'acelerometro_x': float(acelerometro[0]),
+        'acelerometro_y': float(acelerometro[1]),
+        'acelerometro_z': float(acelerometro[2]),
+    }
+
+
+async def _post(client: httpx.AsyncClient, caminho: str, corpo: dict, agendado: float, medicoes: MedicoesEndpoint):
+    try:
+        resposta = await client.post(caminho, json=corpo)
+        status = resposta.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+
+    medicoes.registrar(time.perf_counter() - agendado, status)
+
+
+async def _dispositivo(client: httpx.AsyncClient,
+                       serial: str,
+                       config: ConfiguracaoCarga,
+                       inicio: float,
+                       fim: float,
+                       medicoes: MedicoesEndpoint,
+                       ):
+    rng = np.random.default_rng([config.seed, int(serial, 16)])
+
+    # cada dispositivo começa em um ponto diferente do intervalo, como uma frota ligada em horários diferentes
+    agendado = inicio + rng.uniform(0, config.intervalo)
+
+    while agendado < fim:
+        await asyncio.sleep(max(0.0, agendado - time.perf_counter()))
+        await _post(client, "/leitura/", _leitura(serial, rng), agendado, medicoes)
+        agendado += config.intervalo
+
+
+async def executar_carga(config: ConfiguracaoCarga) -> dict:
+    """
+    Executa o teste de carga.
+    :param config: Configuração da carga.
+    :return: Resumo das medições do /init e do /leitura, e as métricas da API (/metrics) ao final.
+    """
+    seriais = _chip_ids(config.dispositivos, config.seed)
+    medicoes_init = MedicoesEndpoint()
+    medicoes_leitura = MedicoesEndpoint()
+
+    limites = httpx.Limits(max_connections=config.max_conexoes, max_keepalive_connections=config.max_conexoes)
+
+    async with httpx.AsyncClient(base_url=config.url, limits=limites, timeout=config.timeout) as client:
+        inicio = time.perf_counter()
+        await asyncio.gather(*[_post(client, "/init/", {'serial': serial}, time.perf_counter(), medicoes_init) for serial in seriais])
+        segundos_init = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        fim = inicio + config.duracao
+        await asyncio.gather(*[_dispositivo(client, serial, config, inicio, fim, medicoes_leitura) for serial in seriais])
+        segundos_leitura = time.perf_counter() - inicio
+
+        try:
+            metricas_api = (await client.get("/metrics")).json()
+        except (httpx.HTTPError, ValueError):
+            metricas_api = None
+
+    return {
+        'configuracao': asdict(config),
+        'init': medicoes_init.resumo(segundos_init),
+        'leitura': medicoes_leitura.resumo(segundos_leitura),
+        'metricas_api': metricas_api,
+    }
+
+
+def comparar_baseline(resultado: dict, baseline: dict, tolerancia: float) -> list[str]:
+    """
+    Compara as métricas do /leitura com as da baseline.
+    :param tolerancia: Piora relativa aceita (ex.: 0.2 = 20%).
+    :return: Descrição das métricas que pioraram além da tolerância.
+    """
+    regressoes = []
+
+    for nome, maior_melhor in METRICAS_BASELINE:
+        atual = resultado['leitura'][nome]
+        referencia = baseline['leitura'][nome]
+
+        if nome == 'taxa_erros':
+            # taxa de erros é comparada em pontos percentuais, já que a baseline normalmente é zero
+            piorou = atual > referencia + tolerancia / 100
+        elif maior_melhor:
+            piorou = atual < referencia * (1 - tolerancia)
+        else:
+            piorou = atual > referencia * (1 + tolerancia)
+
+        if piorou:
+            regressoes.append(f"{nome}: {referencia:.4g} -> {atual:.4g}")
+
+    return regressoes
+
+
+def imprimir_resultado(resultado: dict):
+    print(f"{'endpoint':<10}{'reqs':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'erros':>8}")
+
+    for endpoint in ('init', 'leitura'):
+        r = resultado[endpoint]
+        print(
+            f"{endpoint:<10}{r['requisicoes']:>8}{r['requisicoes_por_segundo']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+            f"{r['p99_ms']:>10.1f}{r['max_ms']:>10.1f}{r['taxa_erros']:>8.1%}"
+        )
+        print(f"{'':<10}status: {r['status']}")
+
+    if resultado['metricas_api'] is not None:
+        print(f"fila_escrita: {resultado['metricas_api'].get('fila_escrita')}")
+
+
+@contextmanager
+def servidor_local(caminho_db: str, porta: int, tempo_max: float = 30.0):
+    """
+    Inicia a API em um processo separado (para não disputar o GIL com o gerador de carga), com um banco SQLite, e a
+    encerra ao final.
+    """
+    codigo = (
+        "import sys, uvicorn\n"
+        "from src.database.tipos_base.database import Database\n"
+        "Database.init_sqlite(sys.argv[1])\n"
+        "Database.init_sqlite_async(sys.argv[1])\n"
+        "Database.create_all_tables()\n"
+        "from src.wokwi_api.api_basica import app\n"
+        "uvicorn.run(app, host='127.0.0.1', port=int(sys.argv[2]), log_level='warning')\n"
+    )
+    processo = subprocess.Popen([sys.executable, "-c", codigo, caminho_db, str(porta)])
+
+    try:
+        limite = time.monotonic() + tempo_max
+
+        while True:
+            if processo.poll() is not None:
+                raise RuntimeError(f"A API encerrou ao iniciar (código {processo.returncode}).")
+
+            try:
+                httpx.get(f"http://127.0.0.1:{porta}/metrics", timeout=1.0)
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > limite:
+                    raise TimeoutError("A API não respondeu a tempo.")
+                time.sleep(0.2)
+
+        yield f"http://127.0.0.1:{porta}"
+    finally:
+        processo.terminate()
+        try:
+            processo.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+
+
+def main(argumentos: Optional[list[str]] = None) -> int:
+    padrao = ConfiguracaoCarga()
+
+    parser = argparse.ArgumentParser(description="Teste de carga da API de ingestão, simulando uma frota de ESP32.")
+    parser.add_argument("--url", default=padrao.url, help="URL base da API.")
+    parser.add_argument("--servidor-local", metavar="DB", help="Inicia a API localmente com este banco SQLite, ignorando --url.")
+    parser.add_argument("--porta", type=int, default=8181, help="Porta da API iniciada com --servidor-local.")
+    parser.add_argument("--dispositivos", type=int, default=padrao.dispositivos)
+    parser.add_argument("--intervalo", type=float, default=padrao.intervalo, help="Segundos entre as leituras de cada dispositivo.")
+    parser.add_argument("--duracao", type=float, default=padrao.duracao, help="Segundos de envio de leituras.")
+    parser.add_argument("--max-conexoes", type=int, default=padrao.max_conexoes)
+    parser.add_argument("--timeout", type=float, default=padrao.timeout)
+    parser.add_argument("--seed", type=int, default=padrao.seed)
+    parser.add_argument("--salvar-baseline", metavar="ARQUIVO", help="Salva o resultado como baseline (JSON).")
+    parser.add_argument("--comparar", metavar="ARQUIVO", help="Compara o resultado com a baseline e retorna 1 se houver regressão.")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Piora relativa aceita na comparação (padrão: 0.2).")
+    args = parser.parse_args(argumentos)
+
+    config = ConfiguracaoCarga(
+        url=args.url,
+        dispositivos=args.dispositivos,
+        intervalo=args.intervalo,
+        duracao=args.duracao,
+        max_conexoes=args.max_conexoes,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+
+    if args.servidor_local:
+        with servidor_local(args.servidor_local, args.porta) as url:
+            config.url = url
+            resultado = asyncio.run(executar_carga(config))
+    else:
+        resultado = asyncio.run(executar_carga(config))
+
+    imprimir_resultado(resultado)
+
+    if args.salvar_baseline:
+        with open(args.salvar_baseline, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+        print(f"Baseline salva em {args.salvar_baseline}.")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            baseline = json.load(arquivo)
+
+        if baseline['configuracao'] != resultado['configuracao'] | {'url': baseline['configuracao']['url']}:
+            print("Aviso: a configuração da carga é diferente da configuração da baseline.")
+
+        regressoes = comparar_baseline(resultado, baseline, args.tolerancia)
+
+        if regressoes:
+            print("Regressões em relação à baseline:")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            return 1
+
+        print("Sem regressões em relação à baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""
+Benchmark das consultas de leitura do dashboard em bancos SQLite de tamanhos diferentes.
+
+Para cada tamanho, um banco com leituras sintéticas é gerado pelo construtor_dataset (e reaproveitado nas execuções
+seguintes) e cada caso mede o tempo (mediana das repetições) e o pico de memória alocada (tracemalloc, em uma
+execução separada, já que o tracemalloc deixa o código mais lento). O cache_consultas é limpo antes de cada execução,
+então os tempos são sempre da consulta ao banco.
+
+Os casos que usam o Streamlit (análise exploratória e paginação da TableView, pelo AppTest) precisam das dependências
+do dashboard instaladas.
+
+Uso:
+    python -m src.benchmarks.consultas_dashboard --tamanhos 10k 1M 10M --salvar-baseline baseline.json
+    python -m src.benchmarks.consultas_dashboard --tamanhos 10k 1M --comparar baseline.json --tolerancia 0.25
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Callable, Optional
+
+from sqlalchemy import func, select
+
+from src.database.generator.construtor_dataset import construir_dataset
+from src.database.models.sensor import LeituraSensor, Sensor, TipoSensor
+from src.database.tipos_base.cache_consultas import cache_consultas
+from src.database.tipos_base.contagem import contador_registros
+from src.database.tipos_base.database import Database
+from src.settings import MAX_PONTOS_GRAFICO
+
+# período fixo dos datasets, para que os bancos gerados e as consultas sejam sempre os mesmos
+DATA_FINAL = datetime(2025, 6, 1)
+DATA_INICIAL = DATA_FINAL - timedelta(days=30)
+
+# diferença mínima, em segundos, para um caso ser considerado uma regressão (evita falsos positivos em casos rápidos)
+FOLGA_MINIMA_SEGUNDOS = 0.005
+
+SUFIXOS_TAMANHO = {'k': 10**3, 'm': 10**6}
+
+
+@dataclass
+class ResultadoCaso:
+    """
+    Args:
+        segundos (float): Mediana do tempo das repetições.
+        pico_mb (float): Pico de memória alocada durante o caso, em MB.
+    """
+    segundos: float
+    pico_mb: float
+
+
+def tamanho_dataset(texto: str) -> int:
+    """
+    Converte um tamanho como "10k" ou "1M" na quantidade de leituras.
+    """
+    sufixo = texto[-1].lower()
+
+    if sufixo in SUFIXOS_TAMANHO:
+        return int(float(texto[:-1]) * SUFIXOS_TAMANHO[sufixo])
+
+    return int(texto)
+
+
+def preparar_banco(pasta: str, leituras: int, rotulo: str, workers: int) -> str:
+    """
+    Inicializa o banco do tamanho informado, gerando as leituras caso o banco ainda não exista.
+    :return: Caminho do banco.
+    """
+    caminho = os.path.join(pasta, f"benchmark_leituras_{rotulo}.db")
+    leituras_por_sensor = leituras // 3
+    existe = os.path.exists(caminho)
+
+    Database.init_sqlite(caminho)
+    Database.create_all_tables()
+
+    if existe:
+        with Database.get_session() as session:
+            total = session.scalar(select(func.count()).select_from(LeituraSensor))
+
+        if total == leituras_por_sensor * 3:
+            return caminho
+
+        raise RuntimeError(f"O banco {caminho} tem {total} leituras, e não {leituras_por_sensor * 3}. Remova o arquivo para gerá-lo novamente.")
+
+    # um sensor de cada tipo, com as leituras igualmente espaçadas no período
+    construir_dataset(
+        sensores_por_tipo=1,
+        leituras_por_sensor=leituras_por_sensor,
+        data_inicial=DATA_INICIAL,
+        data_final=DATA_FINAL,
+        workers=workers,
+    )
+
+    return caminho
+
+
+def _pagina_tabela_leituras():
+    # executado pelo AppTest como um script do Streamlit, no mesmo processo (o banco já está inicializado)
+    from src.dashboard.generic.table_view import TableView
+    from src.database.models.sensor import LeituraSensor
+
+    TableView(LeituraSensor).table_view()
+
+
+def _paginar_table_view():
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_function(_pagina_tabela_leituras, default_timeout=600)
+    app.run()
+
+    # primeira página e as duas seguintes, pelo botão "Próxima"
+    for _ in range(2):
+        proxima = next(botao for botao in app.button if botao.label == "Próxima")
+        proxima.click().run()
+
+    if app.exception:
+        raise RuntimeError(f"Erro na TableView: {app.exception[0].message}")
+
+
+def _dados_analise_exploratoria():
+    from src.dashboard.plots.analise_exploratoria import carregar_dados_consolidados
+
+    with Database.get_session() as session:
+        tipos_sensor = {tipo.id: tipo for tipo in session.scalars(select(TipoSensor))}
+
+    carregar_dados_consolidados(DATA_FINAL - timedelta(days=7), DATA_FINAL, tipos_sensor)
+
+
+def _grafico_model_plotter(filtros: list):
+    import matplotlib.pyplot as plt
+    from src.plots.model_plot import ModelPlotter
+
+    plotter = ModelPlotter(LeituraSensor)
+    plt.close(plotter.get_plot(plotter.get_data_for_plot(filtros)))
+
+
+def casos_benchmark() -> dict[str, Callable[[], object]]:
+    """
+    Casos do benchmark, consultando o primeiro sensor do banco inicializado.
+    :return: Funções de cada caso, por nome.
+    """
+    with Database.get_session() as session:
+        sensor_id = session.scalar(select(Sensor.id).order_by(Sensor.id))
+
+    ultima_semana = [
+        LeituraSensor.sensor_id == sensor_id,
+        LeituraSensor.data_leitura >= DATA_FINAL - timedelta(days=7),
+        LeituraSensor.data_leitura <= DATA_FINAL,
+    ]
+    periodo = [
+        LeituraSensor.sensor_id == sensor_id,
+        LeituraSensor.data_leitura >= DATA_INICIAL,
+        LeituraSensor.data_leitura <= DATA_FINAL,
+    ]
+
+    return {
+        'filter_dataframe': lambda: LeituraSensor.filter_dataframe(filters=ultima_semana, order_by=[LeituraSensor.data_leitura.asc()]),
+        'as_dataframe_all': LeituraSensor.as_dataframe_all,
+        'get_leituras_for_sensor': lambda: LeituraSensor.get_leituras_for_sensor(sensor_id, DATA_INICIAL.date(), DATA_FINAL.date(), max_pontos=MAX_PONTOS_GRAFICO),
+        'model_plotter': lambda: _grafico_model_plotter(periodo),
+        'analise_exploratoria': _dados_analise_exploratoria,
+        'table_view_paginacao': _paginar_table_view,
+    }
+
+
+def _limpar_caches():
+    cache_consultas.invalidar()
+    contador_registros.invalidar()
+
+
+def medir_caso(funcao: Callable[[], object], repeticoes: int) -> ResultadoCaso:
+    """
+    Mede o tempo (mediana das repetições) e o pico de memória de um caso.
+    """
+    # a primeira execução, com os imports e a compilação das consultas, não entra na medição
+    _limpar_caches()
+    funcao()
+
+    tempos = []
+
+    for _ in range(repeticoes):
+        _limpar_caches()
+        inicio = perf_counter()
+        funcao()
+        tempos.append(perf_counter() - inicio)
+
+    _limpar_caches()
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return ResultadoCaso(segundos=statistics.median(tempos), pico_mb=pico / 2**20)
+
+
+def executar(tamanhos: list[str],
+             pasta: str,
+             repeticoes: int = 3,
+             casos: Optional[list[str]] = None,
+             workers: int = 1,
+             ) -> dict[str, dict[str, dict]]:
+    """
+    Executa o benchmark.
+    :param tamanhos: Tamanhos dos datasets (ex.: "10k", "1M").
+    :param pasta: Pasta onde os bancos gerados são guardados e reaproveitados.
+    :param repeticoes: Quantidade de execuções cronometradas de cada caso.
+    :param casos: Nomes dos casos executados. None para todos.
+    :param workers: Processos usados para gerar os datasets.
+    :return: Resultados por tamanho e por caso.
+    """
+    resultados = {}
+
+    for rotulo in tamanhos:
+        preparar_banco(pasta, tamanho_dataset(rotulo), rotulo, workers)
+        resultados[rotulo] = {}
+
+        for nome, funcao in casos_benchmark().items():
+            if casos is not None and nome not in casos:
+                continue
+
+            resultado = medir_caso(funcao, repeticoes)
+            resultados[rotulo][nome] = {'segundos': resultado.segundos, 'pico_mb': resultado.pico_mb}
+
+            print(f"{rotulo:<8}{nome:<26}{resultado.segundos * 1000:>12.1f}{resultado.pico_mb:>12.1f}", flush=True)
+
+    return resultados
+
+
+def comparar_baseline(resultados: dict, baseline: dict, tolerancia: float) -> list[str]:
+    """
+    Compara o tempo e o pico de memória de cada caso com os da baseline. Casos ausentes na baseline são ignorados.
+    :param tolerancia: Piora relativa aceita (ex.: 0.25 = 25%).
+    :return: Descrição dos casos que pioraram além da tolerância.
+    """
+    regressoes = []
+
+    for rotulo, casos in resultados.items():
+        for nome, atual in casos.items():
+            referencia = baseline.get(rotulo, {}).get(nome)
+
+            if referencia is None:
+                continue
+
+            if (atual['segundos'] > referencia['segundos'] * (1 + tolerancia)
+                    and atual['segundos'] - referencia['segundos'] > FOLGA_MINIMA_SEGUNDOS):
+                regressoes.append(f"{rotulo} {nome}: {referencia['segundos'] * 1000:.1f} ms -> {atual['segundos'] * 1000:.1f} ms")
+
+            if atual['pico_mb'] > referencia['pico_mb'] * (1 + tolerancia) and atual['pico_mb'] - referencia['pico_mb'] > 1:
+                regressoes.append(f"{rotulo} {nome}: {referencia['pico_mb']:.1f} MB -> {atual['pico_mb']:.1f} MB")
+
+    return regressoes
+
+
+def main(argumentos: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark das consultas de leitura do dashboard.")
+    parser.add_argument("--tamanhos", nargs="+", default=["10k", "1M", "10M"], help="Quantidade de leituras de cada banco (ex.: 10k 1M 10M).")
+    parser.add_argument("--pasta", default=os.path.join(tempfile.gettempdir(), "benchmarks_dashboard"), help="Pasta dos bancos gerados.")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--casos", nargs="+", help="Executa apenas os casos informados.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos usados para gerar os bancos.")
+    parser.add_argument("--salvar-baseline", metavar="ARQUIVO", help="Salva os resultados como baseline (JSON).")
+    parser.add_argument("--comparar", metavar="ARQUIVO", help="Compara com a baseline e retorna 1 se houver regressão.")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Piora relativa aceita na comparação (padrão: 0.25).")
+    args = parser.parse_args(argumentos)
+
+    os.makedirs(args.pasta, exist_ok=True)
+
+    print(f"{'tamanho':<8}{'caso':<26}{'tempo (ms)':>12}{'pico (MB)':>12}")
+    resultados = executar(args.tamanhos, args.pasta, args.repeticoes, args.casos, args.workers)
+
+    if args.salvar_baseline:
+        with open(args.salvar_baseline, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+        print(f"Baseline salva em {args.salvar_baseline}.")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            regressoes = comparar_baseline(resultados, json.load(arquivo), args.tolerancia)
+
+        if regressoes:
+            print("Regressões em relação à baseline:")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            return 1
+
+        print("Sem regressões em relação à baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,84 @@
+import os
+import weakref
+
 import streamlit as st
-from src.database.export_import_db import create_database_zip_export
+from src.database.export_import_db import create_database_zip_export, FormatoExportacao
+from src.settings import EXPORTACAO_DOWNLOAD_MAX_MB
+
+
+def _remover_arquivo(caminho: str):
+    if os.path.exists(caminho):
+        os.remove(caminho)
+
+
+class ArquivoExportacao:
+    """
+    Arquivo temporário da exportação, guardado no session_state. O arquivo é removido quando o objeto é descartado,
+    o que acontece quando a sessão do Streamlit termina, ou quando o processo é encerrado.
+
+    Args:
+        caminho (str): Caminho do arquivo zip.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._finalizador = weakref.finalize(self, _remover_arquivo, caminho)
+
+    def remover(self):
+        """
+        Remove o arquivo agora.
+        """
+        self._finalizador()
+
 
 def exportar_database():
 
     st.title("Exportar Banco de Dados")
+
+    formato = st.radio(
+        "Formato dos arquivos",
+        options=list(FormatoExportacao),
+        format_func=str,
+        horizontal=True,
+        help="Parquet mantém os tipos das colunas (datas, enums e números sem perda de precisão). CSV pode ser aberto em qualquer editor de planilhas."
+    )
+
     # Botão para iniciar o processo de exportação
     if st.button("Gerar Exportação do Banco de Dados"):
+
+        # remove o arquivo da exportação anterior, a sessão guarda apenas o caminho do arquivo
+        anterior = st.session_state.pop('arquivo_exportacao', None)
+        if anterior is not None:
+            anterior.remover()
+
         with st.spinner("Gerando o arquivo ZIP..."):
-            # Gera o buffer do arquivo ZIP
-            zip_buffer = create_database_zip_export()
+            # Gera o arquivo ZIP em um arquivo temporário, lendo as tabelas em lotes
+            st.session_state['arquivo_exportacao'] = ArquivoExportacao(create_database_zip_export(formato=formato))
+
+    arquivo_exportacao = st.session_state.get('arquivo_exportacao')
 
+    if arquivo_exportacao is None or not os.path.exists(arquivo_exportacao.caminho):
+        return
 
-        # Exibe o botão de download após o processamento
+    tamanho_mb = os.path.getsize(arquivo_exportacao.caminho) / 2**20
+
+    # o download_button envia o arquivo inteiro pela sessão e o mantém em memória no servidor, então arquivos grandes
+    # devem ser gerados pela linha de comando, direto em um arquivo
+    if tamanho_mb > EXPORTACAO_DOWNLOAD_MAX_MB:
+        st.warning(
+            f"A exportação tem {tamanho_mb:.0f} MB, acima do limite de {EXPORTACAO_DOWNLOAD_MAX_MB} MB para download "
+            f"pelo dashboard. Gere o arquivo no servidor com: "
+            f"`python -m src.database.export_import_db --destino database_export.zip --formato {formato.value}`"
+        )
+        arquivo_exportacao.remover()
+        del st.session_state['arquivo_exportacao']
+        return
+
+    # Exibe o botão de download após o processamento
+    with open(arquivo_exportacao.caminho, 'rb') as arquivo:
         st.download_button(
             label="Baixar Exportação do Banco de Dados",
-            data=zip_buffer,
+            data=arquivo,
             file_name="database_export.zip",
             mime="application/zip"
         )
@@ -25,4 +89,3 @@ exportar_db_page = st.Page(
     icon="📦",
     url_path='/exportar-base-de-dados'
 )
-
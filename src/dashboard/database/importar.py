@@ -1,9 +1,9 @@
 import streamlit as st
-from sqlalchemy.exc import DatabaseError, IntegrityError
-from src.database.export_import_db import import_database_zip
+from src.database.export_import_db import ler_database_zip
+from src.database.importacao_em_massa import importar_em_massa
 import pandas as pd
 
-from src.database.reset_contador_ids import reset_contador_ids
+from src.database.models.leitura_agregada import LeituraSensorAgregada
 
 
 def importar_database():
@@ -11,47 +11,49 @@ def importar_database():
     st.title("Importar Banco de Dados")
     # Botão para iniciar o processo de exportação
     # Componente para upload de arquivo
-    uploaded_file = st.file_uploader("Escolha um arquivo para enviar", type=["zip"])
+    uploaded_file = st.file_uploader(
+        "Escolha um arquivo para enviar",
+        type=["zip"],
+        help="Arquivo gerado na exportação, em CSV ou Parquet. O formato de cada tabela é identificado pela extensão do arquivo."
+    )
 
     if uploaded_file is not None:
         st.info(f"Arquivo '{uploaded_file.name}' lido com sucesso!")
-        # Exemplo: leitura do arquivo se for CSV
-        models = import_database_zip(uploaded_file)
+        tabelas = ler_database_zip(uploaded_file)
 
-        for model, rows in models:
-            st.write(f"Modelo: {model.__tablename__}")
-
-            #faz um dataframe com as rows
-            df = pd.DataFrame(map(lambda x: x.to_dict(), rows))
-            st.write(df)
+        for model, df in tabelas:
+            st.write(f"Modelo: {model.__tablename__} ({len(df)} registros)")
+            # exibe apenas o início da tabela, as tabelas de leituras podem ter milhões de linhas
+            st.write(df.head(100))
 
         if st.button("Salvar no Banco de Dados"):
             with st.spinner("Salvando no banco de dados..."):
-                # Salva os dados no banco de dados
-                for model, rows in models:
-                    for row in rows:
-                        try:
-                            row.save()
-                        except IntegrityError as e:
-                            if e.code == "gkpj":
-                                print('record already exists')
-                                row.merge()
-                            else:
-                                print(e.code)
-                                raise
-                        except DatabaseError as e:
-                            print('aqui')
-                            if e.code == " DPY-4011":
-                                row.save()
-                            else:
-                                print(e.code)
-                                raise
-
-                # Atualiza o contador de IDs
-                reset_contador_ids()
+                progresso = st.empty()
+                resultados = []
+
+                def ao_concluir_tabela(resultado):
+                    resultados.append(resultado)
+                    progresso.write(f"{resultado.tabela} importada ({len(resultados)} de {len(tabelas)} tabelas)")
 
+                # Salva os dados no banco de dados em lotes, atualizando os registros que já existem,
+                # e atualiza o contador de IDs ao final
+                importar_em_massa(tabelas, ao_concluir_tabela=ao_concluir_tabela)
+
+                # os agregados são reconstruídos uma única vez ao final, a importação não passa pelos eventos do ORM
+                progresso.write("Reconstruindo os agregados das leituras...")
+                LeituraSensorAgregada.reconstruir()
+                progresso.empty()
 
             st.success("Banco de dados atualizado com sucesso!")
+            st.dataframe(pd.DataFrame([
+                {
+                    'Tabela': resultado.tabela,
+                    'Linhas': resultado.linhas,
+                    'Tempo (s)': round(resultado.segundos, 2),
+                    'Linhas/s': round(resultado.linhas_por_segundo),
+                }
+                for resultado in resultados
+            ]), hide_index=True)
 
 
 importar_db_page = st.Page(
@@ -60,4 +62,3 @@ importar_db_page = st.Page(
     icon="📦",
     url_path='/importar-base-de-dados'
 )
-
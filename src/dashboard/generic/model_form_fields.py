@@ -32,35 +32,7 @@ class ModelFormField:
         new_value = None
 
         if bool(self.field.foreign_keys):
-            # pega todos os items da tabela relacionada e exibe um selectbox
-
-            # Obter o nome da tabela relacionada
-            table_name = list(self.field.foreign_keys)[0].column.table.name
-
-            # Importar dinamicamente o modelo relacionado
-            related_class = get_model_by_table_name(table_name)
-
-            # Buscar todos os registros da tabela relacionada
-            related_items = related_class.all()
-
-            # Criar opções para o selectbox
-            options = [(item.id, str(item)) for item in related_items]
-
-            # Obter o valor atual
-
-            # Exibir o selectbox
-            _new_value = st.selectbox(
-                label=self.label,
-                options=options,
-                format_func=lambda x: x[1],
-                index=[opt[0] for opt in options].index(initial_value) if initial_value else None,
-                help=self.field.comment,
-            )
-
-            if _new_value is not None:
-                new_value = _new_value[0]
-            else:
-                new_value = None
+            new_value = self._render_chave_estrangeira(initial_value)
 
         elif isinstance(self.field.type, Enum):
 
@@ -194,6 +166,63 @@ class ModelFormField:
 
         return new_value
 
+    def _render_chave_estrangeira(self, initial_value=None) -> Optional[int]:
+        """
+        Exibe um selectbox com uma página de registros da tabela relacionada, filtrados por uma busca por prefixo.
+        Apenas o rótulo do valor selecionado é carregado fora da página, a tabela relacionada nunca é lida inteira.
+        :param initial_value: ID selecionado.
+        :return: ID escolhido, ou None.
+        """
+
+        # Obter o nome da tabela relacionada
+        table_name = list(self.field.foreign_keys)[0].column.table.name
+
+        # Importar dinamicamente o modelo relacionado
+        related_class = get_model_by_table_name(table_name)
+
+        chave = f"fk_{self.model.__tablename__}_{self.field_name}_{self.label}"
+
+        busca = st.text_input(
+            label=f"Buscar {self.label}",
+            key=f"{chave}_busca",
+            placeholder="Início do nome ou id",
+        )
+
+        # ids a partir dos quais cada página foi carregada; a busca nova volta para a primeira página
+        paginacao = st.session_state.get(f"{chave}_paginacao")
+        if paginacao is None or paginacao['busca'] != busca:
+            paginacao = {'busca': busca, 'cursores': [None]}
+            st.session_state[f"{chave}_paginacao"] = paginacao
+
+        options, tem_proxima = related_class.opcoes_chave_estrangeira(busca, apos_id=paginacao['cursores'][-1])
+
+        # o valor selecionado é sempre exibido, mesmo que não esteja na página atual
+        if initial_value is not None and initial_value not in [opt[0] for opt in options]:
+            rotulo = related_class.rotulo_registro(initial_value)
+            options.insert(0, (initial_value, rotulo if rotulo is not None else str(initial_value)))
+
+        # Exibir o selectbox
+        _new_value = st.selectbox(
+            label=self.label,
+            options=options,
+            format_func=lambda x: x[1],
+            index=[opt[0] for opt in options].index(initial_value) if initial_value is not None else None,
+            help=self.field.comment,
+            placeholder="Escolha uma opção",
+        )
+
+        col_anterior, col_proxima = st.columns(2)
+
+        if col_anterior.button("Anterior", key=f"{chave}_anterior", disabled=len(paginacao['cursores']) == 1, use_container_width=True):
+            paginacao['cursores'].pop()
+            st.rerun()
+
+        if col_proxima.button("Próxima", key=f"{chave}_proxima", disabled=not tem_proxima, use_container_width=True):
+            paginacao['cursores'].append(options[-1][0])
+            st.rerun()
+
+        return _new_value[0] if _new_value is not None else None
+
     def validate(self, value:Any, required:bool=True) -> str or None:
         if value is None and not required:
             print(f"Campo {self.label} não é obrigatório e o valor é None.")
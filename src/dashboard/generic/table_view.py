@@ -1,10 +1,14 @@
+from datetime import datetime, time
+
 import streamlit as st
-from sqlalchemy import BinaryExpression
+from sqlalchemy import BinaryExpression, UnaryExpression, DateTime
 
 from src.dashboard.generic.edit_view import EditView
 from src.dashboard.generic.model_query_filters import ModelQueryFilters
 from src.dashboard.generic.simple_plots import SimplePlotView
+from src.database.tipos_base.contagem import Contagem, contador_registros
 from src.database.tipos_base.model import Model
+from src.database.tipos_base.model_mixins.serialization import CursorPaginacao, PaginaDataframe
 from math import ceil
 
 
@@ -105,21 +109,28 @@ class TableView:
         selected = {'selection': {'rows': [], 'columns': []}}
 
         filters_valid:list[BinaryExpression] = []
-        offset = st.query_params.get('offset', None)
 
         for f in model_filters.get_filters():
             if f.value is not None or f.optional == False:
                 filters_valid.append(f.get_sqlalchemy_filter(self.model, model_filters.get_correct_filter_value(f)))
 
-        dataframe = self.model.filter_dataframe(
+        estado = self.estado_paginacao(filters_valid)
+
+        pagina = self.model.pagina_dataframe(
             select_fields=self.model.__table_view_fields__,
             filters=None if not filters_valid else filters_valid,
-            order_by=[self.model.id.desc()] if self.model.id is not None else None,
+            order_by=self.get_order_by(),
             limit=self.model.__table_view_itens_per_page__,
-            offset=offset,
+            cursor=estado['cursor'],
             as_display=True
         )
 
+        if pagina.dataframe.empty and estado['cursor'] is not None:
+            # a página deixou de existir (ex.: registros removidos), volta para a primeira
+            self.mudar_pagina(None, 1)
+
+        dataframe = pagina.dataframe
+
         with col1:
 
             selected = st.dataframe(dataframe,
@@ -129,7 +140,7 @@ class TableView:
                          hide_index=True,
                          )
 
-            self.paginacao(filters_valid)
+            self.paginacao(filters_valid, pagina)
 
         with (col2):
             if st.button("Novo"):
@@ -155,49 +166,104 @@ class TableView:
                     st.rerun()
 
 
-    def paginacao(self, filters: list[BinaryExpression] = None):
+    def get_order_by(self) -> list[UnaryExpression]:
+        """
+        Ordenação da tabela: decrescente pelo __table_view_order_by__ do model e pelo id.
+        """
+        if self.model.__table_view_order_by__ is not None:
+            return [getattr(self.model, self.model.__table_view_order_by__).desc(), self.model.id.desc()]
+
+        return [self.model.id.desc()]
+
+    def estado_paginacao(self, filters: list[BinaryExpression]) -> dict:
+        """
+        Retorna o estado da paginação da tabela (cursor e número da página), guardado no session_state.
+        O estado volta para a primeira página quando os filtros mudam.
+        :param filters: Filtros aplicados à tabela.
+        :return: dict com as chaves 'cursor', 'pagina' e 'filtros'.
+        """
+        chave = f"paginacao_{self.model.__name__}"
+        filtros = tuple((str(f), getattr(f.right, 'value', None)) for f in filters)
+
+        estado = st.session_state.get(chave)
+
+        if estado is None or estado['filtros'] != filtros:
+            estado = {'cursor': None, 'pagina': 1, 'filtros': filtros}
+            st.session_state[chave] = estado
 
-        total_itens = self.model.count(filters=filters)
+        return estado
 
-        if total_itens < self.model.__table_view_itens_per_page__:
-            return
+    def mudar_pagina(self, cursor: CursorPaginacao | None, pagina: int | None):
+        """
+        Muda a página da tabela.
+        :param cursor: Cursor da nova página. None para a primeira página.
+        :param pagina: Número da nova página, ou None quando não é conhecido (ex.: ao pular para uma data).
+        """
+        estado = st.session_state[f"paginacao_{self.model.__name__}"]
+        estado['cursor'] = cursor
+        estado['pagina'] = pagina
+        st.rerun()
 
-        total_paginas = ceil(total_itens / self.model.__table_view_itens_per_page__)
-        coluna_paginas, coluna_botao = st.columns([4, 1])
+    def paginacao(self, filters: list[BinaryExpression], pagina: PaginaDataframe):
+        """
+        Exibe os controles da paginação por chave: primeira, anterior e próxima página e, quando a tabela é ordenada
+        por data, o salto para uma data. O total de registros só é exibido se o model permitir (__table_view_count__),
+        e vem do cache de contagens; nas tabelas com __table_view_count_aproximado__, é estimado e exibido com "~".
+        """
+        estado = self.estado_paginacao(filters)
+        numero_pagina = estado['pagina']
 
-        pagina_atual = ceil(int(st.query_params.get('offset', 0)) / self.model.__table_view_itens_per_page__) + 1
+        # ao pular para uma data sem registros antes dela, a página é a primeira
+        if numero_pagina is None and not pagina.tem_anterior:
+            numero_pagina = 1
 
-        if pagina_atual > total_paginas:
-            st.query_params.pop('offset', None)
-            st.rerun()
+        # os botões só aparecem quando há mais de uma página; o salto para uma data aparece sempre
+        if pagina.tem_anterior or pagina.tem_proxima:
+            coluna_paginas, coluna_primeira, coluna_anterior, coluna_proxima = st.columns([4, 1, 1, 1])
 
-        with coluna_paginas:
+            with coluna_paginas:
+                texto = f"Página {numero_pagina}" if numero_pagina is not None else "Página"
 
-            st.write(f"Página {pagina_atual} de {total_paginas}")
+                if self.model.__table_view_count__:
+                    contagem = contador_registros.contar(self.model, filters, aproximada=self.model.__table_view_count_aproximado__)
+                    total_paginas = Contagem(ceil(contagem.total / self.model.__table_view_itens_per_page__), contagem.aproximada)
+                    texto += f" de {total_paginas} ({contagem} registros)"
 
-        with coluna_botao:
-            def mudar_pagina(page: int):
-                """
-                Função para mudar a página da tabela.
-                :param page: Página para a qual mudar.
-                """
+                st.write(texto)
 
-                offset_value = (page - 1) * self.model.__table_view_itens_per_page__
+            with coluna_primeira:
+                if st.button("Primeira", disabled=not pagina.tem_anterior):
+                    self.mudar_pagina(None, 1)
 
-                if offset_value != st.query_params.get('offset', 0):
-                    st.query_params['offset'] = offset_value
-                    st.rerun()
+            with coluna_anterior:
+                if st.button("Anterior", disabled=not pagina.tem_anterior):
+                    self.mudar_pagina(
+                        CursorPaginacao(pagina.primeira_chave, anterior=True),
+                        numero_pagina - 1 if numero_pagina is not None else None
+                    )
 
-            nova_pagina = st.number_input(
-                "Página",
-                min_value=1,
-                max_value=total_paginas,
-                value=pagina_atual,
-                step=1,
-            )
+            with coluna_proxima:
+                if st.button("Próxima", disabled=not pagina.tem_proxima):
+                    self.mudar_pagina(
+                        CursorPaginacao(pagina.ultima_chave),
+                        numero_pagina + 1 if numero_pagina is not None else None
+                    )
+
+        campo_ordem = self.model.__table_view_order_by__
+
+        if campo_ordem is not None and isinstance(getattr(self.model, campo_ordem).type, DateTime):
+            coluna_data, coluna_hora, coluna_ir = st.columns([2, 2, 1], vertical_alignment="bottom")
+
+            with coluna_data:
+                data = st.date_input(f"Ir para {self.model.get_field_display_name(campo_ordem)}", value=None, format="DD/MM/YYYY")
+
+            with coluna_hora:
+                hora = st.time_input("Hora", value=time.max.replace(microsecond=0))
 
-            if nova_pagina != pagina_atual:
-                mudar_pagina(nova_pagina)
+            with coluna_ir:
+                if st.button("Ir", disabled=data is None):
+                    # a tabela é decrescente, então a página começa no último registro até o instante escolhido
+                    self.mudar_pagina(CursorPaginacao((datetime.combine(data, hora),), inclusivo=True), None)
 
 
     def edit_view(self, model_id: int|None = None):
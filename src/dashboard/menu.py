@@ -3,8 +3,9 @@ import streamlit as st
 from src.dashboard.database.exportar import exportar_db_page
 from src.dashboard.database.importar import importar_db_page
 from src.dashboard.generic.table_view import TableView
+from src.dashboard.metricas import metricas_page
 from src.dashboard.principal import get_principal_page
-from src.database.dynamic_import import import_models
+from src.database.dynamic_import import registro_models
 
 def crud_menu():
     """
@@ -12,22 +13,11 @@ def crud_menu():
     Cria as páginas de CRUD para os modelos do banco de dados.
     """
 
-    # Importa os modelos do banco de dados
-
-    models = import_models()
-
-    #agrupa os modelos por __menu_group__ e depois ordena por __menu_order__
-
-    groups = list(set(map(lambda x: x[1].__menu_group__, models.items())))
-    groups.sort(key=lambda x: (x is None, x))
-
-    for group in groups:
+    # os grupos e a ordem dos modelos são calculados uma única vez pelo registro de models
+    for group, group_items in registro_models.grupos_menu():
         st.sidebar.header(group or "Cadastro de Outros Modelos")
-        group_items = list(filter(lambda x: x[1].__menu_group__ == group, models.items()))
-        #orderna os modelos por __menu_order__ e depois por display name
-        group_items.sort(key=lambda x: (x[1].__menu_order__, x[1].display_name()))
 
-        for model_name, model in group_items:
+        for model in group_items:
             view = TableView(model)
             st.sidebar.page_link(view.get_table_page())
 
@@ -42,6 +32,15 @@ def export_import_menu():
     st.sidebar.page_link(exportar_db_page)
     st.sidebar.page_link(importar_db_page)
 
+def monitoramento_menu():
+    """
+    Função para exibir o menu lateral do aplicativo.
+    Cria a página de métricas do sistema.
+    """
+
+    st.sidebar.header("Monitoramento")
+    st.sidebar.page_link(metricas_page)
+
 def menu():
     """
     Função para exibir o menu lateral do aplicativo.
@@ -52,4 +51,5 @@ def menu():
     st.sidebar.page_link(get_principal_page())
     crud_menu()
     export_import_menu()
+    monitoramento_menu()
 
@@ -0,0 +1,62 @@
+import pandas as pd
+import streamlit as st
+from src.database.tipos_base.contagem import contador_registros
+from src.database.tipos_base.cache_consultas import cache_consultas
+from src.database.tipos_base.database import Database
+
+
+def metricas_view():
+
+    st.title("Métricas do Sistema")
+
+    st.subheader("Pool de Conexões")
+
+    stats = Database.pool_stats()
+
+    if 'histograma_espera' not in stats:
+        st.info("O pool de conexões atual não é monitorado.")
+        st.write(stats)
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Conexões em uso", f"{stats['conexoes_em_uso']} / {stats['pool_size'] + stats['max_overflow']}")
+    col2.metric("Overflow", stats['overflow'])
+    col3.metric("Espera média (ms)", f"{stats['espera_media_ms']:.2f}")
+    col4.metric("Timeouts", stats['timeouts'])
+
+    st.write("Tempo de espera por uma conexão")
+    histograma = pd.DataFrame(
+        list(stats['histograma_espera'].items()),
+        columns=['Faixa', 'Checkouts']
+    ).set_index('Faixa')
+    st.bar_chart(histograma)
+
+    st.subheader("Caches do Dashboard")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("Contagens de registros")
+        st.write(contador_registros.stats())
+    with col2:
+        st.write("Resultados de consultas")
+        st.write(cache_consultas.stats())
+
+    # A API roda no mesmo processo quando ENABLE_API=true, então as métricas dela também podem ser exibidas
+    from src.wokwi_api.fila_escrita import fila_escrita
+    from src.wokwi_api.ingestao import cache_sensores
+
+    st.subheader("API de Sensores")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("Cache de sensores")
+        st.write(cache_sensores.stats())
+    with col2:
+        st.write("Fila de escrita")
+        st.write(fila_escrita.stats())
+
+
+metricas_page = st.Page(
+    metricas_view,
+    title="Métricas",
+    icon="📊",
+    url_path='/metricas'
+)
@@ -3,9 +3,10 @@ import streamlit as st
 from src.dashboard.database.exportar import exportar_db_page
 from src.dashboard.database.importar import importar_db_page
 from src.dashboard.global_messages import get_global_messages
+from src.dashboard.metricas import metricas_page
 from src.dashboard.principal import get_principal_page
 from src.dashboard.generic.table_view import TableView
-from src.database.dynamic_import import import_models
+from src.database.dynamic_import import registro_models
 from src.dashboard.menu import menu
 
 
@@ -16,12 +17,7 @@ def get_generic_pages() -> list:
 
     rotas = []
 
-    models = import_models()
-
-
-    items = list(models.items())
-    items.sort(key=lambda x: x[1].display_name())
-    for model_name, model in items:
+    for model in registro_models.por_display_name():
         view = TableView(model)
         rotas.extend(view.get_routes())
     return rotas
@@ -39,6 +35,7 @@ def navigation():
         *get_generic_pages(),
         exportar_db_page,
         importar_db_page,
+        metricas_page,
     ])
 
     menu()
@@ -4,11 +4,15 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 from datetime import datetime, timedelta,time
+from typing import Optional
 import seaborn as sns
 import matplotlib.pyplot as plt
+from sqlalchemy import select
 
-from src.database.models.sensor import LeituraSensor, Sensor, TipoSensor, TipoSensorEnum
+from src.database.models.leitura_agregada import LeituraSensorAgregada
+from src.database.models.sensor import LeituraSensor, Sensor, TipoSensor
 from src.database.tipos_base.database import Database
+from src.settings import MAX_PONTOS_GRAFICO
 
 
 def analise_exploratoria_view():
@@ -38,7 +42,9 @@ def analise_exploratoria_view():
         st.warning('A data inicial não pode ser maior que a data final.')
         return
 
-    if data_inicial is None and data_final is None:
+    periodo_padrao = data_inicial is None and data_final is None
+
+    if periodo_padrao:
 
         st.info('''
         Esta página apresenta uma análise exploratória dos dados coletados pelos sensores do sistema. 
@@ -52,58 +58,17 @@ def analise_exploratoria_view():
     data_final = datetime.combine(data_final, time.max)
 
     with Database.get_session() as session:
-        leituras = session.query(LeituraSensor).filter(
-            LeituraSensor.data_leitura >= data_inicial,
-            LeituraSensor.data_leitura <= data_final
-            ).all()
-        if not leituras and data_inicial is None and data_final is None:
-            leituras = session.query(LeituraSensor).order_by(LeituraSensor.data_leitura.desc()).limit(1000).all()
-
         # Obter todos os tipos de sensor existentes
-
         tipos_sensor_query = session.query(TipoSensor).all()
 
-        tipos_sensor = {ts.id: ts for ts in tipos_sensor_query}
-        sensores = session.query(Sensor).all()
-        sensor_id_to_tipo = {s.id: s.tipo_sensor_id for s in sensores}
+    tipos_sensor = {ts.id: ts for ts in tipos_sensor_query}
 
-    if not leituras:
+    df = carregar_dados_consolidados(data_inicial, data_final, tipos_sensor, ultimas_leituras=1000 if periodo_padrao else None)
+
+    if df is None:
         st.warning('Não há leituras disponíveis para exibir os gráficos.')
         return
 
-    # Montar DataFrame consolidado
-    data = []
-    for l in leituras:
-        tipo = sensor_id_to_tipo.get(l.sensor_id, None)
-
-        tipo_target:TipoSensor or None = tipos_sensor.get(tipo, None)
-
-        valor_target = np.nan
-
-        if tipo_target:
-            tipo_enum:TipoSensorEnum = tipo_target.tipo
-            valor_target = tipo_enum.get_valor_escalado(l.valor)
-
-        data.append({
-            'data_leitura': l.data_leitura,
-            tipo: valor_target
-        })
-    df = pd.DataFrame(data)
-    df = df.groupby('data_leitura').first().reset_index()
-
-    # Garantir colunas para todos os tipos de sensor
-    for tipo in tipos_sensor:
-        if tipo not in df.columns:
-            df[tipo] = np.nan
-
-    # Ordenar por data
-    df = df.sort_values('data_leitura')
-
-    # Preencher valores ausentes pelo metodo do vizinho mais próximo
-    df = df.set_index('data_leitura')
-    df = df.apply(lambda col: col.ffill().bfill())
-    df = df.reset_index()
-
     st.markdown('#### Visualização dos dados consolidados')
 
     sensor_labels = {ts.id: ts.nome for ts in tipos_sensor_query}
@@ -227,3 +192,85 @@ def analise_exploratoria_view():
         fig4 = sns.pairplot(df_renomeado.dropna(), height=2)
         st.pyplot(fig4)
 
+
+def carregar_leituras(data_inicial: datetime, data_final: datetime, ultimas_leituras: Optional[int] = None) -> pd.DataFrame:
+    """
+    Carrega apenas as colunas sensor_id, data_leitura e valor das leituras do período.
+    Em períodos longos, usa a média de cada intervalo dos agregados em vez das leituras brutas.
+    :param ultimas_leituras: Se informado e não houver leituras no período, carrega esta quantidade das últimas leituras.
+    :return: DataFrame com as colunas sensor_id, data_leitura e valor.
+    """
+    agregado = LeituraSensorAgregada.consultar_serie(None, data_inicial, data_final, MAX_PONTOS_GRAFICO)
+
+    if agregado is not None:
+        return agregado[['sensor_id', 'data_leitura', 'valor']]
+
+    colunas = select(LeituraSensor.sensor_id, LeituraSensor.data_leitura, LeituraSensor.valor)
+
+    with Database.get_session() as session:
+        leituras = pd.read_sql(
+            colunas.where(LeituraSensor.data_leitura >= data_inicial, LeituraSensor.data_leitura <= data_final),
+            session.bind,
+        )
+
+        if leituras.empty and ultimas_leituras:
+            leituras = pd.read_sql(
+                colunas.order_by(LeituraSensor.data_leitura.desc()).limit(ultimas_leituras),
+                session.bind,
+            )
+
+    return leituras
+
+
+def carregar_dados_consolidados(data_inicial: datetime,
+                                data_final: datetime,
+                                tipos_sensor: dict[int, TipoSensor],
+                                ultimas_leituras: Optional[int] = None,
+                                ) -> Optional[pd.DataFrame]:
+    """
+    Monta o DataFrame consolidado da análise exploratória: uma linha por data de leitura e uma coluna por tipo de
+    sensor (id do TipoSensor), com os valores escalados. Quando vários sensores do mesmo tipo têm leituras na mesma
+    data, é usada a média. Os valores ausentes são preenchidos pelo vizinho mais próximo.
+    :param data_inicial: Início do período.
+    :param data_final: Fim do período.
+    :param tipos_sensor: Tipos de sensor existentes, por id.
+    :param ultimas_leituras: Se informado e não houver leituras no período, usa esta quantidade das últimas leituras.
+    :return: DataFrame consolidado, ou None se não houver leituras.
+    """
+    leituras = carregar_leituras(data_inicial, data_final, ultimas_leituras)
+
+    if leituras.empty:
+        return None
+
+    with Database.get_session() as session:
+        sensor_id_to_tipo = dict(session.execute(select(Sensor.id, Sensor.tipo_sensor_id)).tuples().all())
+
+    leituras['data_leitura'] = pd.to_datetime(leituras['data_leitura'])
+    leituras['tipo_sensor_id'] = pd.Categorical(
+        leituras['sensor_id'].map(sensor_id_to_tipo),
+        categories=list(tipos_sensor),
+    )
+
+    # Escala os valores de cada tipo de sensor de uma só vez
+    for tipo_sensor_id, tipo_sensor in tipos_sensor.items():
+        mascara = (leituras['tipo_sensor_id'] == tipo_sensor_id).to_numpy()
+
+        if mascara.any():
+            leituras.loc[mascara, 'valor'] = tipo_sensor.tipo.get_valor_escalado(leituras.loc[mascara, 'valor'])
+
+    df = leituras.pivot_table(
+        index='data_leitura',
+        columns='tipo_sensor_id',
+        values='valor',
+        aggfunc='mean',
+        observed=False,
+    )
+
+    # Garantir colunas para todos os tipos de sensor
+    df = df.reindex(columns=list(tipos_sensor))
+    df.columns = list(df.columns)
+
+    # Preencher valores ausentes pelo metodo do vizinho mais próximo
+    df = df.sort_index().ffill().bfill()
+
+    return df.reset_index()
@@ -3,12 +3,15 @@ from src.database.models.sensor import LeituraSensor
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from src.plots.downsampling import reduzir_dataframe
+from src.settings import MAX_PONTOS_GRAFICO
 
-def get_grafico_barras(leituras: list[LeituraSensor], title: str):
+def get_grafico_barras(leituras: list[LeituraSensor], title: str, max_pontos: int = MAX_PONTOS_GRAFICO):
     """
     Função para gerar um gráfico de barras com os dados do sensor.
     :param leituras: instâncias de LeituraSensor
     :param title: título do gráfico
+    :param max_pontos: quantidade máxima de barras plotadas, mantendo os picos
     :return:
     """
 
@@ -18,6 +21,8 @@ def get_grafico_barras(leituras: list[LeituraSensor], title: str):
         'valor': leitura.valor
     } for leitura in leituras])
 
+    df = reduzir_dataframe(df, 'data_leitura', ['valor'], max_pontos)
+
     #gráfico de barras
     fig, ax = plt.subplots()
     ax.bar(df['data_leitura'], df['valor'])
@@ -2,13 +2,16 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from src.plots.downsampling import reduzir_dataframe
+from src.settings import MAX_PONTOS_GRAFICO
 
-def get_grafico_degrau(leituras, title: str, labels: list = None):
+def get_grafico_degrau(leituras, title: str, labels: list = None, max_pontos: int = MAX_PONTOS_GRAFICO):
     """
     Função para gerar um gráfico de degrau com os dados do sensor.
     :param leituras: instâncias de LeituraSensor
     :param title: título do gráfico
     :param labels: rótulos para os valores do eixo Y (opcional)
+    :param max_pontos: quantidade máxima de pontos plotados, mantendo as mudanças de estado
     :return:
     """
 
@@ -18,6 +21,8 @@ def get_grafico_degrau(leituras, title: str, labels: list = None):
         'estado': 1 if leitura.valor > 0 else 0  # Considera 1 para ligado e 0 para desligado
     } for leitura in leituras])
 
+    df = reduzir_dataframe(df, 'data_leitura', ['estado'], max_pontos)
+
     # Gráfico de degrau
     fig, ax = plt.subplots()
     ax.step(df['data_leitura'], df['estado'], where='post')
@@ -4,16 +4,19 @@ from src.database.models.sensor import Sensor, TipoSensor, TipoSensorEnum, Leitu
 from datetime import datetime, timedelta, date, time
 import pandas as pd
 import matplotlib.pyplot as plt
+from src.database.tipos_base.cache_consultas import em_cache
+from src.settings import MAX_PONTOS_GRAFICO
 
-#tirei o cache para evitar problemas
-# @st.cache_data
+# o st.cache_data não sabia quando os dados mudavam; o em_cache descarta o resultado a cada escrita nas tabelas
+@em_cache('SENSOR', 'TIPO_SENSOR')
 def get_sensores_por_tipo(tipo:TipoSensorEnum) -> list[Sensor]:
     """Faz uma consulta com o SQLAlchemy para retornar os sensores de umidade."""
 
     return Sensor.filter_by_tiposensor(tipo)
 
-# @st.cache_data
+@em_cache('LEITURA_SENSOR', 'LEITURA_SENSOR_AGREGADA')
 def get_leituras_for_sensor(sensor_id: int, data_inicial: date, data_final: date) -> list[LeituraSensor]:
-    """Faz uma consulta com o SQLAlchemy para retornar as leituras de um sensor entre duas datas."""
+    """Faz uma consulta com o SQLAlchemy para retornar as leituras de um sensor entre duas datas.
+    Em períodos longos, usa os agregados por minuto/hora/dia."""
 
-    return LeituraSensor.get_leituras_for_sensor(sensor_id, data_inicial, data_final)
\ No newline at end of file
+    return LeituraSensor.get_leituras_for_sensor(sensor_id, data_inicial, data_final, max_pontos=MAX_PONTOS_GRAFICO)
\ No newline at end of file
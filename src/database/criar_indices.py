@@ -0,0 +1,49 @@
+from src.database.dynamic_import import import_models
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.model import Model
+from sqlalchemy import inspect
+import logging
+
+
+def get_indices_existentes(table_name: str) -> set[str]:
+    """
+    Retorna os nomes (em maiúsculas) dos índices existentes no banco de dados para a tabela.
+    O Oracle retorna os nomes em minúsculas, então a comparação é feita sem diferenciar maiúsculas.
+    """
+    inspector = inspect(Database.engine)
+    return {index['name'].upper() for index in inspector.get_indexes(table_name) if index.get('name')}
+
+
+def criar_indices_faltantes() -> list[str]:
+    """
+    Cria, em bancos de dados já existentes (SQLite ou Oracle), os índices declarados nos models que ainda não existem.
+    Tabelas que ainda não existem são ignoradas, pois o create_all já cria os índices junto com a tabela.
+    :return: Lista com os nomes dos índices criados.
+    """
+    import_models(sort=True)
+
+    inspector = inspect(Database.engine)
+    tabelas_existentes = {nome.upper() for nome in inspector.get_table_names()}
+
+    criados = []
+
+    for table in Model.metadata.sorted_tables:
+        if not table.indexes or table.name.upper() not in tabelas_existentes:
+            continue
+
+        existentes = get_indices_existentes(table.name)
+
+        for index in table.indexes:
+            if index.name.upper() in existentes:
+                continue
+
+            logging.info(f"Criando índice {index.name} na tabela {table.name}...")
+            index.create(bind=Database.engine)
+            criados.append(index.name)
+
+    return criados
+
+
+if __name__ == "__main__":
+    Database.init_sqlite()
+    print(criar_indices_faltantes())
@@ -2,11 +2,14 @@ import importlib
 import inspect
 import logging
 import os
+from threading import Lock
+from types import MappingProxyType
+from typing import Optional
 
 from src.database.tipos_base.model import Model
 
 
-def import_models(sort:bool=False) -> dict[str, type[Model]]:
+def _descobrir_models() -> dict[str, type[Model]]:
     """
     Importa dinamicamente todas as classes que herdam de Model
     na pasta src/python/database/models.
@@ -15,7 +18,7 @@ def import_models(sort:bool=False) -> dict[str, type[Model]]:
     models = {}
     models_path = os.path.join(os.path.dirname(__file__), "models")
 
-    for file in os.listdir(models_path):
+    for file in sorted(os.listdir(models_path)):
         if file.endswith(".py") and file != "__init__.py":
 
             # Remove o caminho do arquivo e substitui por um ponto
@@ -36,10 +39,112 @@ def import_models(sort:bool=False) -> dict[str, type[Model]]:
                     # logging.debug(f"Encontrada classe modelo: {name}")
                     models[name] = obj
 
+    return models
+
+
+class RegistroModels:
+    """
+    Registro dos models do banco de dados, compartilhado pelo processo.
+
+    A pasta de models é lida uma única vez, no primeiro uso, e as consultas por nome da classe ou da tabela e as
+    listas ordenadas (ordem de importação, grupos do menu) ficam prontas. Use atualizar() para ler a pasta novamente.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._carregado = False
+        self._por_nome: MappingProxyType = MappingProxyType({})
+        self._por_tabela: MappingProxyType = MappingProxyType({})
+        self._ordem_importacao: tuple[type[Model], ...] = ()
+        self._por_display_name: tuple[type[Model], ...] = ()
+        self._grupos_menu: tuple[tuple[Optional[str], tuple[type[Model], ...]], ...] = ()
+
+    def _garantir_carregado(self):
+        if self._carregado:
+            return
+
+        with self._lock:
+            if not self._carregado:
+                self._carregar()
+
+    def _carregar(self):
+        models = _descobrir_models()
+
+        self._por_nome = MappingProxyType(models)
+        self._por_tabela = MappingProxyType({model.__tablename__: model for model in models.values()})
+        self._ordem_importacao = tuple(sorted(models.values(), key=lambda model: model.__database_import_order__))
+        self._por_display_name = tuple(sorted(models.values(), key=lambda model: model.display_name()))
+
+        #agrupa os modelos por __menu_group__ e depois ordena por __menu_order__ e pelo display name
+        grupos = sorted({model.__menu_group__ for model in models.values()}, key=lambda grupo: (grupo is None, grupo))
+        self._grupos_menu = tuple(
+            (grupo, tuple(sorted(
+                (model for model in models.values() if model.__menu_group__ == grupo),
+                key=lambda model: (model.__menu_order__, model.display_name())
+            )))
+            for grupo in grupos
+        )
+
+        self._carregado = True
+
+    def atualizar(self):
+        """
+        Lê a pasta de models novamente, para incluir models criados depois do primeiro uso.
+        """
+        with self._lock:
+            self._carregar()
+
+    def models(self) -> MappingProxyType:
+        """
+        Retorna os models indexados pelo nome da classe (somente leitura).
+        """
+        self._garantir_carregado()
+        return self._por_nome
+
+    def get_por_nome(self, name: str) -> Optional[type[Model]]:
+        self._garantir_carregado()
+        return self._por_nome.get(name)
+
+    def get_por_tabela(self, table_name: str) -> Optional[type[Model]]:
+        self._garantir_carregado()
+        return self._por_tabela.get(table_name)
+
+    def ordem_importacao(self) -> tuple[type[Model], ...]:
+        """
+        Retorna os models ordenados por __database_import_order__.
+        """
+        self._garantir_carregado()
+        return self._ordem_importacao
+
+    def por_display_name(self) -> tuple[type[Model], ...]:
+        """
+        Retorna os models ordenados pelo display name.
+        """
+        self._garantir_carregado()
+        return self._por_display_name
+
+    def grupos_menu(self) -> tuple[tuple[Optional[str], tuple[type[Model], ...]], ...]:
+        """
+        Retorna os grupos do menu (__menu_group__, com os sem grupo por último) e os models de cada grupo, ordenados
+        por __menu_order__ e pelo display name.
+        """
+        self._garantir_carregado()
+        return self._grupos_menu
+
+
+registro_models = RegistroModels()
+
+
+def import_models(sort:bool=False) -> dict[str, type[Model]]:
+    """
+    Retorna todas as classes que herdam de Model na pasta src/python/database/models, a partir do registro_models.
+    :param sort: Se True, ordena os models por __database_import_order__.
+    :return: dict - Um dicionário com o nome das classes como chave e as classes como valor.
+    """
     if sort:
-        models = dict(sorted(models.items(), key=lambda item: item[1].__database_import_order__))
+        return {model.__name__: model for model in registro_models.ordem_importacao()}
 
-    return models
+    return dict(registro_models.models())
 
 def get_model_by_name(name:str) -> type[Model]:
     """
@@ -47,8 +152,7 @@ def get_model_by_name(name:str) -> type[Model]:
     :param name: Nome do modelo.
     :return: Model - Instância do modelo.
     """
-    models = import_models()
-    model_class = models.get(name)
+    model_class = registro_models.get_por_nome(name)
     if model_class:
         return model_class
     else:
@@ -60,10 +164,9 @@ def get_model_by_table_name(table_name:str) -> type[Model]:
     :param table_name: Nome da tabela.
     :return: Model - Instância do modelo.
     """
-    models = import_models()
-    for model_class in models.values():
-        if model_class.__tablename__ == table_name:
-            return model_class
+    model_class = registro_models.get_por_tabela(table_name)
+    if model_class:
+        return model_class
     raise ValueError(f"Model com tabela '{table_name}' não encontrado.")
 
 if __name__ == "__main__":
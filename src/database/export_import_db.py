@@ -1,82 +1,303 @@
-from sqlalchemy.exc import DatabaseError
-from src.database.dynamic_import import import_models, get_model_by_table_name
+from src.database.dynamic_import import get_model_by_table_name, registro_models
+import argparse
+import csv
 import io
+import os
+import struct
+import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from enum import StrEnum
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from src.database.tipos_base.model import Model
-from typing import List
+from typing import List, IO, Optional
 from src.database.tipos_base.database import Database
-from sqlalchemy import text
+from sqlalchemy import text, Enum, DateTime, Boolean, Integer, Float, LargeBinary
+from src.settings import EXPORTACAO_PARQUET_ROW_GROUP, EXPORTACAO_WORKERS
 
 
-def convert_database_to_dataframes() -> list[tuple[Model, pd.DataFrame]]:
+class FormatoExportacao(StrEnum):
+    CSV = "csv"
+    # colunar: mantém os tipos (datas, enums), é menor e mais rápido de gravar e ler
+    PARQUET = "parquet"
+
+    def __str__(self):
+        match self.value:
+            case "csv":
+                return "CSV"
+            case "parquet":
+                return "Parquet"
+
+        return super().__str__()
+
+
+def _tipo_arrow(field) -> pa.DataType:
+    """
+    Retorna o tipo do Arrow correspondente ao campo do model.
+    """
+    if isinstance(field.type, Enum):
+        # enums têm poucos valores distintos, então são gravados como dicionário
+        return pa.dictionary(pa.int32(), pa.string())
+
+    if isinstance(field.type, DateTime):
+        return pa.timestamp('us')
+
+    if isinstance(field.type, Boolean):
+        return pa.bool_()
+
+    if isinstance(field.type, Integer):
+        return pa.int64()
+
+    if isinstance(field.type, Float):
+        return pa.float64()
+
+    if isinstance(field.type, LargeBinary):
+        return pa.binary()
+
+    return pa.string()
+
+
+def schema_parquet(model: type[Model]) -> pa.Schema:
+    """
+    Retorna o schema do Arrow com os campos do model.
+    """
+    return pa.schema([pa.field(field.name, _tipo_arrow(field), nullable=True) for field in model.fields()])
+
+
+def exportar_tabela_csv(model: type[Model], arquivo: IO[bytes]) -> int:
     """
-    Converte um modelo em um DataFrame do pandas.
-    :param model:
-    :return:
+    Grava os registros da tabela em CSV, lote a lote, sem carregar a tabela inteira em memória.
+    :param model: Model da tabela.
+    :param arquivo: Arquivo binário de destino (ex.: uma entrada do zip).
+    :return: Quantidade de linhas gravadas.
     """
+    linhas = 0
 
-    response = []
+    with io.TextIOWrapper(arquivo, encoding='utf-8', newline='') as texto:
+        writer = csv.writer(texto)
+        writer.writerow([field.name for field in model.fields()])
 
-    models = import_models()
+        for lote in model.iter_linhas_exportacao():
+            writer.writerows(lote)
+            linhas += len(lote)
 
-    for model_name, model_class in models.items():
-        try:
-            dataframe = model_class.as_dataframe_all()
-            response.append((model_class, dataframe))
-        except DatabaseError as e:
-            if e.code == " DPY-4011":
-                dataframe = model_class.as_dataframe_all()
-                response.append((model_class, dataframe))
-            else:
-                print(e.code)
+    return linhas
 
-                raise
 
+def exportar_tabela_parquet(model: type[Model], arquivo: IO[bytes]) -> int:
+    """
+    Grava os registros da tabela em Parquet, com um row group por lote lido do banco, sem carregar a tabela inteira
+    em memória.
+    :param model: Model da tabela.
+    :param arquivo: Arquivo binário de destino (ex.: uma entrada do zip).
+    :return: Quantidade de linhas gravadas.
+    """
+    schema = schema_parquet(model)
+    linhas = 0
+
+    with pq.ParquetWriter(arquivo, schema, compression='zstd') as writer:
+        for lote in model.iter_linhas_exportacao(EXPORTACAO_PARQUET_ROW_GROUP, base64_binarios=False):
+            colunas = [pa.array(valores, type=tipo) for valores, tipo in zip(zip(*lote), schema.types)]
+            writer.write_table(pa.Table.from_arrays(colunas, schema=schema), row_group_size=len(lote))
+            linhas += len(lote)
+
+    return linhas
+
+
+def ler_tabela(zip_ref: zipfile.ZipFile, model: type[Model]) -> pd.DataFrame:
+    """
+    Lê o arquivo da tabela do zip, em Parquet ou CSV.
+    :return: DataFrame com os registros, vazio se a tabela não estiver no zip.
+    """
+    nomes = zip_ref.namelist()
+
+    if f"{model.__tablename__}.parquet" in nomes:
+        with zip_ref.open(f"{model.__tablename__}.parquet") as file:
+            return pq.read_table(file).to_pandas()
+
+    if f"{model.__tablename__}.csv" in nomes:
+        with zip_ref.open(f"{model.__tablename__}.csv") as file:
+            return pd.read_csv(file)
+
+    return pd.DataFrame()
+
+
+def _compressao_zip(formato: FormatoExportacao) -> int:
+    # os arquivos Parquet já são comprimidos, comprimir de novo no zip só gasta tempo
+    return zipfile.ZIP_STORED if formato == FormatoExportacao.PARQUET else zipfile.ZIP_DEFLATED
+
+
+def _exportar_para_zip(zip_file: zipfile.ZipFile, model: type[Model], formato: FormatoExportacao):
+    """
+    Grava a tabela como uma entrada do zip, comprimida à medida que os lotes são lidos.
+    """
+    exportar_tabela = exportar_tabela_parquet if formato == FormatoExportacao.PARQUET else exportar_tabela_csv
+
+    # force_zip64 permite entradas com mais de 2 GB, já que o tamanho não é conhecido antes de gravar
+    with zip_file.open(f"{model.__tablename__}.{formato.value}", "w", force_zip64=True) as entrada:
+        exportar_tabela(model, entrada)
 
-    return response
 
-def create_database_zip_export() -> io.BytesIO:
+def _exportar_para_arquivo(model: type[Model], formato: FormatoExportacao, diretorio: str) -> str:
     """
-    Cria um buffer zip com os dados do banco de dados.
-    :return: Buffer contendo o arquivo zip.
+    Grava a tabela em um zip com uma única entrada, já comprimida, para ser copiada para o zip final depois.
+    Executado pelos workers da exportação paralela, cada um com a sua conexão do pool, então a compressão também
+    é feita em paralelo.
+    :return: Caminho do zip da tabela.
     """
-    dataframes = convert_database_to_dataframes()
-    zip_buffer = io.BytesIO()
+    caminho = os.path.join(diretorio, f"{model.__tablename__}.zip")
 
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for model_name, df in dataframes:
-            csv_buffer = io.StringIO()
-            df.to_csv(csv_buffer, index=False)
-            zip_file.writestr(f"{model_name.__tablename__}.csv", csv_buffer.getvalue())
+    with zipfile.ZipFile(caminho, "w", _compressao_zip(formato)) as zip_file:
+        _exportar_para_zip(zip_file, model, formato)
+
+    return caminho
+
+
+def _copiar_entrada_comprimida(zip_file: zipfile.ZipFile, caminho: str):
+    """
+    Copia a única entrada do zip em caminho para o zip_file sem descomprimir e comprimir de novo: os bytes
+    comprimidos são copiados como estão, com um novo cabeçalho local, e a entrada é registrada no diretório central
+    que o zip_file grava ao ser fechado.
+    """
+    with zipfile.ZipFile(caminho) as origem:
+        (info_origem,) = origem.infolist()
+
+    info = zipfile.ZipInfo(info_origem.filename, info_origem.date_time)
+    info.compress_type = info_origem.compress_type
+    info.CRC = info_origem.CRC
+    info.compress_size = info_origem.compress_size
+    info.file_size = info_origem.file_size
+    info.external_attr = info_origem.external_attr
+    zip64 = max(info.file_size, info.compress_size) > zipfile.ZIP64_LIMIT
+
+    with open(caminho, "rb") as arquivo:
+        # cabeçalho local: 30 bytes fixos, seguidos do nome e do campo extra, cujos tamanhos estão nos bytes 26 a 29
+        arquivo.seek(info_origem.header_offset)
+        tamanho_nome, tamanho_extra = struct.unpack("<HH", arquivo.read(30)[26:30])
+        arquivo.seek(tamanho_nome + tamanho_extra, os.SEEK_CUR)
+
+        info.header_offset = zip_file.fp.tell()
+        zip_file.fp.write(info.FileHeader(zip64))
+
+        restante = info.compress_size
+        while restante:
+            bloco = arquivo.read(min(restante, 1024 * 1024))
+            zip_file.fp.write(bloco)
+            restante -= len(bloco)
+
+    zip_file.filelist.append(info)
+    zip_file.NameToInfo[info.filename] = info
+    zip_file.start_dir = zip_file.fp.tell()
+    zip_file._didModify = True
+
+
+def create_database_zip_export(destino: Optional[str] = None,
+                               formato: FormatoExportacao = FormatoExportacao.CSV,
+                               workers: int = EXPORTACAO_WORKERS,
+                               ) -> str:
+    """
+    Cria um arquivo zip com os dados do banco de dados, com um arquivo por tabela.
+    Os registros são lidos em lotes e gravados direto no arquivo, então a memória usada não depende do tamanho das tabelas.
+    Com mais de um worker, as tabelas são lidas e comprimidas em paralelo, cada uma em um zip temporário, e as entradas
+    comprimidas são copiadas para o zip final na ordem de importação.
+    :param destino: Caminho do arquivo zip. Se não informado, é criado um arquivo temporário, que deve ser removido
+    por quem chamou (em caso de erro, ele já é removido aqui).
+    :param formato: Formato dos arquivos das tabelas.
+    :param workers: Quantidade de tabelas exportadas ao mesmo tempo.
+    :return: Caminho do arquivo zip.
+    """
+    criado = destino is None
+
+    if criado:
+        with tempfile.NamedTemporaryFile(prefix="database_export_", suffix=".zip", delete=False) as arquivo:
+            destino = arquivo.name
+
+    try:
+        _gravar_database_zip(destino, formato, workers)
+    except BaseException:
+        # o arquivo temporário incompleto não é devolvido a ninguém, então é removido aqui
+        if criado and os.path.exists(destino):
+            os.remove(destino)
+        raise
+
+    return destino
+
+
+def _gravar_database_zip(destino: str, formato: FormatoExportacao, workers: int):
+    """
+    Grava o zip da exportação no destino. Ver create_database_zip_export.
+    """
+    models = [model for model in registro_models.ordem_importacao() if model.__database_export__]
+
+    if workers <= 1:
+        with zipfile.ZipFile(destino, "w", _compressao_zip(formato)) as zip_file:
+            for model in models:
+                _exportar_para_zip(zip_file, model, formato)
+
+        return
+
+    with tempfile.TemporaryDirectory(prefix="database_export_") as diretorio:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="exportacao") as executor:
+            futuros = [(model, executor.submit(_exportar_para_arquivo, model, formato, diretorio)) for model in models]
+
+            # as tabelas são adicionadas na ordem de importação, à medida que ficam prontas; a thread principal
+            # apenas copia os bytes já comprimidos pelos workers
+            with zipfile.ZipFile(destino, "w", _compressao_zip(formato)) as zip_file:
+                for model, futuro in futuros:
+                    caminho = futuro.result()
+                    _copiar_entrada_comprimida(zip_file, caminho)
+                    os.remove(caminho)
+
+def ler_database_zip(zip_file: io.BytesIO) -> list[tuple[type[Model], pd.DataFrame]]:
+    """
+    Lê as tabelas de um arquivo zip gerado pela exportação, na ordem de importação.
+    :param zip_file: Buffer do arquivo zip.
+    :return: Pares (model, DataFrame). Tabelas que não estão no zip retornam um DataFrame vazio.
+    """
+    models = [model for model in registro_models.ordem_importacao() if model.__database_export__]
+
+    with zipfile.ZipFile(zip_file, "r") as zip_ref:
+        return [(model, ler_tabela(zip_ref, model)) for model in models]
 
-    zip_buffer.seek(0)  # Retorna o ponteiro do buffer para o início
-    return zip_buffer
 
 def import_database_zip(zip_file: io.BytesIO) -> list[tuple[Model, List[Model]]]:
     """
-    Importa um arquivo zip contendo arquivos CSV para o banco de dados.
-    Atualiza o contador de ID após a importação.
+    Importa um arquivo zip contendo arquivos CSV ou Parquet para o banco de dados.
+    Para gravar os dados, prefira importar_em_massa com o retorno de ler_database_zip, que não cria as instâncias.
     :param zip_file: Buffer do arquivo zip.
-    :param session: Sessão do SQLAlchemy.
+    :return: Pares (model, instâncias).
     """
+    return [(model, model.from_dataframe(df)) for model, df in ler_database_zip(zip_file)]
 
-    response = []
 
-    models = import_models()
-    models = list(map(lambda x: x[1], models.items()))
-    models.sort(key=lambda x: x.__database_import_order__)
+def main(argumentos: Optional[list[str]] = None):
+    """
+    Gera a exportação direto em um arquivo, sem passar pelo dashboard. Usado para bancos grandes, cujo zip passa do
+    limite de download do dashboard (EXPORTACAO_DOWNLOAD_MAX_MB).
 
-    with zipfile.ZipFile(zip_file, "r") as zip_ref:
-        for model in models:
-            file_name = f"{model.__tablename__}.csv"
-            if file_name not in zip_ref.namelist():
-                response.append((model, model.from_dataframe(pd.DataFrame())))
-                continue
+    Uso:
+        python -m src.database.export_import_db --destino database_export.zip --formato parquet
+    """
+    parser = argparse.ArgumentParser(description="Exporta o banco de dados para um arquivo zip.")
+    banco = parser.add_mutually_exclusive_group()
+    banco.add_argument("--sqlite", help="Caminho do banco SQLite (padrão: database.db na pasta atual).")
+    banco.add_argument("--oracle", action="store_true", help="Usa o banco Oracle, com o login do iniciar_database.")
+    parser.add_argument("--destino", required=True, help="Caminho do arquivo zip.")
+    parser.add_argument("--formato", choices=[formato.value for formato in FormatoExportacao], default=FormatoExportacao.CSV.value)
+    parser.add_argument("--workers", type=int, default=EXPORTACAO_WORKERS, help="Tabelas exportadas ao mesmo tempo.")
+    args = parser.parse_args(argumentos)
+
+    if args.oracle:
+        from src.database.login.iniciar_database import iniciar_database
+        iniciar_database()
+    else:
+        Database.init_sqlite(args.sqlite)
 
-            with zip_ref.open(file_name) as file:
-                df = pd.read_csv(file)
-                response.append((model, model.from_dataframe(df)))
+    create_database_zip_export(args.destino, FormatoExportacao(args.formato), args.workers)
+    print(f"Exportação gravada em {args.destino}.")
 
-    return response
 
+if __name__ == "__main__":
+    main()
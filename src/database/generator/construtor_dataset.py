@@ -0,0 +1,251 @@
+"""
+Gera datasets sintéticos grandes de leituras de sensores, para testes de carga e benchmarks.
+
+As leituras de cada sensor são divididas em lotes gerados com NumPy por um pool de processos, a partir dos modelos
+de sinal de cada tipo de sensor (modelos_sinal.py). Cada lote usa uma seed derivada de (seed, sensor, posição), então
+o dataset é o mesmo em qualquer quantidade de processos. Os lotes são gravados pelo processo principal, à medida que
+ficam prontos, com inserts em massa do SQLAlchemy Core.
+
+Uso:
+    python -m src.database.generator.construtor_dataset --sqlite dataset.db --sensores-por-tipo 10 --leituras-por-sensor 1000000
+"""
+import argparse
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+from sqlalchemy import insert, select
+
+from src.database.generator.modelos_sinal import MODELOS_SINAL
+from src.database.models.leitura_agregada import LeituraSensorAgregada
+from src.database.models.sensor import LeituraSensor, Sensor, TipoSensor, TipoSensorEnum
+from src.database.reset_contador_ids import reset_contador_ids
+from src.database.tipos_base.database import Database
+from src.settings import DATASET_TAMANHO_LOTE_GERACAO, DATASET_TAMANHO_LOTE_INSERCAO
+
+
+@dataclass(frozen=True)
+class TarefaGeracao:
+    """
+    Trecho das leituras de um sensor, gerado por um processo do pool.
+
+    Args:
+        sensor_id (int): ID do sensor.
+        tipo (TipoSensorEnum): Tipo do sensor, que define o modelo de sinal.
+        inicio (int): Posição da primeira leitura do trecho no período.
+        quantidade (int): Quantidade de leituras do trecho.
+        data_inicial (np.datetime64): Início do período.
+        intervalo_ns (int): Intervalo entre as leituras, em nanossegundos.
+        seed (int): Seed do dataset.
+    """
+    sensor_id: int
+    tipo: TipoSensorEnum
+    inicio: int
+    quantidade: int
+    data_inicial: np.datetime64
+    intervalo_ns: int
+    seed: int
+
+
+def gerar_trecho(tarefa: TarefaGeracao) -> tuple[int, np.ndarray, np.ndarray]:
+    """
+    Gera as datas e os valores de um trecho das leituras de um sensor.
+    :return: (sensor_id, datas em datetime64[us], valores)
+    """
+    rng = np.random.default_rng([tarefa.seed, tarefa.sensor_id, tarefa.inicio])
+
+    posicoes = np.arange(tarefa.inicio, tarefa.inicio + tarefa.quantidade, dtype=np.int64)
+    datas = np.datetime64(tarefa.data_inicial, 'ns') + (posicoes * tarefa.intervalo_ns).astype('timedelta64[ns]')
+    valores = MODELOS_SINAL[tarefa.tipo].gerar(datas, tarefa.data_inicial, rng)
+
+    return tarefa.sensor_id, datas.astype('datetime64[us]'), valores
+
+
+def criar_sensores(sensores_por_tipo: int, tipos: Iterable[TipoSensorEnum] = TipoSensorEnum) -> list[tuple[int, TipoSensorEnum]]:
+    """
+    Garante que existam os tipos de sensor e sensores_por_tipo sensores simulados de cada tipo.
+    Sensores simulados criados em execuções anteriores são reaproveitados.
+    :return: Lista de (sensor_id, tipo).
+    """
+    sensores = []
+
+    with Database.get_session() as session:
+        for tipo in tipos:
+            tipo_sensor = session.scalars(select(TipoSensor).where(TipoSensor.tipo == tipo)).first()
+
+            if tipo_sensor is None:
+                tipo_sensor = TipoSensor(nome=str(tipo), tipo=tipo)
+                session.add(tipo_sensor)
+                session.flush()
+
+            nomes = [f"Simulado {tipo.name} {i:06d}" for i in range(sensores_por_tipo)]
+            existentes = set(session.scalars(select(Sensor.nome).where(Sensor.nome.in_(nomes))))
+            novos = [
+                {'tipo_sensor_id': tipo_sensor.id, 'nome': nome, 'cod_serial': f"SIM-{tipo.value}-{i:06d}", 'descricao': "Criado pelo gerador de datasets"}
+                for i, nome in enumerate(nomes) if nome not in existentes
+            ]
+
+            if novos:
+                session.execute(insert(Sensor), novos)
+
+            sensores.extend(
+                (sensor_id, tipo) for sensor_id in
+                session.scalars(select(Sensor.id).where(Sensor.nome.in_(nomes)).order_by(Sensor.id))
+            )
+
+        session.commit()
+
+    return sensores
+
+
+def planejar_tarefas(sensores: list[tuple[int, TipoSensorEnum]],
+                     leituras_por_sensor: int,
+                     data_inicial: datetime,
+                     data_final: datetime,
+                     seed: int,
+                     tamanho_lote: int = DATASET_TAMANHO_LOTE_GERACAO,
+                     ) -> Iterator[TarefaGeracao]:
+    """
+    Divide as leituras de cada sensor em trechos de até tamanho_lote leituras, igualmente espaçadas no período.
+    """
+    intervalo_ns = int((data_final - data_inicial) / timedelta(microseconds=1) * 1000 / leituras_por_sensor)
+
+    for sensor_id, tipo in sensores:
+        for inicio in range(0, leituras_por_sensor, tamanho_lote):
+            yield TarefaGeracao(
+                sensor_id=sensor_id,
+                tipo=tipo,
+                inicio=inicio,
+                quantidade=min(tamanho_lote, leituras_por_sensor - inicio),
+                data_inicial=np.datetime64(data_inicial, 'ns'),
+                intervalo_ns=intervalo_ns,
+                seed=seed,
+            )
+
+
+def gerar_em_paralelo(tarefas: Iterable[TarefaGeracao], workers: int) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Gera os trechos no pool de processos, mantendo no máximo 2 trechos por processo em memória, e os retorna na
+    ordem das tarefas.
+    """
+    if workers <= 1:
+        yield from map(gerar_trecho, tarefas)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pendentes = deque()
+
+        for tarefa in tarefas:
+            pendentes.append(executor.submit(gerar_trecho, tarefa))
+
+            if len(pendentes) >= workers * 2:
+                yield pendentes.popleft().result()
+
+        while pendentes:
+            yield pendentes.popleft().result()
+
+
+def inserir_trecho(sensor_id: int, datas: np.ndarray, valores: np.ndarray, tamanho_lote: int = DATASET_TAMANHO_LOTE_INSERCAO):
+    """
+    Grava as leituras com inserts em massa do SQLAlchemy Core, uma transação por lote.
+    """
+    tabela = LeituraSensor.__table__
+    datas = datas.tolist()
+    valores = valores.tolist()
+
+    for inicio in range(0, len(datas), tamanho_lote):
+        registros = [
+            {'sensor_id': sensor_id, 'data_leitura': data, 'valor': valor}
+            for data, valor in zip(datas[inicio:inicio + tamanho_lote], valores[inicio:inicio + tamanho_lote])
+        ]
+        Database.executar_escrita(lambda session: session.execute(insert(tabela), registros))
+
+
+def construir_dataset(sensores_por_tipo: int,
+                      leituras_por_sensor: int,
+                      data_inicial: datetime,
+                      data_final: datetime,
+                      seed: int = 0,
+                      workers: int = 1,
+                      tipos: Iterable[TipoSensorEnum] = TipoSensorEnum,
+                      reconstruir_agregados: bool = True,
+                      ) -> int:
+    """
+    Cria os sensores simulados e grava as leituras geradas no banco de dados já inicializado.
+    :param sensores_por_tipo: Quantidade de sensores de cada tipo.
+    :param leituras_por_sensor: Quantidade de leituras de cada sensor, igualmente espaçadas no período.
+    :param data_inicial: Início do período.
+    :param data_final: Fim do período.
+    :param seed: Seed do dataset. A mesma seed gera as mesmas leituras.
+    :param workers: Quantidade de processos que geram as leituras.
+    :param tipos: Tipos de sensor.
+    :param reconstruir_agregados: Se True, reconstrói a LEITURA_SENSOR_AGREGADA ao final.
+    :return: Quantidade de leituras gravadas.
+    """
+    sensores = criar_sensores(sensores_por_tipo, tipos)
+    tarefas = planejar_tarefas(sensores, leituras_por_sensor, data_inicial, data_final, seed)
+
+    total = 0
+    inicio = perf_counter()
+
+    for sensor_id, datas, valores in gerar_em_paralelo(tarefas, workers):
+        inserir_trecho(sensor_id, datas, valores)
+        total += len(datas)
+        logging.info(f"{total} leituras gravadas ({total / (perf_counter() - inicio):.0f} leituras/s)")
+
+    print(f"{total} leituras gravadas em {perf_counter() - inicio:.1f}s ({total / (perf_counter() - inicio):.0f} leituras/s).")
+
+    # o insert em massa não passa pelos eventos do ORM, então os agregados são calculados uma única vez ao final
+    if reconstruir_agregados:
+        inicio = perf_counter()
+        LeituraSensorAgregada.reconstruir([sensor_id for sensor_id, _ in sensores], data_inicial, data_final)
+        print(f"Agregados reconstruídos em {perf_counter() - inicio:.1f}s.")
+
+    reset_contador_ids()
+
+    return total
+
+
+def main(argumentos: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Gera um dataset sintético de leituras de sensores.")
+    banco = parser.add_mutually_exclusive_group()
+    banco.add_argument("--sqlite", help="Caminho do banco SQLite (padrão: database.db na pasta atual).")
+    banco.add_argument("--oracle", action="store_true", help="Usa o banco Oracle, com o login do iniciar_database.")
+    parser.add_argument("--sensores-por-tipo", type=int, default=10)
+    parser.add_argument("--leituras-por-sensor", type=int, default=100000)
+    parser.add_argument("--dias", type=float, default=30, help="Duração do período, terminando agora.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="Processos que geram as leituras.")
+    parser.add_argument("--tipos", nargs="+", choices=[tipo.name for tipo in TipoSensorEnum], default=[tipo.name for tipo in TipoSensorEnum])
+    parser.add_argument("--sem-agregados", action="store_true", help="Não reconstrói a LEITURA_SENSOR_AGREGADA.")
+    args = parser.parse_args(argumentos)
+
+    if args.oracle:
+        from src.database.login.iniciar_database import iniciar_database
+        iniciar_database()
+    else:
+        Database.init_sqlite(args.sqlite)
+
+    Database.create_all_tables()
+
+    data_final = datetime.now().replace(microsecond=0)
+
+    construir_dataset(
+        sensores_por_tipo=args.sensores_por_tipo,
+        leituras_por_sensor=args.leituras_por_sensor,
+        data_inicial=data_final - timedelta(days=args.dias),
+        data_final=data_final,
+        seed=args.seed,
+        workers=args.workers,
+        tipos=[TipoSensorEnum[nome] for nome in args.tipos],
+        reconstruir_agregados=not args.sem_agregados,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from src.database.models.sensor import TipoSensorEnum
+
+NS_POR_DIA = 86400 * 10**9
+
+
+@dataclass(frozen=True)
+class ModeloSinal:
+    """
+    Modelo do sinal gerado para um tipo de sensor: valor base, ciclo diário, deriva, ruído e picos de falha.
+    Os valores são calculados a partir do instante de cada leitura, então qualquer trecho do período pode ser gerado
+    separadamente (ex.: por processos diferentes) sem descontinuidades.
+
+    Args:
+        base (float): Valor médio no início do período.
+        amplitude_diaria (float): Amplitude do ciclo diário (senoide com máximo na hora_pico).
+        hora_pico (float): Hora do dia com o maior valor do ciclo diário.
+        deriva_por_dia (float): Variação do valor médio por dia (ex.: desgaste de um equipamento).
+        ruido (float): Desvio padrão do ruído gaussiano.
+        probabilidade_pico (float): Probabilidade de cada leitura ser um pico de falha.
+        pico_minimo (float): Menor acréscimo de um pico de falha.
+        pico_maximo (float): Maior acréscimo de um pico de falha.
+        minimo (float or None): Menor valor possível. Os picos de falha não são limitados pelo máximo.
+        maximo (float or None): Maior valor possível, fora os picos de falha.
+    """
+    base: float
+    amplitude_diaria: float = 0.0
+    hora_pico: float = 14.0
+    deriva_por_dia: float = 0.0
+    ruido: float = 0.0
+    probabilidade_pico: float = 0.0
+    pico_minimo: float = 0.0
+    pico_maximo: float = 0.0
+    minimo: Optional[float] = None
+    maximo: Optional[float] = None
+
+    def gerar(self, datas: np.ndarray, data_inicial: np.datetime64, rng: np.random.Generator) -> np.ndarray:
+        """
+        Gera os valores das leituras.
+        :param datas: Instantes das leituras (datetime64).
+        :param data_inicial: Início do período, usado para calcular a deriva.
+        :param rng: Gerador de números aleatórios.
+        :return: Valores das leituras (float64).
+        """
+        nanossegundos = datas.astype('datetime64[ns]').astype(np.int64)
+        dias = (nanossegundos - np.datetime64(data_inicial, 'ns').astype(np.int64)) / NS_POR_DIA
+        hora = (nanossegundos % NS_POR_DIA) / NS_POR_DIA * 24
+
+        valores = (
+            self.base
+            + self.deriva_por_dia * dias
+            + self.amplitude_diaria * np.cos((hora - self.hora_pico) / 24 * 2 * np.pi)
+        )
+
+        if self.ruido:
+            valores += rng.normal(0, self.ruido, len(valores))
+
+        if self.minimo is not None or self.maximo is not None:
+            valores = np.clip(valores, self.minimo, self.maximo)
+
+        if self.probabilidade_pico:
+            picos = np.flatnonzero(rng.random(len(valores)) < self.probabilidade_pico)
+            valores[picos] += rng.uniform(self.pico_minimo, self.pico_maximo, len(picos))
+
+        return valores
+
+
+def _modelo_padrao(tipo: TipoSensorEnum) -> ModeloSinal:
+    minimo, maximo = tipo.get_range_for_generation()
+
+    match tipo:
+        case TipoSensorEnum.LUX:
+            # luz do dia: máximo ao meio-dia e valor mínimo durante a noite
+            return ModeloSinal(base=20000.0, amplitude_diaria=50000.0, hora_pico=12.0, ruido=1500.0, minimo=minimo, maximo=maximo)
+        case TipoSensorEnum.TEMPERATURA:
+            return ModeloSinal(base=24.0, amplitude_diaria=5.0, hora_pico=15.0, deriva_por_dia=0.01, ruido=0.3, minimo=minimo, maximo=maximo)
+        case TipoSensorEnum.VIBRACAO:
+            # tendência de desgaste e picos de falha de 4 a 8, como no gerar_leituras_vibracao
+            return ModeloSinal(base=0.5, deriva_por_dia=0.02, ruido=0.5, probabilidade_pico=0.002, pico_minimo=4.0, pico_maximo=8.0, minimo=minimo, maximo=maximo)
+
+    return ModeloSinal(base=(minimo + maximo) / 2, ruido=(maximo - minimo) / 20, minimo=minimo, maximo=maximo)
+
+
+MODELOS_SINAL: dict[TipoSensorEnum, ModeloSinal] = {tipo: _modelo_padrao(tipo) for tipo in TipoSensorEnum}
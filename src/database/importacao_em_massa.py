@@ -0,0 +1,99 @@
+"""
+Importação em massa dos dados exportados do banco de dados.
+
+Em vez de salvar um registro por vez (uma sessão e um commit por linha), os registros são gravados em lotes, com um
+único comando por lote e uma transação por lote. Registros que já existem (mesmo id) são atualizados pelo upsert
+nativo do banco: INSERT ... ON CONFLICT no SQLite e MERGE no Oracle.
+"""
+import logging
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+from sqlalchemy import Connection, insert
+
+from src.database.reset_contador_ids import reset_contador_ids
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.model import Model
+from src.database.tipos_base.upsert import upsert
+from src.settings import IMPORTACAO_TAMANHO_LOTE
+
+
+@dataclass
+class ResultadoImportacao:
+    """
+    Resultado da importação de uma tabela.
+
+    Args:
+        tabela (str): Nome da tabela.
+        linhas (int): Quantidade de linhas gravadas (inseridas ou atualizadas).
+        segundos (float): Tempo gasto na conversão e na gravação.
+    """
+    tabela: str
+    linhas: int = 0
+    segundos: float = 0.0
+
+    @property
+    def linhas_por_segundo(self) -> float:
+        return self.linhas / self.segundos if self.segundos else 0.0
+
+
+def upsert_lote(connection: Connection, model: type[Model], lote: list[dict]):
+    """
+    Grava um lote de registros na tabela do model com um único comando, atualizando os que já existem.
+    Registros sem id são apenas inseridos.
+    :param connection: Conexão, dentro de uma transação.
+    :param model: Model da tabela.
+    :param lote: Registros com os mesmos campos, como retornados por Model.lotes_from_dataframe.
+    """
+    if not lote:
+        return
+
+    tabela = model.__table__
+
+    if 'id' not in lote[0]:
+        connection.execute(insert(tabela), lote)
+        return
+
+    upsert(connection, tabela, lote, chaves=['id'])
+
+
+def importar_em_massa(tabelas: Iterable[tuple[type[Model], pd.DataFrame]],
+                      tamanho_lote: int = IMPORTACAO_TAMANHO_LOTE,
+                      ao_concluir_tabela: Optional[Callable[[ResultadoImportacao], None]] = None,
+                      ) -> list[ResultadoImportacao]:
+    """
+    Importa os DataFrames para as tabelas em lotes, com uma transação por lote, e reseta os contadores de IDs uma
+    única vez ao final.
+    Os eventos do ORM não são disparados, então tabelas derivadas (ex.: os agregados das leituras) devem ser
+    reconstruídas após a importação.
+    :param tabelas: Pares (model, DataFrame), na ordem de importação.
+    :param tamanho_lote: Quantidade de registros gravados por transação.
+    :param ao_concluir_tabela: Função chamada com o resultado de cada tabela importada.
+    :return: Resultado de cada tabela.
+    """
+    resultados = []
+
+    for model, dataframe in tabelas:
+        resultado = ResultadoImportacao(tabela=model.__tablename__)
+        inicio = perf_counter()
+
+        for lote in model.lotes_from_dataframe(dataframe, tamanho_lote):
+            Database.executar_escrita(lambda session: upsert_lote(session.connection(), model, lote))
+            resultado.linhas += len(lote)
+
+        resultado.segundos = perf_counter() - inicio
+
+        logging.info(
+            f"{resultado.tabela}: {resultado.linhas} linhas em {resultado.segundos:.2f}s "
+            f"({resultado.linhas_por_segundo:.0f} linhas/s)"
+        )
+        resultados.append(resultado)
+
+        if ao_concluir_tabela is not None:
+            ao_concluir_tabela(resultado)
+
+    reset_contador_ids()
+
+    return resultados
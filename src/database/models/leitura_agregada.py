@@ -0,0 +1,506 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from enum import StrEnum
+from itertools import chain
+from typing import List, Optional, Iterable
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+from sqlalchemy import Sequence, ForeignKey, Float, DateTime, Enum, Integer, UniqueConstraint, Connection, select, delete, func, event, case, inspect
+from sqlalchemy.orm import Mapped, mapped_column, Session
+
+from src.database.models.sensor import LeituraSensor
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.model import Model
+from src.database.tipos_base.model_mixins.display import SimpleTableFilter
+from src.database.tipos_base.upsert import Atribuicao, upsert
+from src.settings import AGREGACOES_HABILITADAS
+
+
+class ResolucaoEnum(StrEnum):
+    MINUTO = "M"
+    HORA = "H"
+    DIA = "D"
+
+    def __str__(self):
+        match self.value:
+            case "M":
+                return "Minuto"
+            case "H":
+                return "Hora"
+            case "D":
+                return "Dia"
+
+        return super().__str__()
+
+    def duracao(self) -> timedelta:
+        match self.value:
+            case "M":
+                return timedelta(minutes=1)
+            case "H":
+                return timedelta(hours=1)
+
+        return timedelta(days=1)
+
+    def frequencia_pandas(self) -> str:
+        """
+        Retorna a frequência usada pelo pandas para truncar as datas nesta resolução.
+        """
+        match self.value:
+            case "M":
+                return "min"
+            case "H":
+                return "h"
+
+        return "D"
+
+
+# O Oracle não aceita mais de 1000 elementos em uma cláusula IN
+_MAX_ITENS_IN = 1000
+
+
+def _menor(nome: str) -> Atribuicao:
+    return lambda atual, novo: case((novo[nome] < atual[nome], novo[nome]), else_=atual[nome])
+
+
+def _maior(nome: str) -> Atribuicao:
+    return lambda atual, novo: case((novo[nome] > atual[nome], novo[nome]), else_=atual[nome])
+
+
+def _somar(nome: str) -> Atribuicao:
+    return lambda atual, novo: atual[nome] + novo[nome]
+
+
+# Combinação de um agregado existente com o agregado das novas leituras do mesmo intervalo
+_COMBINAR_AGREGADOS: dict[str, Atribuicao] = {
+    'quantidade': _somar('quantidade'),
+    'minimo': _menor('minimo'),
+    'maximo': _maior('maximo'),
+    'soma': _somar('soma'),
+    'soma_quadrados': _somar('soma_quadrados'),
+    'primeiro_valor': lambda atual, novo: case(
+        (novo['data_primeiro'] < atual['data_primeiro'], novo['primeiro_valor']), else_=atual['primeiro_valor']
+    ),
+    'data_primeiro': _menor('data_primeiro'),
+    'ultimo_valor': lambda atual, novo: case(
+        (novo['data_ultimo'] >= atual['data_ultimo'], novo['ultimo_valor']), else_=atual['ultimo_valor']
+    ),
+    'data_ultimo': _maior('data_ultimo'),
+}
+
+
+class LeituraSensorAgregada(Model):
+    """
+    Agregados das leituras de um sensor por minuto, hora ou dia.
+    São atualizados incrementalmente a cada leitura recebida e permitem que os gráficos de períodos
+    longos não precisem ler todas as linhas de LEITURA_SENSOR.
+    """
+
+    __tablename__ = 'LEITURA_SENSOR_AGREGADA'
+    __menu_group__ = "Sensores"
+    __menu_order__ = 4
+    __database_import_order__ = 13
+    __database_export__ = False
+
+    # Quantidade de importações em andamento que suspenderam o recálculo automático. É global ao processo, e não
+    # por thread, porque no modo de alta performance do SQLite as escritas rodam na thread do escritor único.
+    _suspensoes_recalculo: int = 0
+    _lock_suspensoes = threading.Lock()
+
+    __table_args__ = (
+        UniqueConstraint('sensor_id', 'resolucao', 'inicio', name='UQ_LEITURA_SENSOR_AGREGADA'),
+    )
+
+    __table_view_order_by__ = 'inicio'
+    __table_view_count_aproximado__ = True
+
+    __table_view_filters__ = [
+        SimpleTableFilter(field='sensor_id', label='Sensor', operator='=='),
+        SimpleTableFilter(field='resolucao', label='Resolução', operator='=='),
+    ]
+
+    @classmethod
+    def display_name(cls) -> str:
+        return "Leitura Agregada"
+
+    @classmethod
+    def display_name_plural(cls) -> str:
+        return "Leituras Agregadas"
+
+    def __str__(self):
+        return f"Sensor_id: {self.sensor_id} - {self.resolucao} - {self.inicio.strftime('%Y-%m-%d %H:%M:%S')} - {self.media}"
+
+    id: Mapped[int] = mapped_column(
+        Sequence(f"{__tablename__}_SEQ_ID"), primary_key=True, autoincrement=True, nullable=False
+    )
+
+    sensor_id: Mapped[int] = mapped_column(
+        ForeignKey('SENSOR.id'), nullable=False, info={'label': 'Sensor'}
+    )
+
+    resolucao: Mapped[ResolucaoEnum] = mapped_column(
+        Enum(ResolucaoEnum, length=15), nullable=False, info={'label': 'Resolução'}
+    )
+
+    inicio: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, info={'label': 'Início do Intervalo'}
+    )
+
+    quantidade: Mapped[int] = mapped_column(
+        Integer, nullable=False, info={'label': 'Quantidade'}
+    )
+
+    minimo: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Mínimo'}
+    )
+
+    maximo: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Máximo'}
+    )
+
+    soma: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Soma'}
+    )
+
+    soma_quadrados: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Soma dos Quadrados'}
+    )
+
+    primeiro_valor: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Primeiro Valor'}
+    )
+
+    ultimo_valor: Mapped[float] = mapped_column(
+        Float, nullable=False, info={'label': 'Último Valor'}
+    )
+
+    data_primeiro: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, info={'label': 'Data do Primeiro Valor'}
+    )
+
+    data_ultimo: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, info={'label': 'Data do Último Valor'}
+    )
+
+    @property
+    def media(self) -> float:
+        return self.soma / self.quantidade if self.quantidade else 0.0
+
+    @classmethod
+    def agregar_dataframe(cls, dataframe: pd.DataFrame, resolucao: ResolucaoEnum) -> pd.DataFrame:
+        """
+        Calcula os agregados de um DataFrame de leituras (sensor_id, data_leitura, valor) em uma resolução.
+        :param dataframe: Leituras a serem agregadas.
+        :param resolucao: Resolução dos intervalos.
+        :return: DataFrame com uma linha por (sensor_id, inicio) e as colunas de LEITURA_SENSOR_AGREGADA.
+        """
+        dataframe = dataframe.sort_values(['sensor_id', 'data_leitura'], kind='stable')
+        dataframe = dataframe.assign(
+            inicio=pd.to_datetime(dataframe['data_leitura']).dt.floor(resolucao.frequencia_pandas()),
+            valor_quadrado=dataframe['valor'] ** 2,
+        )
+
+        agregado = dataframe.groupby(['sensor_id', 'inicio'], sort=False).agg(
+            quantidade=('valor', 'size'),
+            minimo=('valor', 'min'),
+            maximo=('valor', 'max'),
+            soma=('valor', 'sum'),
+            soma_quadrados=('valor_quadrado', 'sum'),
+            primeiro_valor=('valor', 'first'),
+            ultimo_valor=('valor', 'last'),
+            data_primeiro=('data_leitura', 'first'),
+            data_ultimo=('data_leitura', 'last'),
+        ).reset_index()
+
+        agregado['resolucao'] = resolucao
+
+        return agregado
+
+    @staticmethod
+    def _registros(dataframe: pd.DataFrame) -> list[dict]:
+        """
+        Converte o DataFrame agregado em dicionários com tipos nativos do Python, prontos para o insert.
+        """
+        registros = dataframe.astype(object).to_dict('records')
+
+        for registro in registros:
+            for campo in ('inicio', 'data_primeiro', 'data_ultimo'):
+                registro[campo] = pd.Timestamp(registro[campo]).to_pydatetime()
+
+        return registros
+
+    @classmethod
+    def atualizar_com_leituras(cls, session: Session | Connection, linhas: list[dict]):
+        """
+        Atualiza incrementalmente os agregados de todas as resoluções com as leituras recebidas.
+        Deve ser chamado na mesma transação do insert das leituras.
+        :param session: Sessão ou conexão do SQLAlchemy.
+        :param linhas: Leituras inseridas, com sensor_id, data_leitura e valor.
+        """
+        if not linhas or not AGREGACOES_HABILITADAS:
+            return
+
+        leituras = pd.DataFrame(linhas, columns=['sensor_id', 'data_leitura', 'valor'])
+
+        # upsert atômico: os agregados existentes são combinados com os novos pelo próprio banco, então escritas
+        # concorrentes (vários workers da API, API e dashboard) não perdem incrementos
+        connection = session.connection() if isinstance(session, Session) else session
+
+        for resolucao in ResolucaoEnum:
+            upsert(
+                connection,
+                cls.__table__,
+                cls._registros(cls.agregar_dataframe(leituras, resolucao)),
+                chaves=['sensor_id', 'resolucao', 'inicio'],
+                atribuicoes=_COMBINAR_AGREGADOS,
+            )
+
+    @classmethod
+    def recalcular(cls, connection: Session | Connection, sensor_ids: Iterable[int], data_inicial: datetime, data_final: datetime):
+        """
+        Recalcula, a partir de LEITURA_SENSOR, os agregados dos sensores nos dias que contém o intervalo informado.
+        Usado quando leituras são alteradas ou removidas, o que não pode ser feito incrementalmente.
+        :param connection: Sessão ou conexão do SQLAlchemy.
+        :param sensor_ids: IDs dos sensores.
+        :param data_inicial: Início do intervalo.
+        :param data_final: Fim do intervalo.
+        """
+        if not AGREGACOES_HABILITADAS:
+            return
+
+        sensor_ids = list(sensor_ids)
+        # alinha o intervalo aos dias para que nenhum agregado fique parcialmente recalculado
+        inicio = datetime.combine(data_inicial.date(), datetime.min.time())
+        fim = datetime.combine(data_final.date(), datetime.min.time()) + timedelta(days=1)
+
+        tabela = cls.__table__
+        leituras = LeituraSensor.__table__
+
+        # um bloco de até 1000 sensores por vez
+        for indice in range(0, len(sensor_ids), _MAX_ITENS_IN):
+            bloco = sensor_ids[indice:indice + _MAX_ITENS_IN]
+
+            connection.execute(
+                delete(tabela).where(
+                    tabela.c.sensor_id.in_(bloco),
+                    tabela.c.inicio >= inicio,
+                    tabela.c.inicio < fim,
+                )
+            )
+
+            linhas = [
+                row._asdict() for row in connection.execute(
+                    select(leituras.c.sensor_id, leituras.c.data_leitura, leituras.c.valor).where(
+                        leituras.c.sensor_id.in_(bloco),
+                        leituras.c.data_leitura >= inicio,
+                        leituras.c.data_leitura < fim,
+                    )
+                )
+            ]
+
+            cls.atualizar_com_leituras(connection, linhas)
+
+    @classmethod
+    def reconstruir(cls, sensor_ids: Optional[List[int]] = None, data_inicial: Optional[datetime] = None, data_final: Optional[datetime] = None):
+        """
+        Reconstrói os agregados a partir de LEITURA_SENSOR, dia a dia, para não carregar a tabela inteira na memória.
+        Deve ser usado após importações ou cargas feitas sem passar pela API.
+        :param sensor_ids: IDs dos sensores. Se não for informado, reconstrói todos.
+        :param data_inicial: Início do período. Se não for informado, usa a leitura mais antiga.
+        :param data_final: Fim do período. Se não for informado, usa a leitura mais recente.
+        """
+        with Database.get_session() as session:
+            if sensor_ids is None:
+                sensor_ids = list(session.scalars(select(LeituraSensor.sensor_id).distinct()))
+
+            if data_inicial is None or data_final is None:
+                minimo, maximo = session.execute(
+                    select(func.min(LeituraSensor.data_leitura), func.max(LeituraSensor.data_leitura))
+                ).one()
+
+                if minimo is None:
+                    return
+
+                data_inicial = data_inicial or minimo
+                data_final = data_final or maximo
+
+        dia = data_inicial
+
+        while dia.date() <= data_final.date():
+            Database.executar_escrita(lambda s: cls.recalcular(s, sensor_ids, dia, dia))
+            dia += timedelta(days=1)
+
+    @classmethod
+    @contextmanager
+    def sem_recalculo(cls):
+        """
+        Suspende o recálculo dos agregados a cada flush do ORM, para cargas que salvam muitas leituras em vários
+        commits. Quem usar deve chamar reconstruir() ao final.
+        """
+        with cls._lock_suspensoes:
+            cls._suspensoes_recalculo += 1
+
+        try:
+            yield
+        finally:
+            with cls._lock_suspensoes:
+                cls._suspensoes_recalculo -= 1
+
+    @staticmethod
+    def escolher_resolucao(data_inicial: datetime, data_final: datetime, max_pontos: int) -> Optional[ResolucaoEnum]:
+        """
+        Escolhe a resolução mais grossa que ainda exibe o período com pelo menos max_pontos pontos, ou seja, cujo
+        intervalo não é maior que o passo necessário entre dois pontos.
+        :return: ResolucaoEnum, ou None quando o período é curto o suficiente para usar as leituras brutas.
+        """
+        passo = (data_final - data_inicial) / max_pontos
+        escolhida = None
+
+        for resolucao in ResolucaoEnum:
+            if resolucao.duracao() <= passo:
+                escolhida = resolucao
+
+        return escolhida
+
+    @classmethod
+    def contar_leituras(cls,
+                        sensor_id: Optional[int] = None,
+                        data_inicial: Optional[datetime] = None,
+                        data_final: Optional[datetime] = None,
+                        ) -> Optional[int]:
+        """
+        Estima a quantidade de leituras pela soma das quantidades dos agregados por hora (por dia, se não houver
+        período). Os intervalos parcialmente contidos no período são contados inteiros.
+        :return: Quantidade estimada, ou None se não houver agregados.
+        """
+        if not AGREGACOES_HABILITADAS:
+            return None
+
+        tabela = cls.__table__
+        resolucao = ResolucaoEnum.DIA if data_inicial is None and data_final is None else ResolucaoEnum.HORA
+        query = select(func.sum(tabela.c.quantidade)).where(tabela.c.resolucao == resolucao)
+
+        if sensor_id is not None:
+            query = query.where(tabela.c.sensor_id == sensor_id)
+
+        if data_inicial is not None:
+            query = query.where(tabela.c.inicio >= pd.Timestamp(data_inicial).floor('h').to_pydatetime())
+
+        if data_final is not None:
+            query = query.where(tabela.c.inicio <= data_final)
+
+        with Database.get_session() as session:
+            total = session.execute(query).scalar()
+
+        return int(total) if total is not None else None
+
+    @classmethod
+    def consultar_serie(cls,
+                        sensor_ids: Optional[List[int]],
+                        data_inicial: datetime,
+                        data_final: datetime,
+                        max_pontos: int,
+                        ) -> Optional[pd.DataFrame]:
+        """
+        Retorna a série dos sensores no período usando os agregados, quando o período é longo o suficiente.
+        :param sensor_ids: IDs dos sensores. None para todos os sensores.
+        :param data_inicial: Início do período.
+        :param data_final: Fim do período.
+        :param max_pontos: Quantidade de pontos desejada por sensor. A resolução escolhida retorna ao menos esta quantidade.
+        :return: DataFrame com sensor_id, data_leitura (início do intervalo), valor (média), minimo, maximo e
+        quantidade, ou None se as leituras brutas devem ser usadas.
+        """
+        if not AGREGACOES_HABILITADAS:
+            return None
+
+        resolucao = cls.escolher_resolucao(data_inicial, data_final, max_pontos)
+
+        if resolucao is None:
+            return None
+
+        tabela = cls.__table__
+        query = select(
+            tabela.c.sensor_id,
+            tabela.c.inicio.label('data_leitura'),
+            (tabela.c.soma / tabela.c.quantidade).label('valor'),
+            tabela.c.minimo,
+            tabela.c.maximo,
+            tabela.c.quantidade,
+        ).where(
+            tabela.c.resolucao == resolucao,
+            tabela.c.inicio >= pd.Timestamp(data_inicial).floor(resolucao.frequencia_pandas()).to_pydatetime(),
+            tabela.c.inicio <= data_final,
+        ).order_by(tabela.c.sensor_id, tabela.c.inicio)
+
+        if sensor_ids is None:
+            consultas = [query]
+        else:
+            sensor_ids = list(sensor_ids)
+
+            if not sensor_ids:
+                return None
+
+            consultas = [
+                query.where(tabela.c.sensor_id.in_(sensor_ids[indice:indice + _MAX_ITENS_IN]))
+                for indice in range(0, len(sensor_ids), _MAX_ITENS_IN)
+            ]
+
+        with Database.get_session() as session:
+            partes = [parte for consulta in consultas if not (parte := pd.read_sql(consulta, session.bind)).empty]
+
+        if not partes:
+            return None
+
+        return pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+
+
+def _dias_alterados(session: Session) -> dict[date, set[int]]:
+    """
+    Retorna, por dia, os sensores com leituras criadas, alteradas ou removidas pelo ORM no flush.
+    """
+    dias: dict[date, set[int]] = defaultdict(set)
+
+    for leitura in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(leitura, LeituraSensor):
+            continue
+
+        if leitura in session.dirty and not session.is_modified(leitura):
+            continue
+
+        dias[leitura.data_leitura.date()].add(leitura.sensor_id)
+
+        # em uma alteração, os agregados do sensor e do dia anteriores também precisam ser recalculados
+        estado = inspect(leitura)
+        sensor_anterior = estado.attrs.sensor_id.history.deleted
+        data_anterior = estado.attrs.data_leitura.history.deleted
+
+        if sensor_anterior or data_anterior:
+            data = data_anterior[0] if data_anterior else leitura.data_leitura
+            dias[data.date()].add(sensor_anterior[0] if sensor_anterior else leitura.sensor_id)
+
+    return dias
+
+
+def _recalcular_agregados_do_flush(session: Session, flush_context):
+    """
+    Mantém os agregados consistentes quando leituras são criadas, alteradas ou removidas pelo ORM (CRUD do dashboard,
+    geradores de dados). Os dias afetados são recalculados uma única vez por flush, e não a cada leitura.
+    As leituras recebidas pela API usam inserts em lote e atualizam os agregados em atualizar_com_leituras.
+    """
+    if LeituraSensorAgregada._suspensoes_recalculo:
+        return
+
+    dias = _dias_alterados(session)
+
+    if not dias:
+        return
+
+    connection = session.connection()
+
+    for dia, sensor_ids in dias.items():
+        inicio = datetime.combine(dia, datetime.min.time())
+        LeituraSensorAgregada.recalcular(connection, sensor_ids, inicio, inicio)
+
+
+event.listen(Session, 'after_flush', _recalcular_agregados_do_flush)
@@ -1,15 +1,18 @@
 from enum import StrEnum
-from typing import List, Self, Union, Any
+from typing import List, Self, Union, Any, Optional
 from datetime import datetime, date, time, timedelta
 
-from sqlalchemy import Sequence, String, ForeignKey, Float, DateTime, Enum
+from sqlalchemy import Sequence, String, ForeignKey, Float, DateTime, Enum, Index, BinaryExpression, func, select
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import operators
 
 import numpy as np
+import pandas as pd
 
 from src.database.tipos_base.database import Database
 from src.database.tipos_base.model import Model
 from src.database.tipos_base.model_mixins.display import SimpleTableFilter
+from src.plots.downsampling import expandir_min_max
 from src.plots.plot_config import GenericPlot, PlotField, TipoGrafico, OrderBy
 
 
@@ -167,6 +170,17 @@ class LeituraSensor(Model):
     __menu_order__ = 3
     __database_import_order__ = 12
 
+    # Os gráficos filtram por sensor e intervalo de datas, e a tabela pagina pela data da leitura
+    __table_args__ = (
+        Index('IX_LEITURA_SENSOR_SENSOR_DATA', 'sensor_id', 'data_leitura'),
+        # usado pela paginação da tabela e pelas consultas por período sem filtro de sensor
+        Index('IX_LEITURA_SENSOR_DATA', 'data_leitura'),
+    )
+
+    __table_view_order_by__ = 'data_leitura'
+    __table_view_count_aproximado__ = True
+    __tabelas_dependentes__ = ('LEITURA_SENSOR_AGREGADA',)
+
     __table_view_filters__ = [
         SimpleTableFilter(field='sensor_id', label='Sensor', operator='=='),
         SimpleTableFilter(field='data_leitura', label='Data da Leitura Inicial', operator='>=', optional=True),
@@ -216,14 +230,114 @@ class LeituraSensor(Model):
     )
 
     @classmethod
-    def get_leituras_for_sensor(cls, sensor_id: int, data_inicial: date, data_final: date) -> List['LeituraSensor']:
+    def get_leituras_for_sensor(cls, sensor_id: int, data_inicial: date, data_final: date, max_pontos: Optional[int] = None) -> List['LeituraSensor']:
+        """
+        Retorna as leituras do sensor entre as datas, ordenadas pela data da leitura.
+        :param max_pontos: Se informado e o período for longo, retorna o mínimo e o máximo de cada intervalo dos
+        agregados (leituras não salvas, sem id) em vez das leituras brutas, preservando os picos.
+        """
+        data_inicial = datetime.combine(data_inicial, time.min)
+        data_final = datetime.combine(data_final, time.max)
+
+        if max_pontos is not None:
+            from src.database.models.leitura_agregada import LeituraSensorAgregada # evita import circular
+
+            agregado = LeituraSensorAgregada.consultar_serie([sensor_id], data_inicial, data_final, max_pontos)
+
+            if agregado is not None:
+                return [
+                    cls(sensor_id=sensor_id, data_leitura=row.data_leitura.to_pydatetime(), valor=row.valor)
+                    for row in expandir_min_max(agregado).itertuples()
+                ]
+
         with Database.get_session() as session:
             return session.query(cls).filter(
                 cls.sensor_id == sensor_id,
-                cls.data_leitura >= datetime.combine(data_inicial, time.min),
-                cls.data_leitura <= datetime.combine(data_final, time.max)
+                cls.data_leitura >= data_inicial,
+                cls.data_leitura <= data_final
             ).order_by(cls.data_leitura).all()
 
+    @classmethod
+    def _filtros_agregaveis(cls, filters: Optional[List[BinaryExpression]]) -> Optional[tuple[Any, Any, Any]]:
+        """
+        Extrai dos filtros o sensor (==) e o período (>= e <= na data da leitura), os únicos que podem ser
+        respondidos pelos agregados.
+        :return: Tupla (sensor_id, data_inicial, data_final), com None nos ausentes, ou None se houver outros filtros.
+        """
+        valores = {}
+
+        for filtro in filters or []:
+            valores[(getattr(filtro.left, 'key', None), filtro.operator)] = getattr(filtro.right, 'value', None)
+
+        sensor_id = valores.pop(('sensor_id', operators.eq), None)
+        data_inicial = valores.pop(('data_leitura', operators.ge), None)
+        data_final = valores.pop(('data_leitura', operators.le), None)
+
+        if valores:
+            return None
+
+        return sensor_id, data_inicial, data_final
+
+    @classmethod
+    def contagem_aproximada(cls, filters: Optional[List[BinaryExpression]] = None) -> Optional[int]:
+        """
+        Estima a quantidade de leituras pela soma das quantidades dos agregados por hora, ou pelas estatísticas do
+        banco quando não há agregados e nenhum filtro.
+        """
+        from src.database.models.leitura_agregada import LeituraSensorAgregada # evita import circular
+
+        filtros = cls._filtros_agregaveis(filters)
+
+        if filtros is None:
+            return None
+
+        total = LeituraSensorAgregada.contar_leituras(*filtros)
+
+        if total is None and not filters:
+            return Database.contagem_estimada(cls.__tablename__)
+
+        return total
+
+    @classmethod
+    def get_data_for_plot_agregado(cls, filters: Optional[List[BinaryExpression]], max_pontos: int) -> Optional[pd.DataFrame]:
+        """
+        Usa os agregados de LEITURA_SENSOR_AGREGADA quando o gráfico filtra apenas pelo sensor e pelo período
+        e o período é longo demais para ser exibido com as leituras brutas.
+        """
+        from src.database.models.leitura_agregada import LeituraSensorAgregada, ResolucaoEnum # evita import circular
+
+        filtros = cls._filtros_agregaveis(filters)
+
+        if filtros is None or filtros[0] is None:
+            return None
+
+        sensor_id, data_inicial, data_final = filtros
+
+        if data_inicial is None or data_final is None:
+            tabela = LeituraSensorAgregada.__table__
+
+            with Database.get_session() as session:
+                minimo, maximo = session.execute(
+                    select(func.min(tabela.c.inicio), func.max(tabela.c.data_ultimo)).where(
+                        tabela.c.sensor_id == sensor_id,
+                        tabela.c.resolucao == ResolucaoEnum.DIA,
+                    )
+                ).one()
+
+            if minimo is None:
+                return None
+
+            data_inicial = data_inicial or minimo
+            data_final = data_final or maximo
+
+        agregado = LeituraSensorAgregada.consultar_serie([sensor_id], data_inicial, data_final, max_pontos)
+
+        if agregado is None:
+            return None
+
+        # mínimo e máximo de cada intervalo, e não a média, para que os picos (ex.: alarmes de vibração) apareçam
+        return expandir_min_max(agregado)
+
     @classmethod
     def random_range(cls, nullable: bool = True, quantity: int = 100, **kwargs) -> List[Self]:
         data_inicial = kwargs.get('values_by_name', {}).get(
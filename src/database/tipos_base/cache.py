@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Iterable, Optional
+import time
+
+
+_AUSENTE = object()
+
+
+class CacheLRU:
+    """
+    Cache em memória com limite de tamanho (LRU) e tempo de expiração (TTL) opcional.
+    É seguro para uso entre threads, pois a API roda em uma thread separada do dashboard.
+
+    Args:
+        tamanho_max (int): Quantidade máxima de itens. Ao ultrapassar, o item menos usado é descartado.
+        ttl (float or None): Tempo de vida dos itens em segundos. None para não expirar.
+        peso_max (int or None): Soma máxima dos pesos dos itens (ex.: linhas guardadas). Ao ultrapassar, os itens
+            menos usados são descartados. None para limitar apenas pela quantidade.
+    """
+
+    def __init__(self, tamanho_max: int = 1024, ttl: Optional[float] = None, peso_max: Optional[int] = None):
+        self.tamanho_max = tamanho_max
+        self.ttl = ttl
+        self.peso_max = peso_max
+        self.peso_total = 0
+        self.hits = 0
+        self.misses = 0
+        self._itens: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self._lock = Lock()
+
+    def _expirado(self, criado_em: float) -> bool:
+        return self.ttl is not None and time.monotonic() - criado_em > self.ttl
+
+    def get(self, chave: Hashable, default: Any = None) -> Any:
+        """
+        Retorna o valor da chave ou o default, contabilizando hit/miss.
+        :param chave: Chave a ser buscada.
+        :param default: Valor retornado quando a chave não está no cache ou expirou.
+        :return: Valor armazenado ou default.
+        """
+        with self._lock:
+            item = self._itens.get(chave, _AUSENTE)
+
+            if item is _AUSENTE or self._expirado(item[0]):
+                if item is not _AUSENTE:
+                    self._remover(chave)
+                self.misses += 1
+                return default
+
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return item[1]
+
+    def get_many(self, chaves: Iterable[Hashable]) -> tuple[dict[Hashable, Any], list[Hashable]]:
+        """
+        Busca várias chaves de uma vez.
+        :param chaves: Chaves a serem buscadas.
+        :return: Tupla (dicionário com as chaves encontradas, lista das chaves ausentes).
+        """
+        encontrados = {}
+        ausentes = []
+
+        for chave in chaves:
+            valor = self.get(chave, _AUSENTE)
+            if valor is _AUSENTE:
+                ausentes.append(chave)
+            else:
+                encontrados[chave] = valor
+
+        return encontrados, ausentes
+
+    def _remover(self, chave: Hashable):
+        self.peso_total -= self._itens.pop(chave)[2]
+
+    def _cheio(self) -> bool:
+        return len(self._itens) > self.tamanho_max or (self.peso_max is not None and self.peso_total > self.peso_max)
+
+    def set(self, chave: Hashable, valor: Any, peso: int = 1):
+        """
+        Armazena um valor, descartando os itens menos usados se o cache estiver cheio.
+        :param peso: Peso do valor, somado no limite peso_max.
+        """
+        with self._lock:
+            if chave in self._itens:
+                self._remover(chave)
+
+            self._itens[chave] = (time.monotonic(), valor, peso)
+            self.peso_total += peso
+
+            while self._itens and self._cheio():
+                self._remover(next(iter(self._itens)))
+
+    def invalidar(self, chave: Hashable = _AUSENTE):
+        """
+        Remove uma chave do cache. Se nenhuma chave for informada, limpa o cache inteiro.
+        """
+        with self._lock:
+            if chave is _AUSENTE:
+                self._itens.clear()
+                self.peso_total = 0
+            elif chave in self._itens:
+                self._remover(chave)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Retorna os contadores do cache.
+        :return: dict - Tamanho atual, tamanho máximo, peso atual, peso máximo, hits, misses e taxa de acerto.
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'tamanho': len(self._itens),
+                'tamanho_max': self.tamanho_max,
+                'peso': self.peso_total,
+                'peso_max': self.peso_max,
+                'hits': self.hits,
+                'misses': self.misses,
+                'taxa_acerto': self.hits / total if total else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._itens)
+
+
+def chave_expressoes(expressoes: Optional[Iterable[Any]]) -> tuple:
+    """
+    Monta uma chave de cache a partir de expressões do SQLAlchemy (filtros, order_by), usando o SQL de cada
+    expressão e o valor dos seus parâmetros.
+    :param expressoes: Expressões do SQLAlchemy, ou None.
+    :return: Tupla que pode ser usada como chave de cache.
+    """
+    if not expressoes:
+        return ()
+
+    chave = []
+
+    for expressao in expressoes:
+        compilado = expressao.compile()
+        chave.append((str(compilado), tuple(repr(parametro.value) for parametro in compilado.binds.values())))
+
+    return tuple(chave)
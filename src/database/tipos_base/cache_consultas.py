@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Hashable, Iterable, Optional, TypeVar
+
+import pandas as pd
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.database.tipos_base.cache import CacheLRU
+from src.database.tipos_base.versao_tabelas import versao_tabelas
+from src.settings import CACHE_CONSULTAS_TAMANHO_MAX, CACHE_CONSULTAS_TTL, CACHE_CONSULTAS_MAX_LINHAS, \
+    CACHE_CONSULTAS_MAX_LINHAS_TOTAL
+
+T = TypeVar('T')
+
+
+@dataclass(frozen=True)
+class _Registro:
+    """
+    Valores das colunas de uma instância de model guardada no cache.
+    """
+    model: type
+    valores: dict[str, Any]
+
+
+def _congelar(valor: Any) -> Any:
+    """
+    Converte o resultado no que é guardado no cache: as instâncias de models viram os valores das suas colunas, para
+    que quem recebe o resultado não altere o que está no cache.
+    """
+    if isinstance(valor, pd.DataFrame):
+        return valor.copy()
+
+    if isinstance(valor, (list, tuple)):
+        return type(valor)(_congelar(item) for item in valor)
+
+    mapper = getattr(type(valor), '__mapper__', None)
+
+    if mapper is not None:
+        return _Registro(type(valor), {atributo.key: getattr(valor, atributo.key) for atributo in mapper.column_attrs})
+
+    return valor
+
+
+def _descongelar(valor: Any) -> Any:
+    """
+    Monta uma cópia nova do resultado guardado pelo _congelar.
+    """
+    if isinstance(valor, pd.DataFrame):
+        return valor.copy()
+
+    if isinstance(valor, (list, tuple)):
+        return type(valor)(_descongelar(item) for item in valor)
+
+    if isinstance(valor, _Registro):
+        # como o ORM faz ao carregar uma linha: instância sem passar pelo __init__, com os valores já preenchidos
+        mapper = valor.model.__mapper__
+        instancia = mapper.class_manager.new_instance()
+        instancia.__dict__.update(valor.valores)
+
+        # com a chave primária, a cópia fica detached, como uma linha lida do banco, e pode ser usada no delete,
+        # update e merge; instâncias que não vieram do banco (sem id) continuam transient
+        if all(valor.valores.get(mapper.get_property_by_column(coluna).key) is not None for coluna in mapper.primary_key):
+            make_transient_to_detached(instancia)
+
+        return instancia
+
+    return valor
+
+
+def _tamanho(valor: Any) -> int:
+    return len(valor) if isinstance(valor, (pd.DataFrame, list)) else 1
+
+
+class CacheConsultas:
+    """
+    Cache dos resultados das consultas de leitura do dashboard.
+
+    Cada resultado guarda as versões (ver VersaoTabelas) das tabelas consultadas e é descartado quando alguma delas
+    recebe uma escrita, então o cache nunca devolve dados anteriores a uma escrita feita por este processo, como as
+    leituras gravadas pela API. O TTL cobre as escritas feitas por outros processos.
+
+    Args:
+        tamanho_max (int): Quantidade máxima de resultados em cache.
+        ttl (float or None): Tempo de vida dos resultados, em segundos.
+        max_linhas (int): Resultados com mais linhas que isso não são guardados.
+        max_linhas_total (int): Soma máxima das linhas dos resultados em cache. Ao ultrapassar, os resultados menos
+            usados são descartados.
+    """
+
+    def __init__(self,
+                 tamanho_max: int = CACHE_CONSULTAS_TAMANHO_MAX,
+                 ttl: Optional[float] = CACHE_CONSULTAS_TTL,
+                 max_linhas: int = CACHE_CONSULTAS_MAX_LINHAS,
+                 max_linhas_total: int = CACHE_CONSULTAS_MAX_LINHAS_TOTAL,
+                 ):
+        self.max_linhas = max_linhas
+        self._cache = CacheLRU(tamanho_max=tamanho_max, ttl=ttl, peso_max=max_linhas_total)
+
+    def obter(self, chave: Hashable, tabelas: Iterable[str], carregar: Callable[[], T]) -> T:
+        """
+        Retorna o resultado em cache, ou executa a consulta e guarda o resultado.
+        :param chave: Chave da consulta (model, filtros, campos, ordenação, limite...).
+        :param tabelas: Tabelas lidas pela consulta.
+        :param carregar: Função que executa a consulta.
+        :return: Resultado da consulta.
+        """
+        tabelas = tuple(tabelas)
+
+        # as versões são lidas antes da consulta: uma escrita durante a consulta invalida o resultado
+        versoes = versao_tabelas.versoes(tabelas)
+        item = self._cache.get(chave)
+
+        if item is not None and item[0] == versoes:
+            return _descongelar(item[1])
+
+        valor = carregar()
+        linhas = _tamanho(valor)
+
+        if linhas <= self.max_linhas:
+            self._cache.set(chave, (versoes, _congelar(valor)), peso=linhas)
+
+        return valor
+
+    def invalidar(self):
+        """
+        Descarta todos os resultados em cache.
+        """
+        self._cache.invalidar()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+cache_consultas = CacheConsultas()
+
+
+def em_cache(*tabelas: str):
+    """
+    Decorator que guarda o resultado da função no cache_consultas, usando os argumentos como chave.
+    Os argumentos precisam ser hashable.
+    :param tabelas: Tabelas lidas pela função.
+    """
+
+    def decorador(funcao: Callable[..., T]) -> Callable[..., T]:
+
+        @wraps(funcao)
+        def wrapper(*args, **kwargs) -> T:
+            chave = (funcao.__module__, funcao.__qualname__, args, tuple(sorted(kwargs.items())))
+            return cache_consultas.obter(chave, tabelas, lambda: funcao(*args, **kwargs))
+
+        return wrapper
+
+    return decorador
@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import BinaryExpression
+
+from src.database.tipos_base.cache import CacheLRU, chave_expressoes
+from src.database.tipos_base.versao_tabelas import versao_tabelas
+from src.settings import CONTAGEM_CACHE_TAMANHO_MAX, CONTAGEM_CACHE_TTL
+
+
+@dataclass(frozen=True)
+class Contagem:
+    """
+    Resultado de uma contagem de registros.
+
+    Args:
+        total (int): Quantidade de registros.
+        aproximada (bool): Se o total é uma estimativa (estatísticas do banco ou agregados).
+    """
+
+    total: int
+    aproximada: bool = False
+
+    def __str__(self):
+        return f"~{self.total}" if self.aproximada else str(self.total)
+
+
+class ContadorRegistros:
+    """
+    Contagem de registros com cache por (tabela, filtros).
+
+    Cada resultado guarda a versão da tabela (ver VersaoTabelas) e é descartado quando a tabela recebe uma escrita,
+    como as leituras gravadas pela API. No modo aproximado, a contagem usa as estatísticas do banco ou os agregados
+    do model, cujo custo não cresce com o tamanho da tabela.
+
+    Args:
+        tamanho_max (int): Quantidade máxima de contagens em cache.
+        ttl (float or None): Tempo de vida, em segundos, para cobrir escritas feitas por outros processos.
+    """
+
+    def __init__(self, tamanho_max: int = CONTAGEM_CACHE_TAMANHO_MAX, ttl: Optional[float] = CONTAGEM_CACHE_TTL):
+        self._cache = CacheLRU(tamanho_max=tamanho_max, ttl=ttl)
+
+    def contar(self, model: type[Any], filters: Optional[list[BinaryExpression]] = None, aproximada: bool = False) -> Contagem:
+        """
+        Conta os registros do model que atendem aos filtros.
+        :param model: Classe do model.
+        :param filters: Filtros da contagem.
+        :param aproximada: Se True, usa a estimativa do model quando disponível.
+        :return: Contagem.
+        """
+        tabela = model.__tablename__
+        chave = (tabela, chave_expressoes(filters), aproximada)
+
+        # a versão é lida antes da consulta: se houver uma escrita durante a contagem, o resultado já nasce inválido
+        versao = versao_tabelas.versao(tabela)
+        item = self._cache.get(chave)
+
+        if item is not None and item[0] == versao:
+            return item[1]
+
+        contagem = None
+
+        if aproximada:
+            total = model.contagem_aproximada(filters or None)
+
+            if total is not None:
+                contagem = Contagem(total, aproximada=True)
+
+        if contagem is None:
+            contagem = Contagem(model.count(filters=filters or None))
+
+        self._cache.set(chave, (versao, contagem))
+        return contagem
+
+    def invalidar(self):
+        """
+        Descarta todas as contagens em cache.
+        """
+        self._cache.invalidar()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+contador_registros = ContadorRegistros()
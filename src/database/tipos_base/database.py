@@ -1,36 +1,95 @@
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
 from io import StringIO
 from typing import Optional
-from sqlalchemy import create_engine, Engine, MetaData
+from sqlalchemy import create_engine, Engine, MetaData, event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Generator, AsyncGenerator, Callable, TypeVar
+import logging
 import json
 import os
 
-from sqlalchemy.sql.ddl import CreateTable
+from sqlalchemy.sql.ddl import CreateTable, CreateIndex
 
-from src.settings import SQL_ALCHEMY_DEBUG
+from src.database.tipos_base.escritor import EscritorUnico
+from src.database.tipos_base.pool import ConfiguracaoPool, QueuePoolMonitorado
+from src.database.tipos_base.versao_tabelas import versao_tabelas
+from src.settings import SQL_ALCHEMY_DEBUG, SQLITE_MODO_PERFORMANCE, SQLITE_PRAGMAS, SQLITE_ESCRITOR_TAMANHO_LOTE
 
 DEFAULT_DSN = "oracle.fiap.com.br:1521/ORCL"
 
+T = TypeVar('T')
+
+
+def _configurar_sqlite_performance(engine: Engine):
+    """
+    Aplica os PRAGMAs de performance (WAL, synchronous, cache_size, mmap_size, busy_timeout) em cada nova conexão.
+    Também delega o controle das transações ao SQLAlchemy, necessário para os SAVEPOINTs do escritor único.
+    https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl
+    """
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma, valor in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma}={valor}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+def _resolver_modo_performance(modo_performance: Optional[bool]) -> bool:
+    """
+    Retorna o modo de alta performance do SQLite informado ou, se não for informado, o da variável de ambiente
+    SQLITE_MODO_PERFORMANCE.
+    """
+    if modo_performance is None:
+        return os.environ.get('SQLITE_MODO_PERFORMANCE', str(SQLITE_MODO_PERFORMANCE)).lower() == 'true'
+
+    return modo_performance
+
+
 class Database:
 
     engine:Engine
     session:sessionmaker
 
+    async_engine:Optional[AsyncEngine] = None
+    async_session:Optional[async_sessionmaker] = None
+
+    # Thread única de escrita, usada apenas no modo de alta performance do SQLite
+    escritor:Optional[EscritorUnico] = None
+
     @staticmethod
-    def init_sqlite(path:Optional[str] = None):
+    def init_sqlite(path:Optional[str] = None, pool:Optional[ConfiguracaoPool] = None, modo_performance:Optional[bool] = None):
         """
         Inicializa a conexão com o banco de dados SQLite.
         :param path: Caminho do banco de dados SQLite.
+        :param pool: Configuração do pool de conexões. Se não for informada, é lida das variáveis de ambiente.
+        :param modo_performance: Ativa o modo de alta performance: WAL, PRAGMAs ajustados e todas as escritas
+        feitas por uma única thread, em transações agrupadas. Se não for informado, é lido da variável de
+        ambiente SQLITE_MODO_PERFORMANCE.
         :return:
         """
 
         if path is None:
             path = os.path.join(os.getcwd(), "database.db")
 
+        pool = pool or ConfiguracaoPool.from_env()
+
+        modo_performance = _resolver_modo_performance(modo_performance)
+
         # Cria o engine de conexão
-        engine = create_engine(f"sqlite:///{path}", echo=SQL_ALCHEMY_DEBUG)
+        engine = create_engine(f"sqlite:///{path}", echo=SQL_ALCHEMY_DEBUG, **pool.engine_kwargs())
+
+        if modo_performance:
+            _configurar_sqlite_performance(engine)
+
+        # Incrementa a versão das tabelas a cada escrita, invalidando os caches de leitura
+        versao_tabelas.registrar(engine)
 
         # Testa a conexão
         with engine.connect() as _:
@@ -38,18 +97,32 @@ class Database:
         Database.engine = engine
         Database.session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+        if Database.escritor is not None:
+            Database.escritor.parar()
+            Database.escritor = None
+
+        if modo_performance:
+            Database.escritor = EscritorUnico(engine, tamanho_lote=SQLITE_ESCRITOR_TAMANHO_LOTE)
+            logging.info("Modo de alta performance do SQLite ativado.")
+
     @staticmethod
-    def init_oracledb(user:str, password:str, dsn:str=DEFAULT_DSN):
+    def init_oracledb(user:str, password:str, dsn:str=DEFAULT_DSN, pool:Optional[ConfiguracaoPool] = None):
         '''
         Inicializa a conexão com o banco de dados Oracle.
         :param user: Nome do usuário do banco de dados.
         :param password: Senha do usuário do banco de dados.
         :param dsn: DSN do banco de dados.
+        :param pool: Configuração do pool de conexões. Se não for informada, é lida das variáveis de ambiente.
         :return:
         '''
 
+        pool = pool or ConfiguracaoPool.from_env()
+
         # Cria o engine de conexão
-        engine = create_engine(f"oracle+oracledb://{user}:{password}@{dsn}", echo=SQL_ALCHEMY_DEBUG)
+        engine = create_engine(f"oracle+oracledb://{user}:{password}@{dsn}", echo=SQL_ALCHEMY_DEBUG, **pool.engine_kwargs())
+
+        # Incrementa a versão das tabelas a cada escrita, invalidando os caches de leitura
+        versao_tabelas.registrar(engine)
 
         # Testa a conexão
         with engine.connect() as _:
@@ -57,6 +130,70 @@ class Database:
         Database.engine = engine
         Database.session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+    @staticmethod
+    def init_sqlite_async(path:Optional[str] = None, pool:Optional[ConfiguracaoPool] = None, modo_performance:Optional[bool] = None):
+        """
+        Inicializa o engine assíncrono (aiosqlite) do banco de dados SQLite.
+        Pode ser usado junto com o init_sqlite, apontando para o mesmo arquivo. As escritas assíncronas (ex.: save_async)
+        passam pelo executar_escrita do engine síncrono, então o init_sqlite também precisa ter sido chamado.
+        :param path: Caminho do banco de dados SQLite.
+        :param pool: Configuração do pool de conexões. Se não for informada, é lida das variáveis de ambiente.
+        :param modo_performance: Aplica os mesmos PRAGMAs e o controle de transações do modo de alta performance do
+        init_sqlite. Se não for informado, é lido da variável de ambiente SQLITE_MODO_PERFORMANCE.
+        :return:
+        """
+
+        if path is None:
+            path = os.path.join(os.getcwd(), "database.db")
+
+        pool = pool or ConfiguracaoPool.from_env()
+
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}", echo=SQL_ALCHEMY_DEBUG, **pool.engine_kwargs(assincrono=True))
+
+        if _resolver_modo_performance(modo_performance):
+            # os eventos de conexão são registrados no engine síncrono por trás do assíncrono
+            _configurar_sqlite_performance(engine.sync_engine)
+
+        logging.info(f"Engine assíncrono do SQLite criado.\n Path: {path}")
+        Database.init_async_from_engine(engine)
+
+    @staticmethod
+    def init_oracledb_async(user:str, password:str, dsn:str=DEFAULT_DSN, pool:Optional[ConfiguracaoPool] = None):
+        '''
+        Inicializa o engine assíncrono (oracledb em modo async) do banco de dados Oracle.
+        :param user: Nome do usuário do banco de dados.
+        :param password: Senha do usuário do banco de dados.
+        :param dsn: DSN do banco de dados.
+        :param pool: Configuração do pool de conexões. Se não for informada, é lida das variáveis de ambiente.
+        :return:
+        '''
+
+        pool = pool or ConfiguracaoPool.from_env()
+
+        engine = create_async_engine(f"oracle+oracledb_async://{user}:{password}@{dsn}", echo=SQL_ALCHEMY_DEBUG, **pool.engine_kwargs(assincrono=True))
+
+        logging.info("Engine assíncrono do Oracle criado.")
+        Database.init_async_from_engine(engine)
+
+    @staticmethod
+    def init_async_from_engine(engine:AsyncEngine):
+        """
+        Inicializa a sessão assíncrona a partir de um engine assíncrono já existente.
+        :param engine: Engine assíncrono do banco de dados.
+        :return:
+        """
+        versao_tabelas.registrar(engine.sync_engine)
+        Database.async_engine = engine
+        # expire_on_commit=False evita lazy loads (que não são permitidos no modo async) após o commit
+        Database.async_session = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    @staticmethod
+    def has_async() -> bool:
+        """
+        Indica se o engine assíncrono foi inicializado.
+        """
+        return Database.async_session is not None
+
     @staticmethod
     def init_from_session(engine:Engine, session:sessionmaker):
         """
@@ -65,6 +202,7 @@ class Database:
         :param session: SessionLocal do banco de dados.
         :return:
         """
+        versao_tabelas.registrar(engine)
         Database.engine = engine
         Database.session = session
 
@@ -92,6 +230,81 @@ class Database:
         finally:
             db.close()
 
+    @staticmethod
+    @asynccontextmanager
+    async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+        if Database.async_session is None:
+            raise RuntimeError("O engine assíncrono não foi inicializado. Use init_sqlite_async ou init_oracledb_async.")
+
+        db = Database.async_session()
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    @staticmethod
+    def executar_escrita(funcao:Callable[[Session], T]) -> T:
+        """
+        Executa uma escrita no banco de dados e faz o commit.
+        No modo de alta performance do SQLite, a escrita é enviada para o escritor único e agrupada com as
+        demais escritas pendentes em uma mesma transação.
+        :param funcao: Função que recebe a sessão e realiza a escrita. Não deve chamar commit.
+        :return: Retorno da função.
+        """
+        if Database.escritor is not None:
+            return Database.escritor.executar(funcao)
+
+        with Database.session(expire_on_commit=False) as session:
+            resultado = funcao(session)
+            session.commit()
+            return resultado
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        """
+        Retorna o estado do pool de conexões do engine síncrono: conexões em uso, overflow e
+        histograma do tempo de espera por uma conexão.
+        :return: dict - Estatísticas do pool, ou apenas o tipo do pool se ele não for monitorado.
+        """
+        engine = getattr(cls, 'engine', None)
+
+        if engine is None:
+            return {}
+
+        if isinstance(engine.pool, QueuePoolMonitorado):
+            return engine.pool.stats()
+
+        return {'pool': engine.pool.status()}
+
+    @classmethod
+    def contagem_estimada(cls, tabela: str) -> Optional[int]:
+        """
+        Retorna a quantidade de linhas da tabela pelas estatísticas do banco, sem percorrê-la:
+        sqlite_stat1 no SQLite (gerada pelo ANALYZE) e NUM_ROWS no Oracle (gerada pelo DBMS_STATS).
+        :param tabela: Nome da tabela.
+        :return: Quantidade estimada de linhas, ou None se não houver estatísticas.
+        """
+        match cls.engine.dialect.name:
+            case 'sqlite':
+                query = "SELECT stat FROM sqlite_stat1 WHERE tbl = :tabela"
+            case 'oracle':
+                query = "SELECT NUM_ROWS FROM USER_TABLES WHERE TABLE_NAME = :tabela"
+            case _:
+                return None
+
+        try:
+            with cls.engine.connect() as connection:
+                resultado = connection.execute(text(query), {'tabela': tabela}).scalar()
+        except DBAPIError:
+            # sqlite_stat1 só existe depois do primeiro ANALYZE
+            return None
+
+        if resultado is None:
+            return None
+
+        # no SQLite, o primeiro número da coluna stat é a quantidade de linhas
+        return int(str(resultado).split()[0])
+
     @classmethod
     def list_tables(cls) -> list[str]:
         """
@@ -138,6 +351,10 @@ class Database:
             print("Erro ao criar tabelas no banco de dados.")
             raise
 
+        # O create_all não cria índices novos em tabelas que já existem
+        from src.database.criar_indices import criar_indices_faltantes
+        criar_indices_faltantes()
+
     @classmethod
     def drop_all_tables(cls):
         """
@@ -175,6 +392,10 @@ class Database:
             ddl_statement = str(CreateTable(table).compile(cls.engine))
             output.write(ddl_statement + ";\n\n")
 
+            for index in sorted(table.indexes, key=lambda x: x.name):
+                ddl_statement = str(CreateIndex(index).compile(cls.engine))
+                output.write(ddl_statement + ";\n\n")
+
         return output.getvalue()
 
     @classmethod
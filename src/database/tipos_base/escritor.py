@@ -0,0 +1,118 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, TypeVar
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+T = TypeVar('T')
+
+
+class EscritorUnico:
+    """
+    Thread única de escrita no banco de dados.
+
+    Todas as escritas são enviadas para uma fila e executadas por esta thread, agrupando as operações
+    pendentes em uma única transação. Cada operação roda em um SAVEPOINT, então a falha de uma não
+    desfaz as demais do mesmo lote.
+    Usado no modo de alta performance do SQLite, onde só pode existir um escritor por vez.
+
+    Args:
+        engine (Engine): Engine do banco de dados.
+        tamanho_lote (int): Quantidade máxima de operações agrupadas em uma transação.
+    """
+
+    def __init__(self, engine: Engine, tamanho_lote: int = 100):
+        self.engine = engine
+        self.tamanho_lote = tamanho_lote
+        self._fila: queue.Queue[Optional[tuple[Callable[[Session], Any], Future]]] = queue.Queue()
+        self._thread = threading.Thread(target=self._executar, name="escritor-unico", daemon=True)
+        self._thread.start()
+
+    def executar(self, funcao: Callable[[Session], T]) -> T:
+        """
+        Executa a função na thread de escrita e aguarda o resultado.
+        :param funcao: Função que recebe a sessão e realiza a escrita. Não deve chamar commit.
+        :return: Retorno da função, após o commit da transação.
+        """
+        if threading.current_thread() is self._thread:
+            # chamada feita de dentro de outra escrita: executa direto para não travar a fila
+            return self._executar_isolado(funcao)
+
+        futuro: Future = Future()
+        self._fila.put((funcao, futuro))
+        return futuro.result()
+
+    def parar(self):
+        """
+        Executa as escritas pendentes e encerra a thread.
+        """
+        self._fila.put(None)
+        self._thread.join()
+
+    def _executar_isolado(self, funcao: Callable[[Session], T]) -> T:
+        with Session(bind=self.engine, expire_on_commit=False) as session:
+            resultado = funcao(session)
+            session.commit()
+            return resultado
+
+    def _proximo_lote(self) -> tuple[list[tuple[Callable[[Session], Any], Future]], bool]:
+        """
+        Aguarda a primeira operação e junta as que já estiverem na fila, sem esperar por novas.
+        :return: Tupla (operações, se a thread deve parar).
+        """
+        item = self._fila.get()
+
+        if item is None:
+            return [], True
+
+        lote = [item]
+
+        while len(lote) < self.tamanho_lote:
+            try:
+                item = self._fila.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is None:
+                return lote, True
+
+            lote.append(item)
+
+        return lote, False
+
+    def _executar(self):
+        parar = False
+
+        while not parar:
+            lote, parar = self._proximo_lote()
+
+            if not lote:
+                continue
+
+            resultados: list[tuple[Future, Any]] = []
+
+            try:
+                with Session(bind=self.engine, expire_on_commit=False) as session:
+                    for funcao, futuro in lote:
+                        try:
+                            with session.begin_nested():
+                                resultados.append((futuro, funcao(session)))
+                        except Exception as e:
+                            futuro.set_exception(e)
+
+                    session.commit()
+
+            except Exception as e:
+                logging.error(f"Erro ao gravar lote de {len(lote)} escritas: {e}")
+                # inclui as operações que não chegaram a rodar (ex.: falha ao abrir a sessão), senão quem as
+                # enviou ficaria esperando o resultado para sempre
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+
+            for futuro, resultado in resultados:
+                futuro.set_result(resultado)
@@ -0,0 +1,114 @@
+"""
+Metadados dos campos de cada model, calculados uma única vez por classe.
+
+Os métodos dos mixins (fields, get_field, get_field_display_name, to_dict, from_dataframe...) são chamados em laços
+sobre todas as linhas ou todos os campos, então a inspeção do mapper do SQLAlchemy é feita apenas na primeira vez.
+"""
+import base64
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable
+
+import pandas as pd
+from sqlalchemy import inspect, Column, Enum, DateTime, LargeBinary, Integer, Boolean
+
+
+def _para_objetos(serie: pd.Series) -> list:
+    """
+    Converte a Series para uma lista de objetos do Python, trocando os valores nulos do pandas por None.
+    """
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def _para_datas(serie: pd.Series) -> list:
+    """
+    Converte a Series para uma lista de datetime do Python. Valores inválidos viram None.
+    """
+    datas = pd.to_datetime(serie, errors='coerce')
+    # o numpy converte datetime64[us] diretamente para datetime (e NaT para None), bem mais rápido que o Timestamp
+    return datas.to_numpy(dtype='datetime64[us]').tolist()
+
+
+def _decodificar_binario(valor: Any) -> Any:
+    return base64.b64decode(valor) if isinstance(valor, str) else valor
+
+
+def _conversor_coluna(field) -> Callable[[pd.Series], list]:
+    """
+    Retorna a função que converte uma coluna inteira do DataFrame para os valores aceitos pelo campo do model.
+    :param field: Coluna do SQLAlchemy.
+    """
+
+    if isinstance(field.type, Enum):
+        enum_class = field.type.enum_class
+
+        def converter_enum(serie: pd.Series) -> list:
+            # converte cada valor distinto uma única vez
+            valores = {valor: enum_class(valor) for valor in serie.dropna().unique()}
+            return _para_objetos(serie.map(valores))
+
+        return converter_enum
+
+    if isinstance(field.type, DateTime):
+        return _para_datas
+
+    if isinstance(field.type, LargeBinary):
+        # LargeBinary é exportado em base64
+        return lambda serie: [_decodificar_binario(valor) for valor in _para_objetos(serie)]
+
+    if isinstance(field.type, Integer) and not isinstance(field.type, Boolean):
+
+        def converter_inteiro(serie: pd.Series) -> list:
+            # colunas inteiras com valores nulos são lidas pelo pandas como float
+            if pd.api.types.is_float_dtype(serie):
+                serie = serie.astype('Int64')
+            return _para_objetos(serie)
+
+        return converter_inteiro
+
+    return _para_objetos
+
+
+def rotulo_campo(field: Column) -> str:
+    """
+    Nome de exibição de uma coluna: o 'label' do info, ou o nome da coluna.
+    """
+    return field.info.get('label', field.name).title() if field.info else field.name.title()
+
+
+@dataclass(frozen=True)
+class MetadadosCampos:
+    """
+    Metadados imutáveis dos campos de um model.
+
+    Args:
+        colunas (tuple[Column, ...]): Colunas da tabela, na ordem de declaração.
+        nomes (tuple[str, ...]): Nomes das colunas.
+        por_nome (MappingProxyType): Coluna de cada nome.
+        rotulos (MappingProxyType): Nome de exibição de cada campo.
+        conversores (MappingProxyType): Função que converte uma coluna de DataFrame para os valores do campo.
+        chaves_atributos (tuple[str, ...]): Chaves dos atributos mapeados, usadas pelo to_dict.
+    """
+    colunas: tuple[Column, ...]
+    nomes: tuple[str, ...]
+    por_nome: MappingProxyType
+    rotulos: MappingProxyType
+    conversores: MappingProxyType
+    chaves_atributos: tuple[str, ...]
+
+    @classmethod
+    def da_classe(cls, model: type) -> 'MetadadosCampos':
+        """
+        Calcula os metadados a partir do mapper do model.
+        """
+        mapper = inspect(model)
+        colunas = tuple(mapper.c)
+
+        return cls(
+            colunas=colunas,
+            nomes=tuple(coluna.name for coluna in colunas),
+            por_nome=MappingProxyType({coluna.name: coluna for coluna in colunas}),
+            rotulos=MappingProxyType({coluna.name: rotulo_campo(coluna) for coluna in colunas}),
+            conversores=MappingProxyType({coluna.name: _conversor_coluna(coluna) for coluna in colunas}),
+            chaves_atributos=tuple(atributo.key for atributo in mapper.column_attrs),
+        )
@@ -25,6 +25,10 @@ class Model(DeclarativeBase,
             ):
 
     __database_import_order__:int = 100000
+    # tabelas derivadas de outras (ex.: agregados) não são exportadas nem importadas, são recalculadas
+    __database_export__:bool = True
+    # outras tabelas lidas pelas consultas do model (ex.: agregados), usadas para invalidar o cache de consultas
+    __tabelas_dependentes__:tuple[str, ...] = ()
     __generic_plot__:Optional[GenericPlot] = None
 
     @property
@@ -50,7 +54,7 @@ class Model(DeclarativeBase,
         :return: Model - Instância atualizada.
         """
         for key, value in data.items():
-            if key in self.field_names():
+            if key in self.metadados_campos().por_nome:
                 setattr(self, key, value)
 
         return self
@@ -130,3 +134,14 @@ class Model(DeclarativeBase,
         """
         return [cls.random(nullable=nullable) for _ in range(quantity)]
 
+
+    @classmethod
+    def get_data_for_plot_agregado(cls, filters: Optional[List[BinaryExpression]], max_pontos: int) -> Optional[pd.DataFrame]:
+        """
+        Permite que o model forneça dados já agregados para o gráfico genérico, evitando carregar todas as linhas
+        de períodos longos.
+        :param filters: Filtros aplicados ao gráfico.
+        :param max_pontos: Quantidade de pontos desejada no gráfico.
+        :return: DataFrame com as colunas dos eixos do gráfico, ou None para usar a consulta padrão.
+        """
+        return None
@@ -1,10 +1,14 @@
 from abc import abstractmethod
 
+import asyncio
 import logging
 
 from src.database.tipos_base.database import Database
-from sqlalchemy import inspect, BinaryExpression, UnaryExpression
-from typing import Self
+from src.database.tipos_base.cache_consultas import cache_consultas
+from src.settings import FK_OPCOES_POR_PAGINA
+from sqlalchemy import BinaryExpression, UnaryExpression, select, func, or_, false
+from sqlalchemy.sql import operators
+from typing import Self, Optional, Any
 
 class _ModelCrudMixin:
     """
@@ -42,10 +46,12 @@ class _ModelCrudMixin:
         :return: Model - Instância salva.
         """
 
-        with Database.get_session() as session:
+        def _salvar(session):
             session.add(self)
-            session.commit()
-            logging.info(f"Registro salvo com sucesso: {self.id}")
+            session.flush()
+
+        Database.executar_escrita(_salvar)
+        logging.info(f"Registro salvo com sucesso: {self.id}")
 
         return self
 
@@ -55,9 +61,7 @@ class _ModelCrudMixin:
         :return: Model - Instância salva.
         """
 
-        with Database.get_session() as session:
-            session.merge(self)
-            session.commit()
+        Database.executar_escrita(lambda session: session.merge(self))
 
         return self
 
@@ -67,13 +71,12 @@ class _ModelCrudMixin:
         :param kwargs: Atributos a serem atualizados.
         :return: Model - Instância atualizada.
         """
-        column_names = {col.key for col in inspect(self).mapper.column_attrs}
+        column_names = self.metadados_campos().chaves_atributos
         for key, value in kwargs.items():
             if key in column_names:
                 setattr(self, key, value)
 
-        with Database.get_session() as session:
-            session.commit()
+        Database.executar_escrita(lambda session: session.merge(self))
 
         return self
 
@@ -82,9 +85,7 @@ class _ModelCrudMixin:
         Remove a instância do banco de dados.
         :return: Model - Instância removida.
         """
-        with Database.get_session() as session:
-            session.delete(self)
-            session.commit()
+        Database.executar_escrita(lambda session: session.delete(self))
 
         return self
 
@@ -102,6 +103,79 @@ class _ModelCrudMixin:
 
             return session.query(cls).count()
 
+    @classmethod
+    def contagem_aproximada(cls, filters:list[BinaryExpression] or None = None) -> int | None:
+        """
+        Estima o número de registros sem percorrer a tabela. Por padrão, usa as estatísticas do banco quando não há
+        filtros. Os models podem sobrescrever para estimar também com filtros (ex.: a partir de tabelas de agregados).
+        :param filters: list[BinaryExpression] or None - Filtros a serem aplicados na contagem.
+        :return: int | None - Número estimado de registros, ou None se não for possível estimar.
+        """
+        if filters:
+            return None
+
+        return Database.contagem_estimada(cls.__tablename__)
+
+    @classmethod
+    def opcoes_chave_estrangeira(cls,
+                                 busca: str = "",
+                                 apos_id: Optional[int] = None,
+                                 limite: int = FK_OPCOES_POR_PAGINA,
+                                 ) -> tuple[list[tuple[int, str]], bool]:
+        """
+        Retorna uma página de opções (id, rótulo) para os seletores de chave estrangeira, sem carregar a tabela inteira.
+        A busca é feita pelo início do campo_busca() ou pelo id, quando for um número. As páginas são encadeadas pelo
+        id (keyset) e ficam no cache de consultas até a próxima escrita na tabela.
+        :param busca: Texto buscado.
+        :param apos_id: Último id da página anterior.
+        :param limite: Quantidade de opções por página.
+        :return: Opções da página e se existe uma próxima página.
+        """
+        busca = busca.strip()
+
+        def consultar() -> tuple[list[tuple[int, str]], bool]:
+            with Database.get_session() as session:
+                query = select(cls)
+
+                if busca:
+                    condicoes = []
+                    campo = cls.campo_busca()
+
+                    if campo is not None:
+                        condicoes.append(campo.istartswith(busca, autoescape=True))
+
+                    if busca.isdigit():
+                        condicoes.append(cls.id == int(busca))
+
+                    query = query.where(or_(*condicoes) if condicoes else false())
+
+                if apos_id is not None:
+                    query = query.where(cls.id > apos_id)
+
+                itens = session.scalars(query.order_by(cls.id).limit(limite + 1)).all()
+
+                return [(item.id, str(item)) for item in itens[:limite]], len(itens) > limite
+
+        chave = ('opcoes_chave_estrangeira', cls.__tablename__, busca, apos_id, limite)
+        opcoes, tem_proxima = cache_consultas.obter(chave, [cls.__tablename__], consultar)
+
+        return list(opcoes), tem_proxima
+
+    @classmethod
+    def rotulo_registro(cls, id: int) -> str | None:
+        """
+        Retorna o rótulo (str) do registro, usado para exibir o valor selecionado de um campo de chave estrangeira.
+        :param id: int - ID do registro.
+        :return: str | None - Rótulo, ou None se o registro não existir.
+        """
+
+        def consultar() -> str | None:
+            with Database.get_session() as session:
+                item = session.get(cls, id)
+                return None if item is None else str(item)
+
+        return cache_consultas.obter(('rotulo_registro', cls.__tablename__, id), [cls.__tablename__], consultar)
+
     @classmethod
     def first(cls,
               filters:list[BinaryExpression] or None = None,
@@ -126,6 +200,39 @@ class _ModelCrudMixin:
 
             return query.first()
 
+    @classmethod
+    def _ordenacao_invertida(cls, order_by: list[UnaryExpression] or None) -> list[UnaryExpression]:
+        """
+        Inverte a ordenação, para que os últimos registros sejam lidos primeiro com um LIMIT, em vez de contar e pular
+        as linhas com OFFSET. O id é usado como desempate, e sem order_by a ordenação é pelo id.
+        """
+        invertida = []
+
+        for expressao in order_by or []:
+            nulls = None
+
+            if isinstance(expressao, UnaryExpression) and expressao.modifier in (operators.nulls_first_op, operators.nulls_last_op):
+                nulls = expressao.modifier
+                expressao = expressao.element
+
+            if isinstance(expressao, UnaryExpression) and expressao.modifier == operators.desc_op:
+                expressao = expressao.element.asc()
+            elif isinstance(expressao, UnaryExpression) and expressao.modifier == operators.asc_op:
+                expressao = expressao.element.desc()
+            else:
+                expressao = expressao.desc()
+
+            if nulls == operators.nulls_first_op:
+                expressao = expressao.nulls_last()
+            elif nulls == operators.nulls_last_op:
+                expressao = expressao.nulls_first()
+
+            invertida.append(expressao)
+
+        invertida.append(cls.id.desc())
+
+        return invertida
+
     @classmethod
     def last(cls,
               filters:list[BinaryExpression] or None = None,
@@ -133,30 +240,171 @@ class _ModelCrudMixin:
               ) -> Self | None:
         """
         Busca o último registro que atende aos filtros fornecidos.
+        A ordenação é invertida e apenas a primeira linha é lida, o que usa o índice da ordenação quando existir.
         :param filters: list[BinaryExpression] or None - Filtros a serem aplicados na busca.
         :param order_by: list[UnaryExpression] or None - Ordenação a ser aplicada na busca.
         :return: Model | None - Última instância encontrada ou None.
         """
         with Database.get_session() as session:
 
-            query = session.query(cls)
+            query = select(cls)
 
             if filters:
-                query = query.filter(*filters)
+                query = query.where(*filters)
 
-            if order_by:
+            query = query.order_by(*cls._ordenacao_invertida(order_by)).limit(1)
 
-                query = query.order_by(*order_by)
+            return session.scalars(query).first()
+
+    @classmethod
+    def last_n(cls,
+               n: int,
+               filters:list[BinaryExpression] or None = None,
+               order_by: list[UnaryExpression] or None = None,
+               ) -> list[Self]:
+        """
+        Busca os n últimos registros que atendem aos filtros fornecidos (ex.: as últimas leituras de um sensor).
+        :param n: int - Quantidade de registros.
+        :param filters: list[BinaryExpression] or None - Filtros a serem aplicados na busca.
+        :param order_by: list[UnaryExpression] or None - Ordenação a ser aplicada na busca.
+        :return: list[Model] - Registros na ordem do order_by, terminando pelo último.
+        """
+        with Database.get_session() as session:
 
-                count = query.count()
+            query = select(cls)
 
-                if count == 0:
-                    return None
+            if filters:
+                query = query.where(*filters)
 
-                return query.offset(count - 1).first()
+            query = query.order_by(*cls._ordenacao_invertida(order_by)).limit(n)
 
-            else:
-                # se não tiver order_by, ordena pelo id
-                order_by = [cls.id.desc()]
-                query = query.order_by(*order_by)
-                return query.first()
\ No newline at end of file
+            return list(reversed(session.scalars(query).all()))
+
+    @classmethod
+    def latest_per_group(cls,
+                         group_by: list[Any],
+                         filters:list[BinaryExpression] or None = None,
+                         order_by: list[UnaryExpression] or None = None,
+                         ) -> list[Self]:
+        """
+        Busca o último registro de cada grupo (ex.: a última leitura de cada sensor) em uma única consulta, numerando
+        os registros de cada grupo com a window function ROW_NUMBER.
+        :param group_by: list - Campos que definem os grupos (ex.: [LeituraSensor.sensor_id]).
+        :param filters: list[BinaryExpression] or None - Filtros a serem aplicados antes do agrupamento.
+        :param order_by: list[UnaryExpression] or None - Ordenação que define o último registro de cada grupo.
+        :return: list[Model] - Último registro de cada grupo.
+        """
+        posicao = func.row_number().over(
+            partition_by=group_by,
+            order_by=cls._ordenacao_invertida(order_by),
+        ).label('posicao')
+
+        numerados = select(cls.id, posicao)
+
+        if filters:
+            numerados = numerados.where(*filters)
+
+        numerados = numerados.subquery()
+
+        query = (
+            select(cls)
+            .join(numerados, cls.id == numerados.c.id)
+            .where(numerados.c.posicao == 1)
+            .order_by(*group_by)
+        )
+
+        with Database.get_session() as session:
+            return list(session.scalars(query).all())
+
+    # Variantes assíncronas dos métodos mais usados.
+    # Necessitam que Database.init_sqlite_async ou Database.init_oracledb_async tenha sido chamado.
+
+    @classmethod
+    async def get_from_id_async(cls, id:int) -> Self:
+        """
+        Versão assíncrona do get_from_id.
+        :param id: int - ID da instância a ser buscada.
+        :return: Model - Instância encontrada.
+        """
+        async with Database.get_async_session() as session:
+            result = await session.execute(select(cls).where(cls.id == id))
+            return result.scalar_one()
+
+    @classmethod
+    async def all_async(cls) -> list[Self]:
+        """
+        Versão assíncrona do all.
+        :return: list[Model] - Lista de instâncias do modelo.
+        """
+        async with Database.get_async_session() as session:
+            result = await session.execute(select(cls).order_by(cls.id))
+            return list(result.scalars().all())
+
+    async def save_async(self) -> Self:
+        """
+        Versão assíncrona do save.
+        A gravação é feita pelo save em uma thread do executor, para que passe pelo Database.executar_escrita (e pela
+        thread única de escrita, no modo de alta performance do SQLite) sem bloquear o event loop.
+        :return: Model - Instância salva.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.save)
+
+    @classmethod
+    async def count_async(cls, filters:list[BinaryExpression] or None = None) -> int:
+        """
+        Versão assíncrona do count.
+        :param filters: list[BinaryExpression] or None - Filtros a serem aplicados na contagem.
+        :return: int - Número de registros.
+        """
+        query = select(func.count()).select_from(cls)
+
+        if filters:
+            query = query.where(*filters)
+
+        async with Database.get_async_session() as session:
+            result = await session.execute(query)
+            return result.scalar_one()
+
+    @classmethod
+    async def first_async(cls,
+              filters:list[BinaryExpression] or None = None,
+              order_by: list[UnaryExpression] or None = None,
+              ) -> Self | None:
+        """
+        Versão assíncrona do first.
+        :param filters: list[BinaryExpression] or None - Filtros a serem aplicados na busca.
+        :param order_by: list[UnaryExpression] or None - Ordenação a ser aplicada na busca.
+        :return: Model | None - Primeira instância encontrada ou None.
+        """
+        query = select(cls)
+
+        if filters:
+            query = query.where(*filters)
+
+        query = query.order_by(*order_by) if order_by else query.order_by(cls.id.asc())
+
+        async with Database.get_async_session() as session:
+            result = await session.execute(query.limit(1))
+            return result.scalars().first()
+
+    @classmethod
+    async def last_async(cls,
+              filters:list[BinaryExpression] or None = None,
+              order_by: list[UnaryExpression] or None = None,
+              ) -> Self | None:
+        """
+        Versão assíncrona do last.
+        :param filters: list[BinaryExpression] or None - Filtros a serem aplicados na busca.
+        :param order_by: list[UnaryExpression] or None - Ordenação a ser aplicada na busca.
+        :return: Model | None - Última instância encontrada ou None.
+        """
+        query = select(cls)
+
+        if filters:
+            query = query.where(*filters)
+
+        query = query.order_by(*cls._ordenacao_invertida(order_by))
+
+        async with Database.get_async_session() as session:
+            result = await session.execute(query.limit(1))
+            return result.scalars().first()
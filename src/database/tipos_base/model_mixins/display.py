@@ -1,5 +1,5 @@
-from typing import Literal, Any
-from sqlalchemy import BinaryExpression
+from typing import Literal, Any, Optional
+from sqlalchemy import BinaryExpression, Column
 from dataclasses import dataclass, replace
 from datetime import datetime
 
@@ -103,6 +103,12 @@ class _ModelDisplayMixin:
         __menu_order__ (int): Ordem de exibição no menu.
         __menu_group__ (str or None): Grupo do menu onde o modelo será exibido.
         __table_view_fields__ (list[str]): Campos a serem exibidos na visualização da tabela.
+        __table_view_order_by__ (str or None): Campo usado para ordenar (decrescente) e paginar a tabela, além do id.
+        __table_view_count__ (bool): Se a tabela exibe o total de registros.
+        __table_view_count_aproximado__ (bool): Se o total exibido pode ser estimado (estatísticas do banco ou
+            agregados) em vez de contado. Use em tabelas muito grandes.
+        __fk_search_field__ (str or None): Campo de texto usado na busca por prefixo quando o modelo é escolhido em
+            um campo de chave estrangeira. Se None, usa o campo 'nome', quando existir.
 
     """
 
@@ -112,6 +118,10 @@ class _ModelDisplayMixin:
     __table_view_fields__: list[str] = None
     __table_view_filters__: list[SimpleTableFilter] or None = None
     __table_view_itens_per_page__: int = 50
+    __table_view_order_by__: str or None = None
+    __table_view_count__: bool = True
+    __table_view_count_aproximado__: bool = False
+    __fk_search_field__: str or None = None
 
     # def __str__(self):
     #     """
@@ -119,6 +129,15 @@ class _ModelDisplayMixin:
     #     """
     #     return self.display_name()
 
+    @classmethod
+    def campo_busca(cls) -> Optional[Column]:
+        """
+        Retorna o campo usado na busca dos seletores de chave estrangeira.
+        :return: Column or None - Campo de busca, ou None se a busca for apenas pelo id.
+        """
+        nome = cls.__fk_search_field__ or 'nome'
+        return cls.metadados_campos().por_nome.get(nome)
+
     @classmethod
     def display_name(cls) -> str:
         """
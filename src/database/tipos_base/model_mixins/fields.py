@@ -3,7 +3,9 @@ AVISO: Este arquivo define apenas mixins para uso em herança múltipla.
 NÃO importe este arquivo diretamente como módulo principal.
 """
 
-from sqlalchemy import inspect, Column, String
+from sqlalchemy import Column, String
+
+from src.database.tipos_base.metadados_campos import MetadadosCampos, rotulo_campo
 
 
 class _ModelFieldsMixin:
@@ -11,13 +13,28 @@ class _ModelFieldsMixin:
     Mixin to add model fields to a class.
     """
 
+    @classmethod
+    def metadados_campos(cls) -> MetadadosCampos:
+        """
+        Retorna os metadados dos campos da classe, calculados no primeiro uso.
+        :return: MetadadosCampos - Metadados imutáveis dos campos.
+        """
+        # procura apenas na própria classe, para que uma subclasse não use os metadados da classe base
+        metadados = cls.__dict__.get('_metadados_campos')
+
+        if metadados is None:
+            metadados = MetadadosCampos.da_classe(cls)
+            cls._metadados_campos = metadados
+
+        return metadados
+
     @classmethod
     def field_names(cls) -> list[str]:
         """
         Retorna os campos da classe.
         :return: List[str] - Lista com os nomes dos campos.
         """
-        return [column.name for column in inspect(cls).c]
+        return list(cls.metadados_campos().nomes)
 
     @classmethod
     def fields(cls) -> list[Column]:
@@ -25,7 +42,7 @@ class _ModelFieldsMixin:
         Retorna os campos da classe.
         :return: List[str] - Lista com os nomes dos campos.
         """
-        return [column for column in inspect(cls).c]
+        return list(cls.metadados_campos().colunas)
 
     @classmethod
     def get_field(cls, field_name: str) -> Column:
@@ -34,9 +51,10 @@ class _ModelFieldsMixin:
         :param field_name: str - Nome do campo.
         :return: Column - Campo correspondente ao nome fornecido.
         """
-        for column in inspect(cls).c:
-            if column.name == field_name:
-                return column
+        column = cls.metadados_campos().por_nome.get(field_name)
+
+        if column is not None:
+            return column
 
         raise ValueError(f"Campo '{field_name}' não encontrado na classe '{cls.__name__}'.")
 
@@ -44,16 +62,22 @@ class _ModelFieldsMixin:
     def get_field_display_name(cls, field_name: str | Column) -> str:
         """
         Retorna o nome de exibição do campo com base no nome fornecido.
-        :param field_name: str - Nome do campo.
+        :param field_name: str - Nome do campo, ou a coluna (que pode ser de outra classe, ex.: em um join).
         :return: str - Nome de exibição do campo.
         """
 
         if isinstance(field_name, Column):
-            field = field_name
-        else:
-            field = cls.get_field(field_name)
+            if cls.metadados_campos().por_nome.get(field_name.name) is not field_name:
+                return rotulo_campo(field_name)
+
+            field_name = field_name.name
+
+        rotulo = cls.metadados_campos().rotulos.get(field_name)
+
+        if rotulo is None:
+            raise ValueError(f"Campo '{field_name}' não encontrado na classe '{cls.__name__}'.")
 
-        return field.info.get('label', field.name).title() if field.info else field.name.title()
+        return rotulo
 
     @classmethod
     def validate_field(cls, field_name: str, value) -> str | None:
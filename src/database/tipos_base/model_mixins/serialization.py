@@ -4,17 +4,89 @@ NÃO importe este arquivo diretamente como módulo principal.
 """
 import json
 import logging
+from dataclasses import dataclass
 from io import BytesIO
-from typing import Self, Optional
-from sqlalchemy import inspect, String, Enum, Float, Boolean, Integer, DateTime, BinaryExpression, UnaryExpression, LargeBinary
+from typing import Self, Optional, Any, Callable, Iterator
+from sqlalchemy import String, Enum, Float, Boolean, Integer, DateTime, BinaryExpression, UnaryExpression, LargeBinary, ColumnElement, and_, or_, select, true, false
+from sqlalchemy.sql import operators
 import pandas as pd
 from typing import List
 from src.database.tipos_base.database import Database
+from src.database.tipos_base.cache import chave_expressoes
+from src.database.tipos_base.cache_consultas import cache_consultas
 from src.database.tipos_base.model_mixins.fields import _ModelFieldsMixin
+from src.settings import IMPORTACAO_TAMANHO_LOTE, EXPORTACAO_TAMANHO_LOTE
 from PIL import Image
 import base64
 
 
+@dataclass(frozen=True)
+class CursorPaginacao:
+    """
+    Posição na paginação por chave (keyset): em vez de pular linhas com OFFSET, a consulta continua a partir dos
+    valores dos campos de ordenação de uma linha de referência, o que tem o mesmo custo em qualquer página.
+
+    Args:
+        valores (tuple): Valores dos campos de ordenação da linha de referência, na ordem do order_by. Pode ter menos
+            valores que o order_by (ex.: apenas a data, para pular para um instante).
+        anterior (bool): Se True, retorna a página anterior à linha de referência em vez da seguinte.
+        inclusivo (bool): Se True, a linha de referência também é retornada.
+    """
+
+    valores: tuple
+    anterior: bool = False
+    inclusivo: bool = False
+
+
+@dataclass(frozen=True)
+class PaginaDataframe:
+    """
+    Página retornada pela paginação por chave.
+
+    Args:
+        dataframe (pd.DataFrame): Linhas da página.
+        primeira_chave (tuple or None): Valores de ordenação da primeira linha, usados para a página anterior.
+        ultima_chave (tuple or None): Valores de ordenação da última linha, usados para a próxima página.
+        tem_anterior (bool): Se existe uma página anterior.
+        tem_proxima (bool): Se existe uma próxima página.
+    """
+
+    dataframe: pd.DataFrame
+    primeira_chave: Optional[tuple]
+    ultima_chave: Optional[tuple]
+    tem_anterior: bool
+    tem_proxima: bool
+
+
+def _valor_python(valor: Any) -> Any:
+    """
+    Converte os valores do pandas/numpy (Timestamp, int64...) para os tipos do Python, aceitos pelos drivers.
+    Valores nulos (None, NaN, NaT) viram None.
+    """
+    if pd.api.types.is_scalar(valor) and pd.isna(valor):
+        return None
+
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+
+    return valor.item() if hasattr(valor, 'item') else valor
+
+
+def _formatador_exportacao(field, base64_binarios: bool = True) -> Optional[Callable[[Any], Any]]:
+    """
+    Retorna a função que formata um valor do campo para a exportação, ou None se o valor é exportado como está.
+    Enum é exportado pelo valor e LargeBinary em base64, como no as_dataframe_all.
+    :param base64_binarios: Se False, LargeBinary é exportado como bytes (para formatos binários, como o Parquet).
+    """
+    if isinstance(field.type, Enum):
+        return lambda valor: getattr(valor, 'value', valor)
+
+    if isinstance(field.type, LargeBinary) and base64_binarios:
+        return lambda valor: base64.b64encode(valor).decode('utf-8') if isinstance(valor, (bytes, bytearray)) else valor
+
+    return None
+
+
 class _ModelSerializationMixin(_ModelFieldsMixin):
     """
     Mixin onde os métodos de serialização são definidos.
@@ -25,7 +97,7 @@ class _ModelSerializationMixin(_ModelFieldsMixin):
         Converte a instância do modelo em um dicionário.
         :return: dict - Dicionário com os atributos da instância.
         """
-        return {column.key: getattr(self, column.key) for column in inspect(self).mapper.column_attrs}
+        return {key: getattr(self, key) for key in self.metadados_campos().chaves_atributos}
 
     @classmethod
     def from_dict(cls, data: dict) -> Self:
@@ -48,56 +120,39 @@ class _ModelSerializationMixin(_ModelFieldsMixin):
         :param data: DataFrame - Dados a serem convertidos.
         :return: List[Model] - Lista de instâncias do modelo.
         """
-        instances = []
-        for _, row in data.iterrows():
-            data = {}
-            row = row.where(pd.notnull(row), None)
-            data_raw = row.to_dict()
-
-            for field in cls.fields():
-
-                if isinstance(field.type, Enum):
-
-                    data[field.name] = None if data_raw.get(field.name) is None else field.type.enum_class(
-                        data_raw[field.name])
+        return list(cls.iter_from_dataframe(data))
 
-                elif isinstance(field.type, Float):
-                    data[field.name] = data_raw.get(field.name)
-
-                elif isinstance(field.type, Integer):
-                    data[field.name] = data_raw.get(field.name)
-
-                elif isinstance(field.type, Boolean):
-                    data[field.name] = data_raw.get(field.name)
-
-                elif isinstance(field.type, String):
-                    data[field.name] = data_raw.get(field.name)
-
-                elif isinstance(field.type, DateTime):
-                    data[field.name] = None if data_raw.get(field.name) is None else pd.to_datetime(
-                        data_raw[field.name], errors='coerce')
-
-                elif isinstance(field.type, LargeBinary):
-                    # LargeBinary pode ser convertido para bytes
-
-                    if isinstance(data_raw.get(field.name), bytes):
-                        data[field.name] = data_raw.get(field.name)
-
-                    elif isinstance(data_raw.get(field.name), str):
-
-                        data[field.name] = base64.b64decode(data_raw.get(field.name))
-
-                    else:
-                        data[field.name] = data_raw.get(field.name)
+    @classmethod
+    def iter_from_dataframe(cls, data: pd.DataFrame, tamanho_lote: int = IMPORTACAO_TAMANHO_LOTE) -> Iterator[Self]:
+        """
+        Cria as instâncias do modelo a partir de um DataFrame sob demanda, sem manter todas em memória.
+        :param data: DataFrame - Dados a serem convertidos.
+        :param tamanho_lote: Quantidade de linhas convertidas de cada vez.
+        :return: Iterator[Model] - Instâncias do modelo.
+        """
+        for lote in cls.lotes_from_dataframe(data, tamanho_lote):
+            for registro in lote:
+                yield cls(**registro)
 
-                else:
-                    data[field.name] = data_raw.get(field.name)
+    @classmethod
+    def lotes_from_dataframe(cls, data: pd.DataFrame, tamanho_lote: int = IMPORTACAO_TAMANHO_LOTE) -> Iterator[List[dict]]:
+        """
+        Converte o DataFrame em lotes de dicionários com os valores já convertidos para os tipos dos campos, prontos
+        para um insert em massa (session.execute(insert(Model), lote)) ou para criar as instâncias.
+        As conversões são feitas por coluna, uma vez por lote, em vez de linha a linha.
+        Campos que não estão no DataFrame ficam fora dos dicionários, para que o banco use o valor padrão.
+        :param data: DataFrame - Dados a serem convertidos.
+        :param tamanho_lote: Quantidade de linhas de cada lote.
+        :return: Iterator[List[dict]] - Lotes de registros.
+        """
+        conversores = cls.metadados_campos().conversores
+        nomes = [nome for nome in conversores if nome in data.columns]
 
-            # converte na do pandas para None e cria a instancia
+        for inicio in range(0, len(data), tamanho_lote):
+            parte = data.iloc[inicio:inicio + tamanho_lote]
+            colunas = [conversores[nome](parte[nome]) for nome in nomes]
 
-            instance = cls(**data)
-            instances.append(instance)
-        return instances
+            yield [dict(zip(nomes, valores)) for valores in zip(*colunas)]
 
     @classmethod
     def as_dataframe_all(cls, select_fields: Optional[List[str]] = None) -> pd.DataFrame:
@@ -139,6 +194,41 @@ class _ModelSerializationMixin(_ModelFieldsMixin):
 
             return df
 
+    @classmethod
+    def iter_linhas_exportacao(cls,
+                               tamanho_lote: int = EXPORTACAO_TAMANHO_LOTE,
+                               base64_binarios: bool = True,
+                               ) -> Iterator[List[tuple]]:
+        """
+        Lê todos os registros da tabela em lotes, com um cursor no servidor (yield_per), sem carregar a tabela
+        inteira em memória. Os valores já vêm formatados para exportação, na ordem de cls.fields().
+        :param tamanho_lote: Quantidade de linhas lidas do banco de cada vez.
+        :param base64_binarios: Se False, os campos LargeBinary são retornados como bytes.
+        :return: Iterator[List[tuple]] - Lotes de linhas.
+        """
+        campos = cls.fields()
+        formatadores = [(indice, formatador) for indice, campo in enumerate(campos)
+                        if (formatador := _formatador_exportacao(campo, base64_binarios)) is not None]
+
+        with Database.get_session() as session:
+            resultado = session.execute(
+                select(*campos).order_by(cls.id).execution_options(yield_per=tamanho_lote)
+            )
+
+            for lote in resultado.partitions():
+                if not formatadores:
+                    yield [tuple(linha) for linha in lote]
+                    continue
+
+                linhas = []
+                for linha in lote:
+                    valores = list(linha)
+                    for indice, formatador in formatadores:
+                        valores[indice] = formatador(valores[indice])
+                    linhas.append(tuple(valores))
+
+                yield linhas
+
     @classmethod
     def as_dataframe_display_all(cls, select_fields: Optional[List[str]] = None) -> pd.DataFrame:
         """
@@ -171,10 +261,45 @@ class _ModelSerializationMixin(_ModelFieldsMixin):
                          select_fields: Optional[List[str]] = None,
                          as_display: bool = False,
                          offset: Optional[int] = None,
-                         limit: Optional[int] = None
+                         limit: Optional[int] = None,
+                         cursor: Optional[CursorPaginacao] = None,
                          ) -> pd.DataFrame:
         """
         Obtém os dados da instância formatados para plotagem.
+        O resultado fica no cache_consultas até a próxima escrita na tabela.
+        :param cursor: Posição da paginação por chave. Quando informado, o order_by é completado com o id para que a
+        ordenação seja única, e as linhas são retornadas a partir do cursor (use no lugar do offset).
+        """
+        chave = (
+            'filter_dataframe',
+            cls.__tablename__,
+            chave_expressoes(filters),
+            chave_expressoes(order_by),
+            tuple(select_fields) if select_fields is not None else None,
+            as_display,
+            offset,
+            limit,
+            cursor,
+        )
+
+        return cache_consultas.obter(
+            chave,
+            [cls.__tablename__],
+            lambda: cls._consultar_dataframe(filters, order_by, select_fields, as_display, offset, limit, cursor),
+        )
+
+    @classmethod
+    def _consultar_dataframe(cls,
+                             filters: Optional[List[BinaryExpression]],
+                             order_by: Optional[List[UnaryExpression]],
+                             select_fields: Optional[List[str]],
+                             as_display: bool,
+                             offset: Optional[int],
+                             limit: Optional[int],
+                             cursor: Optional[CursorPaginacao],
+                             ) -> pd.DataFrame:
+        """
+        Executa a consulta do filter_dataframe, sem passar pelo cache.
         """
 
         # faz um query com o sqlalchemy filtrando pelos filters do generic_plot e ordernando pelos order_by do generic_plot
@@ -185,7 +310,14 @@ class _ModelSerializationMixin(_ModelFieldsMixin):
             if filters is not None:
                 query = query.filter(*filters)
 
-            if order_by:
+            if cursor is not None:
+                ordenacao = cls._ordenacao_keyset(order_by)
+                query = query.filter(cls.filtro_keyset(ordenacao, cursor))
+
+                # a página anterior é lida na ordem inversa, a partir do cursor, e invertida depois
+                query = query.order_by(*cls._order_by_keyset(ordenacao, inverter=cursor.anterior))
+
+            elif order_by:
                 query = query.order_by(*order_by)
 
             else:
@@ -214,10 +346,182 @@ class _ModelSerializationMixin(_ModelFieldsMixin):
 
             dataframe = pd.read_sql(query.statement, session.bind)
 
+            if cursor is not None and cursor.anterior:
+                dataframe = dataframe.iloc[::-1].reset_index(drop=True)
+
             if as_display:
                 colum_names = {}
                 for column in dataframe.columns:
 
                     colum_names[column] = cls.get_field_display_name(column)
                 dataframe = dataframe.rename(columns=colum_names)
-            return dataframe
\ No newline at end of file
+            return dataframe
+
+    @classmethod
+    def _ordenacao_keyset(cls, order_by: Optional[List[UnaryExpression]]) -> list[tuple[Any, bool, bool]]:
+        """
+        Converte o order_by em uma lista (coluna, descendente, nulos primeiro), terminando sempre pelo id para que a
+        ordenação seja única. Sem nulls_first()/nulls_last(), os nulos ficam como os menores valores (padrão do SQLite).
+        """
+        ordenacao = []
+
+        for expressao in order_by or []:
+            nulos_primeiro = None
+
+            if isinstance(expressao, UnaryExpression) and expressao.modifier in (operators.nulls_first_op, operators.nulls_last_op):
+                nulos_primeiro = expressao.modifier == operators.nulls_first_op
+                expressao = expressao.element
+
+            desc = False
+
+            if isinstance(expressao, UnaryExpression) and expressao.modifier in (operators.asc_op, operators.desc_op):
+                desc = expressao.modifier == operators.desc_op
+                expressao = expressao.element
+
+            ordenacao.append((expressao, desc, not desc if nulos_primeiro is None else nulos_primeiro))
+
+        if not any(getattr(coluna, 'key', None) == 'id' for coluna, _, _ in ordenacao):
+            desc = ordenacao[-1][1] if ordenacao else False
+            ordenacao.append((cls.id.expression, desc, not desc))
+
+        return ordenacao
+
+    @staticmethod
+    def _order_by_keyset(ordenacao: list[tuple[Any, bool, bool]], inverter: bool = False) -> list[UnaryExpression]:
+        """
+        Monta o order_by da ordenação do keyset, com a posição dos nulos explícita nas colunas que aceitam nulos, para
+        que a ordem seja a mesma em qualquer banco. Se inverter for True, retorna a ordem inversa.
+        """
+        order_by = []
+
+        for coluna, desc, nulos_primeiro in ordenacao:
+            if inverter:
+                desc, nulos_primeiro = not desc, not nulos_primeiro
+
+            expressao = coluna.desc() if desc else coluna.asc()
+
+            if getattr(coluna, 'nullable', True):
+                expressao = expressao.nulls_first() if nulos_primeiro else expressao.nulls_last()
+
+            order_by.append(expressao)
+
+        return order_by
+
+    @staticmethod
+    def _depois_do_valor(coluna: Any, valor: Any, menor: bool, nulos_no_fim: bool, inclusivo: bool) -> ColumnElement:
+        """
+        Condição das linhas cuja coluna vem depois do valor (ou é igual, se inclusivo) no sentido da paginação.
+        :param menor: Se True, os valores seguintes são os menores.
+        :param nulos_no_fim: Se True, os nulos vêm depois de todos os valores no sentido da paginação.
+        """
+        if valor is None:
+            if nulos_no_fim:
+                return coluna.is_(None) if inclusivo else false()
+
+            return true() if inclusivo else coluna.is_not(None)
+
+        if inclusivo:
+            comparacao = coluna <= valor if menor else coluna >= valor
+        else:
+            comparacao = coluna < valor if menor else coluna > valor
+
+        return or_(comparacao, coluna.is_(None)) if nulos_no_fim else comparacao
+
+    @classmethod
+    def filtro_keyset(cls, ordenacao: list[tuple[Any, bool, bool]], cursor: CursorPaginacao) -> ColumnElement:
+        """
+        Monta a condição das linhas que vêm depois (ou antes) do cursor na ordenação informada.
+        Para (data desc, id desc), a próxima página é: data < :data OR (data = :data AND id < :id).
+        Os nulos são comparados pela posição deles na ordenação (IS NULL / IS NOT NULL).
+        """
+        condicoes = []
+        colunas = ordenacao[:len(cursor.valores)]
+        direcoes = []
+
+        for coluna, desc, nulos_primeiro in colunas:
+            # desc e próxima página, ou asc e página anterior: valores menores
+            nulos_no_fim = getattr(coluna, 'nullable', True) and nulos_primeiro == cursor.anterior
+            direcoes.append((desc != cursor.anterior, nulos_no_fim))
+
+        for i, ((coluna, _, _), valor, (menor, nulos_no_fim)) in enumerate(zip(colunas, cursor.valores, direcoes)):
+            inclusivo = cursor.inclusivo and i == len(colunas) - 1
+            anteriores = [
+                c.is_(None) if v is None else c == v
+                for (c, _, _), v in zip(colunas[:i], cursor.valores[:i])
+            ]
+            condicoes.append(and_(*anteriores, cls._depois_do_valor(coluna, valor, menor, nulos_no_fim, inclusivo)))
+
+        # limite redundante na primeira coluna: sem ele, o SQLite percorre o índice desde o início por causa do OR
+        limite = cls._depois_do_valor(colunas[0][0], cursor.valores[0], *direcoes[0], inclusivo=True)
+
+        return and_(limite, or_(*condicoes))
+
+    @classmethod
+    def pagina_dataframe(cls,
+                         filters: Optional[List[BinaryExpression]] = None,
+                         order_by: Optional[List[UnaryExpression]] = None,
+                         select_fields: Optional[List[str]] = None,
+                         as_display: bool = False,
+                         limit: int = 50,
+                         cursor: Optional[CursorPaginacao] = None,
+                         ) -> PaginaDataframe:
+        """
+        Retorna uma página usando a paginação por chave, sem OFFSET e sem contar as linhas da tabela.
+        :param cursor: Posição da página. None para a primeira página.
+        :return: PaginaDataframe com as linhas e as chaves para navegar para a página anterior e a próxima.
+        """
+        ordenacao = cls._ordenacao_keyset(order_by)
+        chaves = [coluna.key for coluna, _, _ in ordenacao]
+
+        campos = select_fields
+        if select_fields is not None:
+            campos = list(select_fields) + [chave for chave in chaves if chave not in select_fields]
+
+        order_by = cls._order_by_keyset(ordenacao)
+        # uma linha a mais indica se existe outra página na mesma direção
+        dataframe = cls.filter_dataframe(
+            filters=filters,
+            order_by=order_by,
+            select_fields=campos,
+            limit=limit + 1,
+            cursor=cursor,
+        )
+
+        mais_linhas = len(dataframe) > limit
+        anterior = cursor is not None and cursor.anterior
+
+        if mais_linhas:
+            dataframe = dataframe.iloc[1:] if anterior else dataframe.iloc[:limit]
+            dataframe = dataframe.reset_index(drop=True)
+
+        primeira_chave = ultima_chave = None
+
+        if not dataframe.empty:
+            primeira_chave = tuple(_valor_python(dataframe[chave].iloc[0]) for chave in chaves)
+            ultima_chave = tuple(_valor_python(dataframe[chave].iloc[-1]) for chave in chaves)
+
+        if select_fields is not None:
+            dataframe = dataframe[list(select_fields)]
+
+        if as_display:
+            dataframe = dataframe.rename(columns={column: cls.get_field_display_name(column) for column in dataframe.columns})
+
+        tem_anterior = mais_linhas if anterior else cursor is not None
+
+        if cursor is not None and cursor.inclusivo and not anterior:
+            # ao pular para uma posição, só existe página anterior se houver linhas antes dela
+            tem_anterior = not cls.filter_dataframe(
+                filters=filters,
+                order_by=order_by,
+                select_fields=chaves,
+                limit=1,
+                cursor=CursorPaginacao(cursor.valores, anterior=True),
+            ).empty
+
+        return PaginaDataframe(
+            dataframe=dataframe,
+            primeira_chave=primeira_chave,
+            ultima_chave=ultima_chave,
+            tem_anterior=tem_anterior,
+            tem_proxima=True if anterior else mais_linhas,
+        )
\ No newline at end of file
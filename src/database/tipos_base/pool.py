@@ -0,0 +1,148 @@
+"""
+Configuração e métricas do pool de conexões usado pelo Database.
+"""
+import os
+from bisect import bisect_left
+from dataclasses import dataclass, asdict
+from threading import Lock
+from time import perf_counter
+from typing import Any, Self
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from src.settings import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+
+# Limites superiores (em ms) das faixas do histograma de tempo de espera por uma conexão
+FAIXAS_ESPERA_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+@dataclass(frozen=True)
+class ConfiguracaoPool:
+    """
+    Configuração do pool de conexões.
+
+    Args:
+        pool_size (int): Quantidade de conexões mantidas abertas no pool.
+        max_overflow (int): Conexões extras que podem ser abertas além do pool_size.
+        pool_timeout (float): Tempo máximo, em segundos, aguardando uma conexão livre.
+        pool_recycle (int): Tempo, em segundos, após o qual a conexão é reciclada. -1 para nunca reciclar.
+        pool_pre_ping (bool): Testa a conexão antes de usá-la, descartando conexões quebradas.
+    """
+
+    pool_size: int = DB_POOL_SIZE
+    max_overflow: int = DB_MAX_OVERFLOW
+    pool_timeout: float = DB_POOL_TIMEOUT
+    pool_recycle: int = DB_POOL_RECYCLE
+    pool_pre_ping: bool = DB_POOL_PRE_PING
+
+    @classmethod
+    def from_env(cls) -> Self:
+        """
+        Cria a configuração a partir das variáveis de ambiente DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+        DB_POOL_RECYCLE e DB_POOL_PRE_PING. As variáveis ausentes usam os valores do settings.py.
+        """
+        return cls(
+            pool_size=int(os.environ.get('DB_POOL_SIZE', DB_POOL_SIZE)),
+            max_overflow=int(os.environ.get('DB_MAX_OVERFLOW', DB_MAX_OVERFLOW)),
+            pool_timeout=float(os.environ.get('DB_POOL_TIMEOUT', DB_POOL_TIMEOUT)),
+            pool_recycle=int(os.environ.get('DB_POOL_RECYCLE', DB_POOL_RECYCLE)),
+            pool_pre_ping=str(os.environ.get('DB_POOL_PRE_PING', DB_POOL_PRE_PING)).lower() == 'true',
+        )
+
+    def engine_kwargs(self, assincrono: bool = False) -> dict[str, Any]:
+        """
+        Retorna os parâmetros a serem repassados ao create_engine.
+        :param assincrono: Se True, retorna os parâmetros do create_async_engine, que exige um pool adaptado ao asyncio.
+        """
+        return {
+            'poolclass': AsyncAdaptedQueuePoolMonitorado if assincrono else QueuePoolMonitorado,
+            **asdict(self),
+        }
+
+
+class EstatisticasPool:
+    """
+    Contadores de uso do pool: quantidade de checkouts, timeouts e histograma do tempo de espera por uma conexão.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        # uma faixa a mais para os tempos acima do maior limite
+        self.histograma = [0] * (len(FAIXAS_ESPERA_MS) + 1)
+
+    def registrar_espera(self, segundos: float, timeout: bool = False):
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+            self.espera_total += segundos
+            self.espera_max = max(self.espera_max, segundos)
+            self.histograma[bisect_left(FAIXAS_ESPERA_MS, segundos * 1000)] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            faixas = [f"<={limite}ms" for limite in FAIXAS_ESPERA_MS] + [f">{FAIXAS_ESPERA_MS[-1]}ms"]
+            total = self.checkouts + self.timeouts
+
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'espera_media_ms': (self.espera_total / total * 1000) if total else 0.0,
+                'espera_max_ms': self.espera_max * 1000,
+                'histograma_espera': dict(zip(faixas, self.histograma)),
+            }
+
+
+class _PoolMonitoradoMixin:
+    """
+    Mixin para os pools do SQLAlchemy que mede o tempo de espera de cada checkout de conexão.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estatisticas = EstatisticasPool()
+
+    def _do_get(self):
+        inicio = perf_counter()
+
+        try:
+            conexao = super()._do_get()
+        except PoolTimeoutError:
+            self.estatisticas.registrar_espera(perf_counter() - inicio, timeout=True)
+            raise
+
+        self.estatisticas.registrar_espera(perf_counter() - inicio)
+        return conexao
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Retorna o estado atual do pool e os contadores acumulados.
+        """
+        return {
+            'pool_size': self.size(),
+            'max_overflow': self._max_overflow,
+            'conexoes_em_uso': self.checkedout(),
+            'conexoes_livres': self.checkedin(),
+            # o contador interno é negativo enquanto o pool_size não foi atingido
+            'overflow': max(self.overflow(), 0),
+            **self.estatisticas.to_dict(),
+        }
+
+
+class QueuePoolMonitorado(_PoolMonitoradoMixin, QueuePool):
+    """
+    QueuePool que mede o tempo de espera de cada checkout de conexão.
+    """
+
+
+class AsyncAdaptedQueuePoolMonitorado(_PoolMonitoradoMixin, AsyncAdaptedQueuePool):
+    """
+    Pool dos engines assíncronos que mede o tempo de espera de cada checkout de conexão.
+    """
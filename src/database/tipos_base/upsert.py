@@ -0,0 +1,141 @@
+"""
+Upsert em lote com o comando nativo de cada banco: INSERT ... ON CONFLICT no SQLite e MERGE no Oracle.
+
+O lote inteiro é gravado com um único comando (executemany). Os valores dos registros que já existem são calculados
+pelo próprio banco, a partir da linha atual e da nova, então escritas concorrentes de processos diferentes não se
+sobrescrevem (ex.: incrementar um contador).
+"""
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import ColumnElement, Connection, Sequence, Table, bindparam, column, insert, table, text, update
+from sqlalchemy.dialects import sqlite
+
+from src.database.tipos_base.versao_tabelas import versao_tabelas
+
+# Calcula o novo valor de uma coluna de um registro existente. Recebe as colunas da linha atual e as da linha nova,
+# acessadas pelo nome (ex.: lambda atual, novo: atual['quantidade'] + novo['quantidade']).
+Atribuicao = Callable[[Any, Any], ColumnElement]
+
+
+def substituir(nome: str) -> Atribuicao:
+    """
+    Atribuição que substitui o valor atual pelo valor novo.
+    """
+    return lambda atual, novo: novo[nome]
+
+
+def _atribuicoes(lote: list[dict], chaves: Iterable[str], atribuicoes: Optional[dict[str, Atribuicao]]) -> dict[str, Atribuicao]:
+    if atribuicoes is not None:
+        return atribuicoes
+
+    return {nome: substituir(nome) for nome in lote[0] if nome not in chaves}
+
+
+def _upsert_sqlite(connection: Connection, tabela: Table, lote: list[dict], chaves: list[str], atribuicoes: dict[str, Atribuicao]):
+    comando = sqlite.insert(tabela)
+    indice = [tabela.c[nome] for nome in chaves]
+
+    if atribuicoes:
+        comando = comando.on_conflict_do_update(
+            index_elements=indice,
+            set_={nome: atribuicao(tabela.c, comando.excluded) for nome, atribuicao in atribuicoes.items()},
+        )
+    else:
+        comando = comando.on_conflict_do_nothing(index_elements=indice)
+
+    connection.execute(comando, lote)
+
+
+def _upsert_oracle(connection: Connection, tabela: Table, lote: list[dict], chaves: list[str], atribuicoes: dict[str, Atribuicao]):
+    preparer = connection.dialect.identifier_preparer
+    nomes = list(lote[0])
+    colunas = {nome: preparer.quote(tabela.c[nome].name) for nome in nomes}
+
+    # as atribuições são compiladas com os aliases usados no MERGE: d (linha atual) e s (linha nova)
+    atual = tabela.alias('d').c
+    novo = table('s', *[column(tabela.c[nome].name) for nome in nomes]).c
+
+    def _compilar(expressao: ColumnElement) -> str:
+        return str(expressao.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+
+    origem = ", ".join(f":{nome} AS {colunas[nome]}" for nome in nomes)
+    condicao = " AND ".join(f"d.{colunas[nome]} = s.{colunas[nome]}" for nome in chaves)
+    comando = f"MERGE INTO {preparer.format_table(tabela)} d USING (SELECT {origem} FROM dual) s ON ({condicao})"
+
+    if atribuicoes:
+        comando += " WHEN MATCHED THEN UPDATE SET " + ", ".join(
+            f"d.{preparer.quote(tabela.c[nome].name)} = {_compilar(atribuicao(atual, novo))}"
+            for nome, atribuicao in atribuicoes.items()
+        )
+
+    colunas_insert = [colunas[nome] for nome in nomes]
+    valores_insert = [f"s.{colunas[nome]}" for nome in nomes]
+
+    # sem id no lote, o id vem da sequence da tabela, como no insert do SQLAlchemy
+    if 'id' in tabela.c and 'id' not in nomes and isinstance(tabela.c.id.default, Sequence):
+        colunas_insert.insert(0, preparer.quote(tabela.c.id.name))
+        valores_insert.insert(0, f"{preparer.format_sequence(tabela.c.id.default)}.nextval")
+
+    comando += f" WHEN NOT MATCHED THEN INSERT ({', '.join(colunas_insert)}) VALUES ({', '.join(valores_insert)})"
+
+    # os binds tipados fazem o SQLAlchemy converter os valores (ex.: Enum) e o lote é enviado ao driver de uma vez,
+    # como array bind (executemany)
+    comando = text(comando).bindparams(*[bindparam(nome, type_=tabela.c[nome].type) for nome in nomes])
+    connection.execute(comando, lote)
+
+
+def _upsert_generico(connection: Connection, tabela: Table, lote: list[dict], chaves: list[str], atribuicoes: dict[str, Atribuicao]):
+    """
+    Upsert para os bancos sem suporte nativo: tenta atualizar cada registro e insere os que não existem.
+    """
+    novo = {nome: bindparam(f"b_{nome}", type_=tabela.c[nome].type) for nome in lote[0]}
+    condicao = [tabela.c[nome] == novo[nome] for nome in chaves]
+
+    for registro in lote:
+        parametros = {f"b_{nome}": valor for nome, valor in registro.items()}
+
+        if atribuicoes:
+            comando = update(tabela).where(*condicao).values({
+                nome: atribuicao(tabela.c, novo) for nome, atribuicao in atribuicoes.items()
+            })
+
+            if connection.execute(comando, parametros).rowcount:
+                continue
+
+        elif connection.execute(tabela.select().where(*condicao), parametros).first() is not None:
+            continue
+
+        connection.execute(insert(tabela), registro)
+
+
+def upsert(connection: Connection,
+           tabela: Table,
+           lote: list[dict],
+           chaves: Iterable[str] = ('id',),
+           atribuicoes: Optional[dict[str, Atribuicao]] = None,
+           ):
+    """
+    Grava um lote de registros com um único comando, atualizando os que já existem.
+    :param connection: Conexão, dentro de uma transação.
+    :param tabela: Tabela dos registros.
+    :param lote: Registros com os mesmos campos.
+    :param chaves: Colunas que identificam um registro existente (chave primária ou constraint unique).
+    :param atribuicoes: Novo valor de cada coluna dos registros existentes. Se não for informado, as colunas que não
+    são chaves recebem os valores novos.
+    """
+    if not lote:
+        return
+
+    chaves = list(chaves)
+    atribuicoes = _atribuicoes(lote, chaves, atribuicoes)
+
+    match connection.dialect.name:
+        case 'sqlite':
+            _upsert_sqlite(connection, tabela, lote, chaves, atribuicoes)
+        case 'oracle':
+            _upsert_oracle(connection, tabela, lote, chaves, atribuicoes)
+        case _:
+            _upsert_generico(connection, tabela, lote, chaves, atribuicoes)
+
+    # o MERGE do Oracle é um comando em texto, que os eventos da versao_tabelas não identificam
+    versao_tabelas.registrar_escrita(connection, tabela.name)
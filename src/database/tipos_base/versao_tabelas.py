@@ -0,0 +1,93 @@
+from collections import defaultdict
+from threading import Lock
+from typing import Iterable, Optional
+
+from sqlalchemy import Connection, Engine, event
+
+
+def _tabela_escrita(context) -> Optional[str]:
+    """
+    Retorna o nome da tabela alterada por um INSERT, UPDATE ou DELETE compilado pelo SQLAlchemy.
+    Comandos em texto puro não são identificados e devem ser registrados com VersaoTabelas.registrar_escrita.
+    """
+    if context is None or not (context.isinsert or context.isupdate or context.isdelete):
+        return None
+
+    compilado = getattr(context, 'compiled', None)
+    tabela = getattr(getattr(compilado, 'statement', None), 'table', None)
+
+    return getattr(tabela, 'name', None)
+
+
+class VersaoTabelas:
+    """
+    Marca d'água de escrita por tabela: um contador incrementado a cada escrita na tabela.
+
+    Os caches de leitura guardam a versão da tabela junto com o resultado e o descartam quando a versão muda.
+    A versão é incrementada quando o comando é executado e novamente no commit, para que uma leitura feita
+    entre os dois momentos (que ainda não enxerga os dados novos) também seja descartada.
+    """
+
+    def __init__(self):
+        self._versoes: defaultdict[str, int] = defaultdict(int)
+        self._lock = Lock()
+
+    def versao(self, tabela: str) -> int:
+        """
+        Retorna a versão atual da tabela.
+        """
+        return self._versoes[tabela]
+
+    def versoes(self, tabelas: Iterable[str]) -> tuple[int, ...]:
+        """
+        Retorna as versões atuais das tabelas, na ordem informada.
+        """
+        return tuple(self._versoes[tabela] for tabela in tabelas)
+
+    def incrementar(self, tabelas: Iterable[str]):
+        """
+        Incrementa a versão das tabelas, invalidando os resultados em cache que dependem delas.
+        """
+        with self._lock:
+            for tabela in tabelas:
+                self._versoes[tabela] += 1
+
+    def registrar_escrita(self, conn: Connection, tabela: str):
+        """
+        Registra uma escrita na tabela feita pela conexão: incrementa a versão agora e novamente no commit.
+        Usado pelos comandos em texto puro (ex.: o MERGE do upsert no Oracle), que os eventos não identificam.
+        :param conn: Conexão que fez a escrita.
+        :param tabela: Nome da tabela.
+        """
+        self.incrementar([tabela])
+        conn.info.setdefault('tabelas_escritas', set()).add(tabela)
+
+    def registrar(self, engine: Engine):
+        """
+        Registra os eventos do engine que incrementam as versões a cada escrita.
+        :param engine: Engine síncrono. Para o assíncrono, use o async_engine.sync_engine.
+        """
+        if event.contains(engine, "after_cursor_execute", self._after_cursor_execute):
+            return
+
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "commit", self._commit)
+        event.listen(engine, "rollback", self._rollback)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        tabela = _tabela_escrita(context)
+
+        if tabela is not None:
+            self.registrar_escrita(conn, tabela)
+
+    def _commit(self, conn):
+        tabelas = conn.info.pop('tabelas_escritas', None)
+
+        if tabelas:
+            self.incrementar(tabelas)
+
+    def _rollback(self, conn):
+        conn.info.pop('tabelas_escritas', None)
+
+
+versao_tabelas = VersaoTabelas()
@@ -0,0 +1,190 @@
+"""
+Redução da quantidade de pontos das séries antes de plotar.
+
+Um gráfico não consegue exibir mais pontos do que a sua largura em pixels, então as séries longas são reduzidas
+para no máximo max_pontos pontos antes de serem enviadas ao matplotlib.
+"""
+from datetime import datetime, date
+from enum import StrEnum
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class MetodoDownsampling(StrEnum):
+    # Mantém o menor e o maior valor de cada intervalo. Preserva todos os picos, por isso é o padrão.
+    MIN_MAX = "min_max"
+    # Largest-Triangle-Three-Buckets: mantém o formato visual da série com um ponto por intervalo.
+    LTTB = "lttb"
+
+
+def _eixo_numerico(eixo_x: pd.Series) -> Optional[np.ndarray]:
+    """
+    Converte o eixo X para float64. Datas são convertidas para nanossegundos.
+    :return: Array numérico, ou None se o eixo não for numérico nem de datas.
+    """
+    if eixo_x.dtype == object and len(eixo_x) and isinstance(eixo_x.iloc[0], (datetime, date)):
+        # o driver do SQLite devolve as datas como objetos datetime do Python
+        eixo_x = pd.to_datetime(eixo_x)
+
+    if pd.api.types.is_datetime64_any_dtype(eixo_x):
+        return eixo_x.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+
+    if pd.api.types.is_numeric_dtype(eixo_x):
+        return eixo_x.to_numpy(dtype=np.float64)
+
+    return None
+
+
+def _intervalos(x: np.ndarray, quantidade: int) -> np.ndarray:
+    """
+    Divide o eixo X (ordenado) em intervalos de mesma largura, como as colunas de pixels do gráfico.
+    :return: Índice do intervalo de cada ponto.
+    """
+    if x[-1] == x[0]:
+        return np.zeros(len(x), dtype=np.int64)
+
+    intervalo = np.floor((x - x[0]) / (x[-1] - x[0]) * quantidade).astype(np.int64)
+    return np.minimum(intervalo, quantidade - 1)
+
+
+def indices_min_max(x: np.ndarray, y: np.ndarray, max_pontos: int) -> np.ndarray:
+    """
+    Seleciona o primeiro, o último e, em cada intervalo do eixo X, o ponto de menor e o de maior valor.
+    :param x: Eixo X numérico e ordenado.
+    :param y: Valores.
+    :param max_pontos: Quantidade máxima de pontos retornados.
+    :return: Índices ordenados dos pontos selecionados.
+    """
+    tamanho = len(x)
+
+    if tamanho <= max_pontos:
+        return np.arange(tamanho)
+
+    intervalo = _intervalos(x, max(max_pontos // 2 - 1, 1))
+
+    # como o eixo X está ordenado, cada intervalo é um trecho contínuo do array
+    inicio_grupo = np.flatnonzero(np.diff(intervalo, prepend=-1))
+    tamanho_grupo = np.diff(np.append(inicio_grupo, tamanho))
+
+    indices = [np.array([0, tamanho - 1])]
+
+    for reducao in (np.minimum, np.maximum):
+        extremos = np.repeat(reducao.reduceat(y, inicio_grupo), tamanho_grupo)
+        candidatos = np.flatnonzero(y == extremos)
+        # em caso de empate, mantém o primeiro ponto do intervalo
+        _, primeiros = np.unique(intervalo[candidatos], return_index=True)
+        indices.append(candidatos[primeiros])
+
+    return np.unique(np.concatenate(indices))
+
+
+def indices_lttb(x: np.ndarray, y: np.ndarray, max_pontos: int) -> np.ndarray:
+    """
+    Seleciona os pontos pelo algoritmo Largest-Triangle-Three-Buckets.
+    Cada intervalo escolhe o ponto que forma o maior triângulo com o ponto escolhido no intervalo anterior e a
+    média do intervalo seguinte. A escolha de cada intervalo depende da anterior, então apenas o laço sobre os
+    intervalos é feito em Python; o cálculo dentro de cada intervalo é vetorizado.
+    :param x: Eixo X numérico e ordenado.
+    :param y: Valores.
+    :param max_pontos: Quantidade máxima de pontos retornados.
+    :return: Índices ordenados dos pontos selecionados.
+    """
+    tamanho = len(x)
+
+    if tamanho <= max_pontos or max_pontos < 3:
+        return np.arange(tamanho)
+
+    # o primeiro e o último ponto ficam fora dos intervalos e são sempre mantidos
+    limites = np.linspace(1, tamanho - 1, max_pontos - 1).astype(np.int64)
+
+    somas_x = np.add.reduceat(x[1:tamanho - 1], limites[:-1] - 1)
+    somas_y = np.add.reduceat(y[1:tamanho - 1], limites[:-1] - 1)
+    quantidades = np.diff(limites)
+    medias_x = np.append(somas_x / quantidades, x[-1])
+    medias_y = np.append(somas_y / quantidades, y[-1])
+
+    indices = np.empty(max_pontos, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = tamanho - 1
+    anterior = 0
+
+    for i in range(max_pontos - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        area = np.abs(
+            (x[anterior] - medias_x[i + 1]) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (medias_y[i + 1] - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(area))
+        indices[i + 1] = anterior
+
+    return indices
+
+
+def reduzir_dataframe(dataframe: pd.DataFrame,
+                      eixo_x_key: str,
+                      eixo_y_keys: list[str],
+                      max_pontos: int,
+                      metodo: MetodoDownsampling = MetodoDownsampling.MIN_MAX,
+                      ) -> pd.DataFrame:
+    """
+    Reduz o DataFrame para no máximo max_pontos linhas por coluna do eixo Y, mantendo a ordem do eixo X.
+    DataFrames cujo eixo X não é numérico nem de datas (ex.: categorias) são retornados sem alteração.
+    :param dataframe: Dados do gráfico, ordenados pelo eixo X.
+    :param eixo_x_key: Coluna do eixo X.
+    :param eixo_y_keys: Colunas do eixo Y. Os pontos selecionados para cada coluna são mantidos.
+    :param max_pontos: Quantidade máxima de pontos.
+    :param metodo: Método de redução.
+    :return: DataFrame reduzido.
+    """
+    if len(dataframe) <= max_pontos:
+        return dataframe
+
+    dataframe = dataframe.dropna(subset=[eixo_x_key])
+    x = _eixo_numerico(dataframe[eixo_x_key])
+
+    if x is None:
+        return dataframe
+
+    if not np.all(x[1:] >= x[:-1]):
+        ordem = np.argsort(x, kind='stable')
+        dataframe = dataframe.iloc[ordem]
+        x = x[ordem]
+
+    selecionar = indices_lttb if metodo == MetodoDownsampling.LTTB else indices_min_max
+    indices = []
+
+    for eixo_y_key in eixo_y_keys:
+        if not pd.api.types.is_numeric_dtype(dataframe[eixo_y_key]):
+            # não há como escolher mínimo e máximo de valores não numéricos
+            return dataframe
+
+        y = dataframe[eixo_y_key].to_numpy(dtype=np.float64)
+        validos = np.flatnonzero(~np.isnan(y))
+
+        if len(validos):
+            indices.append(validos[selecionar(x[validos], y[validos], max_pontos)])
+
+    if not indices:
+        return dataframe.iloc[:0]
+
+    return dataframe.iloc[np.unique(np.concatenate(indices))]
+
+
+def expandir_min_max(dataframe: pd.DataFrame, eixo_x_key: str = 'data_leitura', eixo_y_key: str = 'valor') -> pd.DataFrame:
+    """
+    Converte uma série agregada (com as colunas minimo e maximo) em dois pontos por intervalo, o mínimo e o máximo,
+    para que o gráfico exiba os picos que a média do intervalo esconderia.
+    :param dataframe: Série agregada com eixo_x_key, minimo e maximo.
+    :return: DataFrame com as colunas eixo_x_key e eixo_y_key.
+    """
+    minimos = pd.DataFrame({eixo_x_key: dataframe[eixo_x_key], eixo_y_key: dataframe['minimo'], '_ordem': 0})
+    maximos = pd.DataFrame({eixo_x_key: dataframe[eixo_x_key], eixo_y_key: dataframe['maximo'], '_ordem': 1})
+
+    return (
+        pd.concat([minimos, maximos])
+        .sort_values([eixo_x_key, '_ordem'], kind='stable')
+        .drop(columns='_ordem')
+        .reset_index(drop=True)
+    )
@@ -1,27 +1,59 @@
+from typing import Optional
+
 import matplotlib.pyplot as plt
 from sqlalchemy import BinaryExpression
 from src.plots.generic.grafico_degrau import grafico_degrau_generico
 from src.plots.generic.grafico_barras import grafico_barras_generico
 from src.plots.generic.grafico_linha import get_grafico_linha
 from src.database.tipos_base.model import Model
+from src.database.tipos_base.cache import chave_expressoes
+from src.database.tipos_base.cache_consultas import cache_consultas
 import pandas as pd
 
+from src.plots.downsampling import MetodoDownsampling, reduzir_dataframe
 from src.plots.plot_config import TipoGrafico
+from src.settings import MAX_PONTOS_GRAFICO
 
 
 class ModelPlotter:
     def __init__(self, model:type[Model]):
         self.model = model
 
-    def get_data_for_plot(self, filters:list[BinaryExpression] or None = None) -> pd.DataFrame:
+    def get_data_for_plot(self,
+                          filters:list[BinaryExpression] or None = None,
+                          max_pontos: Optional[int] = MAX_PONTOS_GRAFICO,
+                          metodo: MetodoDownsampling = MetodoDownsampling.MIN_MAX,
+                          ) -> pd.DataFrame:
         """
         Obtém os dados da instância formatados para plotagem.
+        Se o model tiver dados agregados para o período filtrado, eles são usados no lugar das linhas brutas.
+        :param filters: Filtros do gráfico.
+        :param max_pontos: Quantidade máxima de pontos retornados. None para retornar todos.
+        :param metodo: Método usado para reduzir a quantidade de pontos.
+        """
+        chave = ('get_data_for_plot', self.model.__tablename__, chave_expressoes(filters), max_pontos, metodo)
+        tabelas = [self.model.__tablename__, *self.model.__tabelas_dependentes__]
+
+        return cache_consultas.obter(chave, tabelas, lambda: self._consultar_dados(filters, max_pontos, metodo))
+
+    def _consultar_dados(self,
+                         filters: Optional[list[BinaryExpression]],
+                         max_pontos: Optional[int],
+                         metodo: MetodoDownsampling,
+                         ) -> pd.DataFrame:
+        """
+        Executa a consulta do get_data_for_plot, sem passar pelo cache.
         """
 
         if self.model.__generic_plot__ is None:
             raise NotImplementedError(
                 "A classe não implementa o método 'get_data_for_plot' ou não possui um 'generic_plot' definido.")
 
+        eixo_x = [f.field for f in self.model.__generic_plot__.eixo_x]
+        eixo_y = [f.field for f in self.model.__generic_plot__.eixo_y]
+
+        dataframe = self.model.get_data_for_plot_agregado(filters, max_pontos) if max_pontos else None
+
         # faz um query com o sqlalchemy filtrando pelos filters do generic_plot e ordernando pelos order_by do generic_plot
 
         order_by = None
@@ -32,11 +64,17 @@ class ModelPlotter:
 
 
 
-        return self.model.filter_dataframe(
-            filters=filters,
-            order_by=order_by,
-            select_fields=[f.field for f in self.model.__generic_plot__.eixo_x] + [f.field for f in self.model.__generic_plot__.eixo_y]
-        )
+        if dataframe is None:
+            dataframe = self.model.filter_dataframe(
+                filters=filters,
+                order_by=order_by,
+                select_fields=eixo_x + eixo_y
+            )
+
+        if max_pontos and len(eixo_x) == 1:
+            dataframe = reduzir_dataframe(dataframe, eixo_x[0], eixo_y, max_pontos, metodo)
+
+        return dataframe
 
     def get_plot(self, dataframe:pd.DataFrame) -> plt.Figure:
         """
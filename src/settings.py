@@ -1,2 +1,60 @@
 DEBUG = False
-SQL_ALCHEMY_DEBUG = False
\ No newline at end of file
+SQL_ALCHEMY_DEBUG = False
+
+# Cache de resolução serial -> sensores usado pela API
+CACHE_SENSORES_TAMANHO_MAX = 50000
+CACHE_SENSORES_TTL = 300 # segundos
+
+# Fila de escrita (write-behind) entre a API e o banco de dados
+FILA_ESCRITA_TAMANHO_MAX = 10000 # requisições aguardando gravação antes de a API responder 503
+FILA_ESCRITA_TAMANHO_LOTE = 1000 # leituras por transação
+FILA_ESCRITA_INTERVALO_MAX = 0.5 # segundos que uma leitura pode esperar antes de o lote ser gravado
+
+# Pool de conexões do banco de dados (podem ser sobrescritos pelas variáveis de ambiente de mesmo nome)
+DB_POOL_SIZE = 5
+DB_MAX_OVERFLOW = 10
+DB_POOL_TIMEOUT = 30 # segundos
+DB_POOL_RECYCLE = -1 # segundos, -1 para nunca reciclar
+DB_POOL_PRE_PING = False
+
+# Modo de alta performance do SQLite (WAL + escritor único). Pode ser ativado pela variável de ambiente SQLITE_MODO_PERFORMANCE
+SQLITE_MODO_PERFORMANCE = False
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000, # negativo = KiB, ou seja, 64 MB
+    'mmap_size': 268435456, # 256 MB
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000, # ms
+}
+SQLITE_ESCRITOR_TAMANHO_LOTE = 100 # escritas agrupadas por transação
+
+# Agregados de leituras por minuto/hora/dia usados nos gráficos de períodos longos
+AGREGACOES_HABILITADAS = True
+MAX_PONTOS_GRAFICO = 2000 # pontos por sensor; períodos com mais leituras que isso usam os agregados nos gráficos
+
+# Cache das contagens de registros usadas na paginação das tabelas do dashboard
+CONTAGEM_CACHE_TAMANHO_MAX = 1024
+CONTAGEM_CACHE_TTL = 300 # segundos; as escritas feitas por este processo invalidam o cache imediatamente
+
+# Cache dos resultados das consultas do dashboard, invalidado pelas escritas nas tabelas consultadas
+CACHE_CONSULTAS_TAMANHO_MAX = 256 # consultas
+CACHE_CONSULTAS_TTL = 300 # segundos; cobre as escritas feitas por outros processos
+CACHE_CONSULTAS_MAX_LINHAS = 200000 # resultados maiores não são guardados
+CACHE_CONSULTAS_MAX_LINHAS_TOTAL = 1000000 # soma das linhas de todos os resultados; acima disso, os menos usados são descartados
+
+# Quantidade de linhas convertidas e gravadas por vez na importação do banco de dados
+IMPORTACAO_TAMANHO_LOTE = 10000
+
+# Quantidade de linhas lidas do banco por vez na exportação, que é gravada direto em um arquivo temporário
+EXPORTACAO_TAMANHO_LOTE = 10000
+EXPORTACAO_PARQUET_ROW_GROUP = 100000 # linhas por row group nos arquivos Parquet da exportação
+EXPORTACAO_WORKERS = 4 # tabelas lidas em paralelo na exportação, cada uma com a sua conexão; 1 exporta em sequência
+EXPORTACAO_DOWNLOAD_MAX_MB = 200 # acima disso, o dashboard não oferece o download, que o Streamlit mantém inteiro em memória
+
+# Quantidade de opções carregadas por página nos seletores de chave estrangeira do dashboard
+FK_OPCOES_POR_PAGINA = 50
+
+# Gerador de datasets sintéticos (src/database/generator/construtor_dataset.py)
+DATASET_TAMANHO_LOTE_GERACAO = 1000000 # leituras geradas por tarefa do pool de processos
+DATASET_TAMANHO_LOTE_INSERCAO = 50000 # leituras por transação
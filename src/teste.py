@@ -1,6 +1,7 @@
 from src.database.generator.criar_dados_leitura import criar_dados_leitura
 from src.database.generator.gerar_sensores_e_dados import criar_dados_sample
 from src.database.login.iniciar_database import iniciar_database
+from src.database.models.leitura_agregada import LeituraSensorAgregada
 from src.database.models.sensor import LeituraSensor
 from src.database.reset_contador_ids import reset_contador_ids, get_sequences_from_db
 from src.database.tipos_base.database import Database
@@ -40,12 +41,15 @@ def teste():
     for sensor, l in leituras:
         todas_leituras = todas_leituras + l
 
-    with Database.get_session() as session:
+    # um commit por leitura: os agregados são reconstruídos uma única vez ao final
+    with LeituraSensorAgregada.sem_recalculo(), Database.get_session() as session:
 
         for object in todas_leituras:
             session.add(object)
             session.commit()
 
+    LeituraSensorAgregada.reconstruir()
+
     print(LeituraSensor.count())
 
 
@@ -1,15 +1,45 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
+from src.database.tipos_base.database import Database
 from src.settings import DEBUG
+from src.wokwi_api.fila_escrita import fila_escrita
+from src.wokwi_api.ingestao import cache_sensores
 from src.wokwi_api.init_sensor import init_router
 from src.wokwi_api.receber_leitura import receber_router
 import uvicorn
 import threading
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Inicia a fila de escrita junto com a API e grava as leituras pendentes ao encerrar.
+    """
+    fila_escrita.iniciar()
+    yield
+    fila_escrita.parar()
+
+    if Database.has_async():
+        await Database.async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(init_router, prefix='/init')
 app.include_router(receber_router, prefix='/leitura')
 
+
+@app.get('/metrics')
+def metrics():
+    """
+    Retorna as métricas internas da API.
+    """
+    return {
+        "cache_sensores": cache_sensores.stats(),
+        "fila_escrita": fila_escrita.stats(),
+        "pool": Database.pool_stats(),
+    }
+
 def _print_routes(app):
     for route in app.routes:
         if hasattr(route, "methods"):
@@ -33,7 +63,7 @@ def inciar_api_thread_paralelo():
     api_thread.start()
 
 if __name__ == "__main__":
-    from src.database.tipos_base.database import Database
     Database.init_sqlite('../../database.db')
+    Database.init_sqlite_async('../../database.db')
 
     uvicorn.run(app, host="0.0.0.0", port=8180)
\ No newline at end of file
@@ -0,0 +1,228 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Optional
+
+from src.database.tipos_base.database import Database
+from src.settings import FILA_ESCRITA_TAMANHO_MAX, FILA_ESCRITA_TAMANHO_LOTE, FILA_ESCRITA_INTERVALO_MAX
+from src.wokwi_api.ingestao import inserir_leituras
+
+
+class FilaCheiaError(Exception):
+    """
+    Lançada quando a fila de escrita está cheia e a leitura não pode ser aceita.
+    """
+
+
+class FilaEscrita:
+    """
+    Fila de escrita (write-behind) entre a API e o banco de dados.
+
+    As rotas apenas enfileiram as linhas já validadas e uma thread de background grava os lotes em
+    LEITURA_SENSOR, limitados por quantidade de leituras e pelo tempo máximo de espera.
+
+    Args:
+        tamanho_max (int): Quantidade máxima de requisições aguardando gravação.
+        tamanho_lote (int): Quantidade máxima de leituras gravadas por transação.
+        intervalo_max (float): Tempo máximo, em segundos, que uma leitura espera antes de o lote ser gravado.
+        tentativas (int): Quantidade de tentativas de gravação de um lote antes de descartá-lo.
+    """
+
+    def __init__(self,
+                 tamanho_max: int = FILA_ESCRITA_TAMANHO_MAX,
+                 tamanho_lote: int = FILA_ESCRITA_TAMANHO_LOTE,
+                 intervalo_max: float = FILA_ESCRITA_INTERVALO_MAX,
+                 tentativas: int = 3,
+                 ):
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_max = intervalo_max
+        self.tentativas = tentativas
+
+        self._fila: queue.Queue[list[dict]] = queue.Queue(maxsize=tamanho_max)
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._lock_contadores = threading.Lock()
+        self._atexit_registrado = False
+
+        # linhas de uma requisição que não couberam no último lote, gravadas no próximo (usado só pela thread)
+        self._sobra: list[dict] = []
+
+        self.leituras_enfileiradas = 0
+        self.leituras_gravadas = 0
+        self.leituras_descartadas = 0
+        self.requisicoes_rejeitadas = 0
+        self.lotes_gravados = 0
+
+    def iniciar(self):
+        """
+        Inicia a thread de gravação, caso ainda não esteja rodando.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name="fila-escrita", daemon=True)
+            self._thread.start()
+
+            # A API roda em uma thread daemon junto ao dashboard, então garante a gravação do que
+            # estiver pendente quando o processo for encerrado.
+            if not self._atexit_registrado:
+                atexit.register(self.parar)
+                self._atexit_registrado = True
+
+            logging.info("Fila de escrita iniciada.")
+
+    def parar(self, timeout: Optional[float] = None):
+        """
+        Para a thread de gravação depois de gravar todas as leituras pendentes.
+        :param timeout: Tempo máximo de espera, em segundos. None para esperar até o fim.
+        """
+        with self._lock:
+            thread = self._thread
+
+            if thread is None:
+                return
+
+            self._parar.set()
+            thread.join(timeout)
+
+            if thread.is_alive():
+                logging.warning(f"Fila de escrita não terminou em {timeout}s. Leituras pendentes: {self.pendentes()}")
+                return
+
+            self._thread = None
+            logging.info("Fila de escrita finalizada.")
+
+    def enfileirar(self, linhas: list[dict]):
+        """
+        Enfileira as linhas de uma requisição para gravação.
+        :param linhas: Linhas com sensor_id, data_leitura e valor.
+        :raises FilaCheiaError: Se a fila estiver cheia.
+        """
+        if not linhas:
+            return
+
+        if self._thread is None or not self._thread.is_alive():
+            self.iniciar()
+
+        try:
+            self._fila.put_nowait(linhas)
+        except queue.Full:
+            with self._lock_contadores:
+                self.requisicoes_rejeitadas += 1
+            raise FilaCheiaError("Fila de escrita cheia.")
+
+        with self._lock_contadores:
+            self.leituras_enfileiradas += len(linhas)
+
+    def pendentes(self) -> int:
+        """
+        Retorna a quantidade de requisições aguardando gravação.
+        """
+        return self._fila.qsize()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Retorna os contadores da fila.
+        """
+        with self._lock_contadores:
+            return {
+                'requisicoes_pendentes': self.pendentes(),
+                'tamanho_max': self._fila.maxsize,
+                'leituras_enfileiradas': self.leituras_enfileiradas,
+                'leituras_gravadas': self.leituras_gravadas,
+                'leituras_descartadas': self.leituras_descartadas,
+                'requisicoes_rejeitadas': self.requisicoes_rejeitadas,
+                'lotes_gravados': self.lotes_gravados,
+            }
+
+    def _proximo_lote(self) -> list[dict]:
+        """
+        Aguarda a primeira requisição e junta as seguintes até atingir o tamanho do lote ou o tempo máximo.
+        O lote nunca passa de tamanho_lote leituras: a requisição que não cabe inteira é dividida e o restante
+        começa o próximo lote.
+        """
+        lote, self._sobra = self._sobra, []
+
+        if not lote:
+            try:
+                lote = list(self._fila.get(timeout=self.intervalo_max))
+            except queue.Empty:
+                return []
+
+        limite = time.monotonic() + self.intervalo_max
+
+        while len(lote) < self.tamanho_lote:
+            restante = limite - time.monotonic()
+
+            try:
+                # ao parar, não espera: apenas esvazia a fila
+                linhas = self._fila.get_nowait() if self._parar.is_set() or restante <= 0 else self._fila.get(timeout=restante)
+            except queue.Empty:
+                break
+
+            lote.extend(linhas)
+
+        self._sobra = lote[self.tamanho_lote:]
+
+        return lote[:self.tamanho_lote]
+
+    def _inserir(self, lote: list[dict]):
+        """
+        Grava o lote em uma única transação e atualiza os contadores.
+        """
+        Database.executar_escrita(lambda session: inserir_leituras(session, lote))
+
+        with self._lock_contadores:
+            self.leituras_gravadas += len(lote)
+            self.lotes_gravados += 1
+
+    def _gravar(self, lote: list[dict]):
+        """
+        Grava o lote em uma única transação, tentando novamente em caso de erro.
+        Se todas as tentativas falharem, o lote é dividido para descartar apenas as leituras com erro.
+        """
+        for tentativa in range(1, self.tentativas + 1):
+            try:
+                self._inserir(lote)
+                return
+
+            except Exception as e:
+                logging.error(f"Erro ao gravar lote de {len(lote)} leituras (tentativa {tentativa}/{self.tentativas}): {e}")
+                time.sleep(0.1 * tentativa)
+
+        self._gravar_dividindo(lote)
+
+    def _gravar_dividindo(self, lote: list[dict]):
+        """
+        Divide o lote ao meio e grava cada metade, recursivamente, até isolar as leituras que não podem ser gravadas.
+        Cada leitura com erro custa cerca de log2(tamanho do lote) transações a mais.
+        """
+        if len(lote) == 1:
+            with self._lock_contadores:
+                self.leituras_descartadas += 1
+            logging.critical(f"Leitura descartada após {self.tentativas} tentativas: {lote[0]}")
+            return
+
+        meio = len(lote) // 2
+
+        for metade in (lote[:meio], lote[meio:]):
+            try:
+                self._inserir(metade)
+            except Exception as e:
+                logging.error(f"Erro ao gravar {len(metade)} leituras do lote dividido: {e}")
+                self._gravar_dividindo(metade)
+
+    def _executar(self):
+        while not self._parar.is_set() or not self._fila.empty() or self._sobra:
+            lote = self._proximo_lote()
+
+            if lote:
+                self._gravar(lote)
+
+
+fila_escrita = FilaEscrita()
@@ -0,0 +1,236 @@
+from datetime import datetime
+from typing import Any, Generator, Iterable, Optional
+
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import insert, select, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.database.models.leitura_agregada import LeituraSensorAgregada
+from src.database.models.sensor import Sensor, TipoSensor, TipoSensorEnum, LeituraSensor
+from src.database.tipos_base.cache import CacheLRU
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.versao_tabelas import versao_tabelas
+from src.settings import CACHE_SENSORES_TAMANHO_MAX, CACHE_SENSORES_TTL
+
+# Campo do payload enviado pelo ESP32 que corresponde a cada tipo de sensor
+CAMPO_POR_TIPO: dict[TipoSensorEnum, str] = {
+    TipoSensorEnum.LUX: 'lux',
+    TipoSensorEnum.TEMPERATURA: 'temperatura',
+    TipoSensorEnum.VIBRACAO: 'vibracao_media',
+}
+
+# O Oracle não aceita mais de 1000 elementos em uma cláusula IN
+_MAX_ITENS_IN = 1000
+
+# Cache serial -> sensores do dispositivo, compartilhado pelas rotas /init e /leitura.
+# Seriais não cadastrados também são armazenados (tupla vazia). O cache inteiro é descartado quando as tabelas
+# SENSOR ou TIPO_SENSOR são alteradas neste processo (ver sincronizar_cache_sensores).
+cache_sensores = CacheLRU(tamanho_max=CACHE_SENSORES_TAMANHO_MAX, ttl=CACHE_SENSORES_TTL)
+
+# Tabelas das quais o cache_sensores depende e suas versões quando o cache foi validado pela última vez
+_TABELAS_SENSORES = (Sensor.__tablename__, TipoSensor.__tablename__)
+_versao_cache_sensores = versao_tabelas.versoes(_TABELAS_SENSORES)
+
+
+def sincronizar_cache_sensores() -> tuple[int, ...]:
+    """
+    Descarta o cache_sensores se as tabelas SENSOR ou TIPO_SENSOR foram alteradas desde a última verificação
+    (ex.: sensores cadastrados ou excluídos pelo CRUD do dashboard ou pela importação de dados).
+    Escritas feitas por outro processo não alteram as versões e só são vistas após o CACHE_SENSORES_TTL.
+    :return: Versões das tabelas, para serem comparadas antes de guardar no cache o resultado de uma consulta.
+    """
+    global _versao_cache_sensores
+
+    versao = versao_tabelas.versoes(_TABELAS_SENSORES)
+    if versao != _versao_cache_sensores:
+        cache_sensores.invalidar()
+        _versao_cache_sensores = versao
+
+    return versao
+
+
+def _guardar_sensores(encontrados: dict, novos: dict[str, list[tuple[int, TipoSensorEnum]]], versao: tuple[int, ...]):
+    """
+    Adiciona os sensores consultados no banco ao resultado e ao cache_sensores.
+    Se as tabelas foram alteradas durante a consulta, o resultado é usado mas não é guardado no cache.
+    """
+    guardar = versao_tabelas.versoes(_TABELAS_SENSORES) == versao
+
+    for serial, sensores in novos.items():
+        sensores = tuple(sensores)
+        if guardar:
+            cache_sensores.set(serial, sensores)
+        encontrados[serial] = sensores
+
+
+def _consultas_sensores(seriais: list[str]) -> Generator[Select, None, None]:
+    """
+    Gera as consultas serial -> (Sensor.id, TipoSensor.tipo), uma para cada bloco de 1000 seriais.
+    """
+    for inicio in range(0, len(seriais), _MAX_ITENS_IN):
+        bloco = seriais[inicio:inicio + _MAX_ITENS_IN]
+        yield select(Sensor.cod_serial, Sensor.id, TipoSensor.tipo).join(
+            TipoSensor, Sensor.tipo_sensor_id == TipoSensor.id
+        ).where(
+            Sensor.cod_serial.in_(bloco)
+        )
+
+
+def resolver_sensores(session: Session, seriais: Iterable[str]) -> dict[str, list[tuple[int, TipoSensorEnum]]]:
+    """
+    Busca os sensores e seus tipos para cada serial com uma única consulta (por bloco de 1000 seriais).
+    :param session: Sessão do SQLAlchemy.
+    :param seriais: Códigos seriais dos dispositivos.
+    :return: Dicionário serial -> lista de (Sensor.id, TipoSensorEnum). Seriais não cadastrados ficam com lista vazia.
+    """
+    resultado: dict[str, list[tuple[int, TipoSensorEnum]]] = {serial: [] for serial in seriais}
+
+    for query in _consultas_sensores(list(resultado)):
+        for serial, sensor_id, tipo in session.execute(query):
+            resultado[serial].append((sensor_id, tipo))
+
+    return resultado
+
+
+async def resolver_sensores_async(session: AsyncSession, seriais: Iterable[str]) -> dict[str, list[tuple[int, TipoSensorEnum]]]:
+    """
+    Versão assíncrona do resolver_sensores.
+    """
+    resultado: dict[str, list[tuple[int, TipoSensorEnum]]] = {serial: [] for serial in seriais}
+
+    for query in _consultas_sensores(list(resultado)):
+        for serial, sensor_id, tipo in await session.execute(query):
+            resultado[serial].append((sensor_id, tipo))
+
+    return resultado
+
+
+def resolver_sensores_em_cache(session: Session, seriais: Iterable[str]) -> dict[str, tuple[tuple[int, TipoSensorEnum], ...]]:
+    """
+    Resolve os sensores de cada serial usando o cache_sensores.
+    Apenas os seriais ausentes no cache são buscados no banco, em uma única consulta.
+    :param session: Sessão do SQLAlchemy.
+    :param seriais: Códigos seriais dos dispositivos.
+    :return: Dicionário serial -> tupla de (Sensor.id, TipoSensorEnum).
+    """
+    versao = sincronizar_cache_sensores()
+    encontrados, ausentes = cache_sensores.get_many(set(seriais))
+
+    if ausentes:
+        _guardar_sensores(encontrados, resolver_sensores(session, ausentes), versao)
+
+    return encontrados
+
+
+async def resolver_sensores_em_cache_async(seriais: Iterable[str]) -> dict[str, tuple[tuple[int, TipoSensorEnum], ...]]:
+    """
+    Versão assíncrona do resolver_sensores_em_cache.
+    Quando todos os seriais estão no cache, não abre sessão nem acessa o banco.
+    Se o engine assíncrono não foi inicializado, a consulta síncrona roda no threadpool para não bloquear o event loop.
+    :param seriais: Códigos seriais dos dispositivos.
+    :return: Dicionário serial -> tupla de (Sensor.id, TipoSensorEnum).
+    """
+    versao = sincronizar_cache_sensores()
+    encontrados, ausentes = cache_sensores.get_many(set(seriais))
+
+    if not ausentes:
+        return encontrados
+
+    if Database.has_async():
+        async with Database.get_async_session() as session:
+            novos = await resolver_sensores_async(session, ausentes)
+    else:
+        def _resolver():
+            with Database.get_session() as session:
+                return resolver_sensores(session, ausentes)
+
+        novos = await run_in_threadpool(_resolver)
+
+    _guardar_sensores(encontrados, novos, versao)
+
+    return encontrados
+
+
+def invalidar_cache_sensores(serial: Optional[str] = None):
+    """
+    Invalida o cache de sensores de um serial ou, se nenhum for informado, o cache inteiro.
+    As escritas feitas neste processo já são detectadas pelo sincronizar_cache_sensores; use para invalidar
+    imediatamente, ou após escritas feitas por outro processo.
+    """
+    if serial is None:
+        cache_sensores.invalidar()
+    else:
+        cache_sensores.invalidar(serial)
+
+
+def montar_leituras(leitura: Any, sensores: Iterable[tuple[int, TipoSensorEnum]], data_leitura: datetime) -> list[dict]:
+    """
+    Converte o payload de um dispositivo nas linhas a serem inseridas em LEITURA_SENSOR.
+    :param leitura: Payload recebido (precisa ter os atributos listados em CAMPO_POR_TIPO).
+    :param sensores: Sensores do dispositivo, como retornado por resolver_sensores.
+    :param data_leitura: Data atribuída às leituras.
+    :return: Lista de dicionários prontos para o insert em massa.
+    """
+    linhas = []
+
+    for sensor_id, tipo in sensores:
+        campo = CAMPO_POR_TIPO.get(tipo)
+        valor = getattr(leitura, campo, None) if campo is not None else None
+
+        if valor is None:
+            continue
+
+        linhas.append({
+            'sensor_id': sensor_id,
+            'data_leitura': data_leitura,
+            'valor': valor,
+        })
+
+    return linhas
+
+
+def inserir_leituras(session: Session, linhas: list[dict]) -> int:
+    """
+    Insere as leituras com um único executemany (insert em massa do SQLAlchemy Core) e atualiza os
+    agregados por minuto/hora/dia na mesma transação. O commit fica a cargo de quem chamou.
+    :param session: Sessão do SQLAlchemy.
+    :param linhas: Linhas com sensor_id, data_leitura e valor.
+    :return: Quantidade de linhas inseridas.
+    """
+    if not linhas:
+        return 0
+
+    session.execute(insert(LeituraSensor.__table__), linhas)
+    LeituraSensorAgregada.atualizar_com_leituras(session, linhas)
+    return len(linhas)
+
+
+def _montar_todas(leituras: list[Any], sensores_por_serial: dict, data_leitura: datetime) -> tuple[list[dict], list[str]]:
+    linhas = []
+    for leitura in leituras:
+        linhas.extend(montar_leituras(leitura, sensores_por_serial[leitura.serial], data_leitura))
+
+    nao_encontrados = [serial for serial, sensores in sensores_por_serial.items() if not sensores]
+
+    return linhas, nao_encontrados
+
+
+def preparar_leituras(session: Session, leituras: list[Any], data_leitura: datetime) -> tuple[list[dict], list[str]]:
+    """
+    Resolve os sensores dos dispositivos e monta as linhas a serem inseridas em LEITURA_SENSOR.
+    :param session: Sessão do SQLAlchemy, usada apenas para os seriais ausentes no cache.
+    :param leituras: Payloads recebidos dos dispositivos.
+    :param data_leitura: Data atribuída às leituras.
+    :return: Tupla (linhas para o insert em massa, seriais não encontrados).
+    """
+    sensores_por_serial = resolver_sensores_em_cache(session, {leitura.serial for leitura in leituras})
+    return _montar_todas(leituras, sensores_por_serial, data_leitura)
+
+
+async def preparar_leituras_async(leituras: list[Any], data_leitura: datetime) -> tuple[list[dict], list[str]]:
+    """
+    Versão assíncrona do preparar_leituras, usada pelas rotas async da API.
+    """
+    sensores_por_serial = await resolver_sensores_em_cache_async({leitura.serial for leitura in leituras})
+    return _montar_todas(leituras, sensores_por_serial, data_leitura)
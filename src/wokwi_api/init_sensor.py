@@ -1,7 +1,9 @@
 from pydantic import BaseModel
 from src.database.models.sensor import Sensor, TipoSensor, TipoSensorEnum
 from src.database.tipos_base.database import Database
+from src.wokwi_api.ingestao import cache_sensores, invalidar_cache_sensores, sincronizar_cache_sensores
 from fastapi import APIRouter
+from sqlalchemy.orm import Session
 
 init_router = APIRouter()
 
@@ -9,47 +11,64 @@ init_router = APIRouter()
 class InitSensorRequest(BaseModel):
     serial: str
 
-@init_router.post('/')
-def init_sensor(request:InitSensorRequest):
+
+def _cadastrar_sensores(session: Session, serial: str):
     """
-    Cadastra o Sensor na base de dados
+    Cadastra um sensor de cada tipo para o serial, criando os tipos de sensor que ainda não existirem.
+    Executado por Database.executar_escrita, que faz o commit.
     """
+    for tipo in TipoSensorEnum:
+        # Verifica se o tipo de sensor já existe
+        tipo_sensor = session.query(TipoSensor).filter(
+            TipoSensor.tipo == tipo.value
+        ).first()
+
+        if not tipo_sensor:
+            # Cria o tipo de sensor se não existir
+            tipo_sensor = TipoSensor(tipo=tipo.value, nome=str(tipo))
+            session.add(tipo_sensor)
+            session.flush()
+
 
-    with Database.get_session() as session:
+        old_sensor = session.query(Sensor).filter(
+            Sensor.cod_serial == serial,
+            Sensor.tipo_sensor_id == tipo_sensor.id
+        ).first()
 
-        for tipo in TipoSensorEnum:
-            # Verifica se o tipo de sensor já existe
-            tipo_sensor = session.query(TipoSensor).filter(
-                TipoSensor.tipo == tipo.value
-            ).first()
+        if old_sensor:
+            # Se já existir um sensor com o mesmo serial e tipo, passa para o próximo tipo
+            continue
 
-            if not tipo_sensor:
-                # Cria o tipo de sensor se não existir
-                tipo_sensor = TipoSensor(tipo=tipo.value, nome=str(tipo))
-                session.add(tipo_sensor)
-                session.commit()
+        # Cria o novo sensor com o tipo encontrado ou criado
+        new_sensor = Sensor(
+            nome=f"Sensor {tipo.value} - {serial}",
+            cod_serial=serial,
+            tipo_sensor_id=tipo_sensor.id,
+            descricao="Sensor cadastrado via API",
+        )
 
+        session.add(new_sensor)
 
-            old_sensor = session.query(Sensor).filter(
-                Sensor.cod_serial == request.serial,
-                Sensor.tipo_sensor_id == tipo_sensor.id
-            ).first()
 
-            if old_sensor:
-                # Se já existir um sensor com o mesmo serial e tipo, retorna uma mensagem
-                continue
+@init_router.post('/')
+def init_sensor(request:InitSensorRequest):
+    """
+    Cadastra o Sensor na base de dados
+    """
 
-            # Cria o novo sensor com o tipo encontrado ou criado
-            new_sensor = Sensor(
-                nome=f"Sensor {tipo.value} - {request.serial}",
-                cod_serial=request.serial,
-                tipo_sensor_id=tipo_sensor.id,
-                descricao="Sensor cadastrado via API",
-            )
+    # Se o dispositivo já está no cache com todos os tipos cadastrados, não há nada a fazer.
+    # O cache é sincronizado antes, para que sensores excluídos desde a última consulta não sejam considerados.
+    sincronizar_cache_sensores()
+    sensores = cache_sensores.get(request.serial)
+    if sensores and {tipo for _, tipo in sensores} == set(TipoSensorEnum):
+        return {
+            "status": "success",
+            "message": "Sensor cadastrado com sucesso."
+        }
 
-            session.add(new_sensor)
+    Database.executar_escrita(lambda session: _cadastrar_sensores(session, request.serial))
 
-        session.commit()
+    invalidar_cache_sensores(request.serial)
 
     return {
         "status": "success",
@@ -1,8 +1,10 @@
-from pydantic import BaseModel
-from src.database.tipos_base.database import Database
-from src.database.models.sensor import Sensor, TipoSensor, TipoSensorEnum, LeituraSensor
 from datetime import datetime
+from pydantic import BaseModel
+from src.wokwi_api.fila_escrita import fila_escrita, FilaCheiaError
+from src.wokwi_api.ingestao import preparar_leituras_async
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+import logging
 
 receber_router = APIRouter()
 
@@ -17,59 +19,77 @@ class LeituraRequest(BaseModel):
     acelerometro_z: float or None # não utilizado
 
 
-@receber_router.post("/")
-def receber_leitura(request: LeituraRequest):
+class LoteLeituraRequest(BaseModel):
+    leituras: list[LeituraRequest]
+
+
+async def _enfileirar(leituras: list[LeituraRequest]) -> tuple[int, list[str]]:
+    """
+    Valida as leituras, resolve os sensores e enfileira as linhas para gravação em background.
+    :return: Tupla (quantidade de leituras enfileiradas, seriais não encontrados).
+    :raises FilaCheiaError: Se a fila de escrita estiver cheia.
+    """
+    linhas, nao_encontrados = await preparar_leituras_async(leituras, datetime.now())
+
+    fila_escrita.enfileirar(linhas)
+
+    return len(linhas), nao_encontrados
+
+
+def _fila_cheia() -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": "1"},
+        content={
+            "status": "error",
+            "message": "Servidor sobrecarregado, tente novamente em instantes."
+        }
+    )
+
 
-    print(f"Recebendo leitura para o sensor com serial: {request.serial}", request)
+@receber_router.post("/", status_code=202)
+async def receber_leitura(request: LeituraRequest):
 
-    now = datetime.now()
+    logging.debug(f"Recebendo leitura para o sensor com serial: {request.serial} {request}")
 
-    with Database.get_session() as session:
-        sensores = session.query(Sensor).filter(Sensor.cod_serial == request.serial).filter().all()
+    try:
+        total, nao_encontrados = await _enfileirar([request])
+    except FilaCheiaError:
+        return _fila_cheia()
 
-        if not sensores:
-            return {
+    if nao_encontrados:
+        # Mantém a resposta original da rota (200 com status "error"), esperada pelos dispositivos já em campo
+        return JSONResponse(
+            status_code=200,
+            content={
                 "status": "error",
                 "message": f"Sensor com serial '{request.serial}' não encontrado."
             }
+        )
 
-        for sensor in sensores:
-
-            tipo = session.query(TipoSensor).filter(TipoSensor.id == sensor.tipo_sensor_id).first()
-
-            if not tipo:
-                return {
-                    "status": "error",
-                    "message": f"Tipo de sensor para o sensor com serial '{request.serial}' não encontrado."
-                }
-
-            if tipo.tipo == TipoSensorEnum.LUX and request.lux is not None:
-                nova_leitura = LeituraSensor(
-                    sensor_id=sensor.id,
-                    data_leitura=now,
-                    valor= request.lux
-                )
-            elif tipo.tipo == TipoSensorEnum.TEMPERATURA and request.temperatura is not None:
-                nova_leitura = LeituraSensor(
-                    sensor_id=sensor.id,
-                    data_leitura=now,
-                    valor=request.temperatura
-                )
-            elif tipo.tipo == TipoSensorEnum.VIBRACAO and request.vibracao_media is not None:
-                nova_leitura = LeituraSensor(
-                    sensor_id=sensor.id,
-                    data_leitura=now,
-                    valor=request.vibracao_media
-                )
-            else:
-                continue
-            session.add(nova_leitura)
-            print('Nova leitura salva:', nova_leitura)
-
-        session.commit()
+    return {
+        "status": "success",
+        "message": "Leitura recebida com sucesso",
+    }
 
 
+@receber_router.post("/lote", status_code=202)
+async def receber_lote_leituras(request: LoteLeituraRequest):
+    """
+    Recebe leituras de vários dispositivos em uma única requisição.
+    As leituras são gravadas em background com um insert em massa.
+    """
+
+    logging.debug(f"Recebendo lote com {len(request.leituras)} leituras")
+
+    try:
+        total, nao_encontrados = await _enfileirar(request.leituras)
+    except FilaCheiaError:
+        return _fila_cheia()
+
     return {
         "status": "success",
-        "message": "Leitura recebida com sucesso",
+        "message": f"{total} leituras recebidas com sucesso",
+        "leituras_recebidas": total,
+        "seriais_nao_encontrados": nao_encontrados,
     }
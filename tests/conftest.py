@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import insert, select
+
+from src.database.models.sensor import Sensor, TipoSensor, TipoSensorEnum
+from src.database.tipos_base.cache_consultas import cache_consultas
+from src.database.tipos_base.contagem import contador_registros
+from src.database.tipos_base.database import Database
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """
+    Banco SQLite vazio em uma pasta temporária, com todas as tabelas criadas.
+    """
+    Database.init_sqlite(str(tmp_path / "teste.db"), modo_performance=False)
+    Database.create_all_tables()
+    cache_consultas.invalidar()
+    contador_registros.invalidar()
+
+    yield Database
+
+    cache_consultas.invalidar()
+    contador_registros.invalidar()
+    Database.engine.dispose()
+
+
+@pytest.fixture
+def sensores(banco) -> list[int]:
+    """
+    Três sensores de luminosidade.
+    :return: IDs dos sensores.
+    """
+    with Database.get_session() as session:
+        tipo = TipoSensor(nome="Luminosidade", tipo=TipoSensorEnum.LUX)
+        session.add(tipo)
+        session.flush()
+
+        session.execute(insert(Sensor), [
+            {'tipo_sensor_id': tipo.id, 'nome': f"Sensor {i}", 'cod_serial': f"S{i}", 'descricao': None}
+            for i in range(3)
+        ])
+        session.commit()
+
+        return list(session.scalars(select(Sensor.id).order_by(Sensor.id)))
@@ -0,0 +1,152 @@
+from datetime import date, datetime
+
+from sqlalchemy import insert, text
+
+from src.database.models.sensor import LeituraSensor, Sensor, TipoSensorEnum
+from src.database.tipos_base.cache import CacheLRU
+from src.database.tipos_base.cache_consultas import CacheConsultas, cache_consultas, em_cache
+from src.database.tipos_base.database import Database
+
+
+@em_cache('LEITURA_SENSOR')
+def _leituras(sensor_id: int) -> list[LeituraSensor]:
+    return LeituraSensor.get_leituras_for_sensor(sensor_id, date(2025, 1, 1), date(2025, 1, 2))
+
+
+@em_cache('SENSOR', 'TIPO_SENSOR')
+def _sensores() -> list[Sensor]:
+    return Sensor.filter_by_tiposensor(TipoSensorEnum.LUX)
+
+
+def _gravar_leitura(sensor_id: int, valor: float):
+    Database.executar_escrita(lambda session: session.execute(
+        insert(LeituraSensor), [{'sensor_id': sensor_id, 'data_leitura': datetime(2025, 1, 1, 12), 'valor': valor}]
+    ))
+
+
+def test_filter_dataframe_e_invalidado_apos_uma_escrita(sensores):
+    filtros = [LeituraSensor.sensor_id == sensores[0]]
+
+    assert LeituraSensor.filter_dataframe(filters=filtros).empty
+
+    _gravar_leitura(sensores[0], 1.0)
+
+    assert list(LeituraSensor.filter_dataframe(filters=filtros)['valor']) == [1.0]
+
+
+def test_em_cache_e_invalidado_apos_uma_escrita_pelo_orm(sensores):
+    assert [str(sensor) for sensor in _sensores()] == [f"{id} - Sensor {i}" for i, id in enumerate(sensores)]
+
+    with Database.get_session() as session:
+        sensor = session.get(Sensor, sensores[0])
+        sensor.nome = "Renomeado"
+        session.commit()
+
+    assert str(_sensores()[0]) == f"{sensores[0]} - Renomeado"
+
+
+def test_escrita_em_outra_tabela_mantem_o_resultado(sensores):
+    _gravar_leitura(sensores[0], 1.0)
+    primeiro = _sensores()
+
+    _gravar_leitura(sensores[0], 2.0)
+    hits = cache_consultas.stats()['hits']
+
+    # uma cópia nova, montada a partir do cache, e não uma nova consulta
+    segundo = _sensores()
+    assert cache_consultas.stats()['hits'] == hits + 1
+    assert segundo is not primeiro
+    assert [sensor.nome for sensor in segundo] == [sensor.nome for sensor in primeiro]
+
+
+def test_alterar_o_resultado_nao_altera_o_cache(sensores):
+    _gravar_leitura(sensores[0], 1.0)
+
+    leituras = _leituras(sensores[0])
+    leituras[0].valor = 99.0
+    leituras.append(None)
+
+    em_cache_depois = _leituras(sensores[0])
+    assert [leitura.valor for leitura in em_cache_depois] == [1.0]
+
+    em_cache_depois[0].valor = 50.0
+    assert [leitura.valor for leitura in _leituras(sensores[0])] == [1.0]
+
+
+def test_resultados_sao_descartados_pelo_total_de_linhas():
+    cache = CacheConsultas(tamanho_max=100, ttl=None, max_linhas=5, max_linhas_total=10)
+    consultas = []
+
+    def obter(chave, linhas):
+        return cache.obter(chave, ['TABELA'], lambda: consultas.append(chave) or [chave] * linhas)
+
+    for chave in range(3):
+        obter(chave, 4)
+
+    # 12 linhas não cabem no limite de 10: o resultado menos usado (0) foi descartado
+    assert cache.stats()['peso'] == 8
+    obter(1, 4)
+    obter(2, 4)
+    obter(0, 4)
+    assert consultas == [0, 1, 2, 0]
+
+    # resultados maiores que max_linhas não são guardados
+    obter('grande', 6)
+    obter('grande', 6)
+    assert consultas[-2:] == ['grande', 'grande']
+    assert cache.stats()['peso'] <= 10
+
+
+def test_cache_lru_limita_pelo_peso_e_pela_quantidade():
+    cache = CacheLRU(tamanho_max=3, peso_max=10)
+
+    cache.set('a', 1, peso=4)
+    cache.set('b', 2, peso=4)
+    cache.get('a')
+    cache.set('c', 3, peso=4)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['peso'] == 8
+
+    # substituir uma chave não soma o peso antigo
+    cache.set('a', 10, peso=1)
+    assert cache.stats()['peso'] == 5
+
+    cache.set('d', 4)
+    cache.set('e', 5)
+    assert len(cache) == 3
+
+    cache.invalidar()
+    assert cache.stats()['peso'] == 0
+
+
+def test_upsert_em_texto_invalida_o_cache(sensores, monkeypatch):
+    import src.database.tipos_base.upsert as modulo_upsert
+
+    # simula o MERGE do Oracle: um comando em texto, que os eventos do engine não identificam como escrita
+    def upsert_em_texto(connection, tabela, lote, chaves, atribuicoes):
+        connection.execute(
+            text("INSERT INTO LEITURA_SENSOR (sensor_id, data_leitura, valor) VALUES (:sensor_id, :data_leitura, :valor)"),
+            lote,
+        )
+
+    monkeypatch.setattr(modulo_upsert, '_upsert_sqlite', upsert_em_texto)
+    filtros = [LeituraSensor.sensor_id == sensores[0]]
+
+    assert LeituraSensor.filter_dataframe(filters=filtros).empty
+
+    lote = [{'sensor_id': sensores[0], 'data_leitura': datetime(2025, 1, 1), 'valor': 3.0}]
+    Database.executar_escrita(lambda session: modulo_upsert.upsert(session.connection(), LeituraSensor.__table__, lote))
+
+    assert list(LeituraSensor.filter_dataframe(filters=filtros)['valor']) == [3.0]
+
+
+def test_resultado_do_cache_pode_ser_alterado_e_removido(sensores):
+    _sensores()
+    primeiro, segundo = _sensores()[:2]
+
+    primeiro.update(nome="Atualizado")
+    segundo.delete()
+
+    assert [sensor.nome for sensor in _sensores()] == ["Atualizado", "Sensor 2"]
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import select
+
+from src.database.models.sensor import Sensor, TipoSensorEnum
+from src.database.tipos_base.database import Database
+from src.wokwi_api.ingestao import cache_sensores, resolver_sensores_em_cache
+from src.wokwi_api.init_sensor import InitSensorRequest, init_sensor
+
+
+@pytest.fixture(autouse=True)
+def _cache_vazio():
+    cache_sensores.invalidar()
+    yield
+    cache_sensores.invalidar()
+
+
+def _resolver(serial: str):
+    with Database.get_session() as session:
+        return resolver_sensores_em_cache(session, [serial])[serial]
+
+
+def test_sensor_criado_pelo_crud_invalida_serial_em_cache(sensores):
+    tipo_sensor_id = Sensor.get_from_id(sensores[0]).tipo_sensor_id
+
+    assert _resolver("NOVO") == ()
+
+    sensor = Sensor(tipo_sensor_id=tipo_sensor_id, nome="Novo", cod_serial="NOVO").save()
+
+    assert _resolver("NOVO") == ((sensor.id, TipoSensorEnum.LUX),)
+
+
+def test_sensor_excluido_pelo_crud_sai_do_cache(sensores):
+    assert _resolver("S0") == ((sensores[0], TipoSensorEnum.LUX),)
+
+    Sensor.get_from_id(sensores[0]).delete()
+
+    assert _resolver("S0") == ()
+
+
+def test_init_recadastra_sensor_excluido_apos_cache(banco):
+    init_sensor(InitSensorRequest(serial="ESP"))
+    assert {tipo for _, tipo in _resolver("ESP")} == set(TipoSensorEnum)
+
+    with Database.get_session() as session:
+        sensor_id = session.scalars(select(Sensor.id).where(Sensor.cod_serial == "ESP")).first()
+    Sensor.get_from_id(sensor_id).delete()
+
+    init_sensor(InitSensorRequest(serial="ESP"))
+
+    with Database.get_session() as session:
+        ids = set(session.scalars(select(Sensor.id).where(Sensor.cod_serial == "ESP")))
+
+    assert len(ids) == len(TipoSensorEnum)
+    assert {sensor_id for sensor_id, _ in _resolver("ESP")} == ids
@@ -0,0 +1,53 @@
+import asyncio
+
+from sqlalchemy import text
+
+from src.database.models.sensor import TipoSensor, TipoSensorEnum
+from src.database.tipos_base.database import Database
+
+
+def _executar(corrotina):
+    """
+    Executa a corrotina e descarta o engine assíncrono ao final, para não deixar threads do aiosqlite abertas.
+    """
+    async def _com_dispose():
+        try:
+            return await corrotina
+        finally:
+            await Database.async_engine.dispose()
+
+    return asyncio.run(_com_dispose())
+
+
+def test_save_async_passa_pelo_executar_escrita(banco, tmp_path, monkeypatch):
+    Database.init_sqlite_async(str(tmp_path / "teste.db"), modo_performance=False)
+
+    chamadas = []
+    executar_escrita = Database.executar_escrita
+
+    def _espiao(operacao):
+        chamadas.append(operacao)
+        return executar_escrita(operacao)
+
+    monkeypatch.setattr(Database, 'executar_escrita', staticmethod(_espiao))
+
+    tipo = _executar(TipoSensor(nome="Luminosidade", tipo=TipoSensorEnum.LUX).save_async())
+
+    assert len(chamadas) == 1
+    assert tipo.id is not None
+    assert TipoSensor.get_from_id(tipo.id).nome == "Luminosidade"
+
+
+def test_engine_async_recebe_pragmas_do_modo_performance(banco, tmp_path):
+    Database.init_sqlite_async(str(tmp_path / "teste.db"), modo_performance=True)
+
+    async def _pragmas():
+        async with Database.get_async_session() as session:
+            journal = (await session.execute(text("PRAGMA journal_mode"))).scalar()
+            timeout = (await session.execute(text("PRAGMA busy_timeout"))).scalar()
+            return journal, timeout
+
+    journal, timeout = _executar(_pragmas())
+
+    assert journal == 'wal'
+    assert timeout > 0
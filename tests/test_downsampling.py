@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.plots.downsampling import MetodoDownsampling, indices_lttb, indices_min_max, reduzir_dataframe
+
+
+def _serie(tamanho: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.uniform(0.5, 1.5, tamanho))
+    y = np.sin(x / 50) + rng.normal(0, 0.2, tamanho)
+    return x, y
+
+
+def _lttb_referencia(x: np.ndarray, y: np.ndarray, max_pontos: int) -> list[int]:
+    # implementação direta do algoritmo, ponto a ponto, com os mesmos intervalos da versão vetorizada
+    limites = np.linspace(1, len(x) - 1, max_pontos - 1).astype(np.int64)
+    indices = [0]
+
+    for i in range(max_pontos - 2):
+        if i + 2 < len(limites):
+            proximo = range(limites[i + 1], limites[i + 2])
+            media_x = sum(x[j] for j in proximo) / len(proximo)
+            media_y = sum(y[j] for j in proximo) / len(proximo)
+        else:
+            media_x, media_y = x[-1], y[-1]
+
+        a = indices[-1]
+        areas = [
+            abs((x[a] - media_x) * (y[j] - y[a]) - (x[a] - x[j]) * (media_y - y[a]))
+            for j in range(limites[i], limites[i + 1])
+        ]
+        indices.append(int(limites[i] + np.argmax(areas)))
+
+    return indices + [len(x) - 1]
+
+
+@pytest.mark.parametrize("selecionar", [indices_lttb, indices_min_max])
+def test_series_pequenas_nao_sao_reduzidas(selecionar):
+    x, y = _serie(50)
+    np.testing.assert_array_equal(selecionar(x, y, 50), np.arange(50))
+
+
+@pytest.mark.parametrize("tamanho, max_pontos", [(1000, 100), (1001, 37), (5000, 3)])
+def test_lttb_igual_a_implementacao_de_referencia(tamanho, max_pontos):
+    x, y = _serie(tamanho)
+    indices = indices_lttb(x, y, max_pontos)
+
+    assert len(indices) == max_pontos
+    assert indices[0] == 0 and indices[-1] == tamanho - 1
+    assert np.all(np.diff(indices) > 0)
+    assert indices.tolist() == _lttb_referencia(x, y, max_pontos)
+
+
+def test_lttb_mantem_um_pico_isolado():
+    x = np.arange(10000, dtype=np.float64)
+    y = np.zeros(10000)
+    y[6543] = 10.0
+
+    assert 6543 in indices_lttb(x, y, 200)
+
+
+def test_min_max_mantem_os_extremos_de_cada_intervalo():
+    x, y = _serie(10000, seed=1)
+    max_pontos = 200
+    indices = indices_min_max(x, y, max_pontos)
+
+    assert len(indices) <= max_pontos
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+
+    # os intervalos são de mesma largura no eixo X, como as colunas de pixels do gráfico
+    quantidade = max_pontos // 2 - 1
+    intervalo = np.minimum(np.floor((x - x[0]) / (x[-1] - x[0]) * quantidade), quantidade - 1)
+    grupos = pd.Series(y).groupby(intervalo)
+    selecionados = set(indices.tolist())
+
+    assert set(grupos.idxmin()) <= selecionados
+    assert set(grupos.idxmax()) <= selecionados
+
+
+def test_min_max_com_valores_repetidos_mantem_um_ponto_por_extremo():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.ones(1000)
+
+    indices = indices_min_max(x, y, 100)
+
+    assert len(indices) <= 100
+    assert indices[0] == 0 and indices[-1] == 999
+
+
+@pytest.mark.parametrize("metodo", list(MetodoDownsampling))
+def test_reduzir_dataframe_ordena_e_ignora_nulos(metodo):
+    x, y = _serie(3000, seed=2)
+    y[::7] = np.nan
+    dataframe = pd.DataFrame({
+        'data_leitura': pd.to_datetime(x, unit='s'),
+        'valor': y,
+    }).sample(frac=1, random_state=0)
+
+    reduzido = reduzir_dataframe(dataframe, 'data_leitura', ['valor'], 300, metodo)
+
+    assert len(reduzido) <= 300
+    assert reduzido['data_leitura'].is_monotonic_increasing
+    assert reduzido['valor'].notna().all()
+
+    if metodo == MetodoDownsampling.MIN_MAX:
+        assert reduzido['valor'].max() == np.nanmax(y)
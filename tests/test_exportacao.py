@@ -0,0 +1,51 @@
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from src.database.export_import_db import FormatoExportacao, create_database_zip_export, ler_database_zip
+from src.database.models.sensor import LeituraSensor
+from src.database.tipos_base.database import Database
+
+
+@pytest.fixture
+def leituras(sensores):
+    inicio = datetime(2025, 1, 1)
+
+    with Database.get_session() as session:
+        session.execute(insert(LeituraSensor), [
+            {'sensor_id': sensores[i % 3], 'data_leitura': inicio + timedelta(seconds=i), 'valor': i / 10}
+            for i in range(5000)
+        ])
+        session.commit()
+
+
+def _conteudo(caminho: str) -> list[tuple[str, int, bytes]]:
+    with zipfile.ZipFile(caminho) as zip_file:
+        assert zip_file.testzip() is None
+        return [(info.filename, info.compress_type, zip_file.read(info)) for info in zip_file.infolist()]
+
+
+@pytest.mark.parametrize("formato", list(FormatoExportacao))
+def test_exportacao_paralela_igual_a_sequencial(leituras, tmp_path, formato):
+    sequencial = create_database_zip_export(str(tmp_path / "sequencial.zip"), formato, workers=1)
+    paralela = create_database_zip_export(str(tmp_path / "paralela.zip"), formato, workers=3)
+
+    assert _conteudo(paralela) == _conteudo(sequencial)
+
+    with open(paralela, "rb") as arquivo:
+        tabelas = {model.__tablename__: dataframe for model, dataframe in ler_database_zip(arquivo)}
+
+    assert len(tabelas['LEITURA_SENSOR']) == 5000
+    assert len(tabelas['SENSOR']) == 3
+
+
+def test_entradas_csv_sao_comprimidas(leituras, tmp_path):
+    caminho = create_database_zip_export(str(tmp_path / "exportacao.zip"), FormatoExportacao.CSV, workers=3)
+
+    with zipfile.ZipFile(caminho) as zip_file:
+        info = zip_file.getinfo("LEITURA_SENSOR.csv")
+
+    assert info.compress_type == zipfile.ZIP_DEFLATED
+    assert info.compress_size < info.file_size
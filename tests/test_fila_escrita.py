@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from src.database.models.sensor import LeituraSensor
+from src.database.tipos_base.database import Database
+from src.wokwi_api.fila_escrita import FilaEscrita
+
+
+def _requisicoes(sensor_id: int, quantidade: int, linhas_por_requisicao: int) -> list[list[dict]]:
+    inicio = datetime(2025, 1, 1)
+    return [
+        [
+            {'sensor_id': sensor_id, 'data_leitura': inicio + timedelta(seconds=r * linhas_por_requisicao + i), 'valor': float(i)}
+            for i in range(linhas_por_requisicao)
+        ]
+        for r in range(quantidade)
+    ]
+
+
+def test_proximo_lote_divide_as_requisicoes_maiores_que_o_lote():
+    fila = FilaEscrita(tamanho_lote=10, intervalo_max=0.01)
+    requisicoes = _requisicoes(1, 5, 7)
+
+    # sem iniciar a thread: o lote é montado direto da fila
+    for linhas in requisicoes:
+        fila._fila.put_nowait(linhas)
+
+    lotes = []
+    while lote := fila._proximo_lote():
+        lotes.append(lote)
+
+    assert [len(lote) for lote in lotes] == [10, 10, 10, 5]
+    assert [linha for lote in lotes for linha in lote] == [linha for linhas in requisicoes for linha in linhas]
+
+
+def test_parar_grava_todas_as_leituras_pendentes(sensores):
+    fila = FilaEscrita(tamanho_lote=10, intervalo_max=0.05)
+
+    for linhas in _requisicoes(sensores[0], 6, 7):
+        fila.enfileirar(linhas)
+
+    fila.parar()
+
+    with Database.get_session() as session:
+        assert session.scalar(select(func.count()).select_from(LeituraSensor)) == 42
+
+    stats = fila.stats()
+    assert stats['leituras_gravadas'] == stats['leituras_enfileiradas'] == 42
+    assert stats['lotes_gravados'] >= 5
+
+
+def test_lote_com_erro_descarta_apenas_as_leituras_invalidas(sensores):
+    fila = FilaEscrita(tamanho_lote=100, tentativas=1)
+    lote = [linha for linhas in _requisicoes(sensores[0], 4, 10) for linha in linhas]
+    lote[7]['valor'] = None
+    lote[31]['valor'] = None
+
+    fila._gravar(lote)
+
+    with Database.get_session() as session:
+        assert session.scalar(select(func.count()).select_from(LeituraSensor)) == 38
+
+    stats = fila.stats()
+    assert stats['leituras_gravadas'] == 38
+    assert stats['leituras_descartadas'] == 2
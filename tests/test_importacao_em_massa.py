@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import func, select
+
+from src.database.importacao_em_massa import importar_em_massa
+from src.database.models.leitura_agregada import LeituraSensorAgregada, ResolucaoEnum
+from src.database.models.sensor import LeituraSensor, Sensor, TipoSensor, TipoSensorEnum
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.upsert import _upsert_generico, upsert
+
+
+def _tabelas(quantidade_leituras: int, valor: float = 1.0) -> list[tuple[type, pd.DataFrame]]:
+    # no formato da exportação: enums pelo valor e datas como texto
+    tipos = pd.DataFrame({'id': [1, 2], 'nome': ["Luminosidade", "Temperatura"], 'tipo': ["L", "T"]})
+    sensores = pd.DataFrame({
+        'id': [1, 2],
+        'tipo_sensor_id': [1, 2],
+        'nome': ["Sensor 1", "Sensor 2"],
+        'cod_serial': ["S1", "S2"],
+        'descricao': [None, "Estufa"],
+    })
+    leituras = pd.DataFrame({
+        'id': range(1, quantidade_leituras + 1),
+        'sensor_id': [1 + i % 2 for i in range(quantidade_leituras)],
+        'data_leitura': [(datetime(2025, 1, 1) + timedelta(minutes=i)).isoformat(sep=' ') for i in range(quantidade_leituras)],
+        'valor': [valor + i for i in range(quantidade_leituras)],
+    })
+
+    return [(TipoSensor, tipos), (Sensor, sensores), (LeituraSensor, leituras)]
+
+
+def _contar(model) -> int:
+    with Database.get_session() as session:
+        return session.scalar(select(func.count()).select_from(model))
+
+
+def test_importa_em_lotes(banco):
+    resultados = importar_em_massa(_tabelas(25), tamanho_lote=10)
+
+    assert [(resultado.tabela, resultado.linhas) for resultado in resultados] == [
+        ('TIPO_SENSOR', 2), ('SENSOR', 2), ('LEITURA_SENSOR', 25),
+    ]
+    assert _contar(LeituraSensor) == 25
+    assert Sensor.get_from_id(2).descricao == "Estufa"
+    assert TipoSensor.get_from_id(1).tipo == TipoSensorEnum.LUX
+
+
+def test_reimportar_atualiza_os_registros_existentes(banco):
+    importar_em_massa(_tabelas(20))
+
+    # mesmos ids com valores novos, e 10 leituras a mais
+    tabelas = _tabelas(30, valor=100.0)
+    tabelas[1][1].loc[0, 'nome'] = "Renomeado"
+    importar_em_massa(tabelas, tamanho_lote=7)
+
+    assert _contar(Sensor) == 2
+    assert _contar(LeituraSensor) == 30
+    assert Sensor.get_from_id(1).nome == "Renomeado"
+
+    valores = LeituraSensor.as_dataframe_all()['valor']
+    assert valores.tolist() == [100.0 + i for i in range(30)]
+
+
+def test_registros_sem_id_sao_inseridos(banco):
+    importar_em_massa(_tabelas(5))
+
+    leituras = pd.DataFrame({'sensor_id': [1, 1], 'data_leitura': ["2025-02-01 00:00:00"] * 2, 'valor': [1.0, 2.0]})
+    importar_em_massa([(LeituraSensor, leituras)])
+
+    assert _contar(LeituraSensor) == 7
+
+
+@pytest.mark.parametrize("gravar", [upsert, _upsert_generico], ids=["nativo", "generico"])
+def test_upsert_com_atribuicoes_combina_com_a_linha_atual(banco, gravar):
+    importar_em_massa(_tabelas(0))
+    tabela = LeituraSensorAgregada.__table__
+    inicio = datetime(2025, 1, 1)
+
+    def agregado(quantidade: int, minimo: float) -> dict:
+        return {'sensor_id': 1, 'resolucao': ResolucaoEnum.DIA, 'inicio': inicio, 'quantidade': quantidade,
+                'minimo': minimo, 'maximo': minimo, 'soma': minimo * quantidade, 'soma_quadrados': 0.0,
+                'primeiro_valor': minimo, 'data_primeiro': inicio, 'ultimo_valor': minimo, 'data_ultimo': inicio}
+
+    atribuicoes = {
+        'quantidade': lambda atual, novo: atual['quantidade'] + novo['quantidade'],
+        'minimo': lambda atual, novo: func.min(atual['minimo'], novo['minimo']),
+    }
+    chaves = ['sensor_id', 'resolucao', 'inicio']
+
+    for lote in ([agregado(2, 5.0)], [agregado(3, 1.0)], [agregado(4, 9.0)]):
+        Database.executar_escrita(lambda session: gravar(session.connection(), tabela, lote, chaves, atribuicoes))
+
+    with Database.get_session() as session:
+        linhas = session.execute(select(tabela.c.quantidade, tabela.c.minimo, tabela.c.maximo)).all()
+
+    # o maximo não está nas atribuições, então fica o valor da primeira inserção
+    assert linhas == [(9, 1.0, 5.0)]
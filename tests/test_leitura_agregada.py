@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from src.database.models.leitura_agregada import LeituraSensorAgregada, ResolucaoEnum
+from src.database.models.sensor import LeituraSensor
+from src.database.tipos_base.database import Database
+
+INICIO = datetime(2025, 1, 1, 23)
+FIM = INICIO + timedelta(hours=3)
+
+
+def _leituras(sensor_ids: list[int], quantidade: int, seed: int = 0) -> list[dict]:
+    # intervalos irregulares, atravessando a virada do dia, com valores repetidos nos extremos
+    rng = np.random.default_rng(seed)
+    segundos = np.sort(rng.integers(0, int((FIM - INICIO).total_seconds()), quantidade))
+    valores = rng.integers(0, 20, quantidade) / 2
+
+    return [
+        {'sensor_id': sensor_ids[i % len(sensor_ids)], 'data_leitura': INICIO + timedelta(seconds=int(s)), 'valor': float(v)}
+        for i, (s, v) in enumerate(zip(segundos, valores))
+    ]
+
+
+def _agregados() -> pd.DataFrame:
+    colunas = ['sensor_id', 'resolucao', 'inicio', 'quantidade', 'minimo', 'maximo', 'soma', 'soma_quadrados',
+               'primeiro_valor', 'data_primeiro', 'ultimo_valor', 'data_ultimo']
+    tabela = LeituraSensorAgregada.__table__
+
+    with Database.get_session() as session:
+        linhas = session.execute(select(*[tabela.c[coluna] for coluna in colunas])).all()
+
+    return pd.DataFrame(linhas, columns=colunas).sort_values(['sensor_id', 'resolucao', 'inicio']).reset_index(drop=True)
+
+
+def _recalculados(sensor_ids: list[int]) -> pd.DataFrame:
+    with Database.get_session() as session:
+        # um dia antes do início cobre as leituras movidas para o dia anterior
+        LeituraSensorAgregada.recalcular(session, sensor_ids, INICIO - timedelta(days=1), FIM)
+        session.commit()
+
+    return _agregados()
+
+
+def test_atualizar_com_leituras_em_lotes_igual_ao_recalculo(sensores):
+    leituras = _leituras(sensores, 600)
+
+    # os lotes chegam fora de ordem, então o primeiro e o último valor dependem das datas, e não da ordem de chegada
+    with LeituraSensorAgregada.sem_recalculo(), Database.get_session() as session:
+        session.execute(LeituraSensor.__table__.insert(), leituras)
+
+        for lote in (leituras[300:], leituras[:100], leituras[100:300]):
+            LeituraSensorAgregada.atualizar_com_leituras(session, lote)
+
+        session.commit()
+
+    incremental = _agregados()
+
+    assert not incremental.empty
+    pd.testing.assert_frame_equal(incremental, _recalculados(sensores))
+
+
+def test_leituras_gravadas_pelo_orm_atualizam_os_agregados(sensores):
+    leituras = _leituras(sensores, 200, seed=1)
+
+    with Database.get_session() as session:
+        for inicio in range(0, len(leituras), 50):
+            session.add_all([LeituraSensor(**leitura) for leitura in leituras[inicio:inicio + 50]])
+            session.commit()
+
+    pd.testing.assert_frame_equal(_agregados(), _recalculados(sensores))
+
+
+def test_alteracao_e_remocao_recalculam_os_agregados(sensores):
+    with Database.get_session() as session:
+        session.add_all([LeituraSensor(**leitura) for leitura in _leituras(sensores, 200, seed=2)])
+        session.commit()
+
+        leituras = session.scalars(select(LeituraSensor).order_by(LeituraSensor.id)).all()
+
+        # muda o valor, o sensor e o dia de algumas leituras e remove outras
+        leituras[0].valor = 100.0
+        leituras[1].sensor_id = sensores[-1]
+        leituras[2].data_leitura = leituras[2].data_leitura - timedelta(days=1)
+        session.delete(leituras[-1])
+        session.commit()
+
+    agregados = _agregados()
+    dia = agregados[agregados['resolucao'] == ResolucaoEnum.DIA]
+
+    assert dia['quantidade'].sum() == 199
+    assert dia['maximo'].max() == 100.0
+    pd.testing.assert_frame_equal(agregados, _recalculados(sensores))
+
+
+def test_consultar_serie_sem_sensores_retorna_none(sensores):
+    assert LeituraSensorAgregada.consultar_serie([], INICIO, FIM, max_pontos=10) is None
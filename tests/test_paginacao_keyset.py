@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+from src.database.models.sensor import LeituraSensor, Sensor
+from src.database.tipos_base.database import Database
+from src.database.tipos_base.model_mixins.serialization import CursorPaginacao
+
+# descrições com empates e nulos; a ordem dentro de cada valor é dada pelo id
+DESCRICOES = [None, 'a', 'b', None, 'a', 'c', None, 'b', 'a', None, 'c', 'b', None]
+
+ORDENACOES = [
+    [Sensor.descricao.asc()],
+    [Sensor.descricao.desc()],
+    [Sensor.descricao.asc().nulls_last()],
+    [Sensor.descricao.desc().nulls_first()],
+    [Sensor.descricao.nulls_last()],
+    [Sensor.descricao.desc(), Sensor.id.asc()],
+]
+
+
+@pytest.fixture
+def sensores_com_descricao(sensores):
+    tipo_sensor_id = Sensor.get_from_id(sensores[0]).tipo_sensor_id
+
+    with Database.get_session() as session:
+        session.execute(insert(Sensor), [
+            {'tipo_sensor_id': tipo_sensor_id, 'nome': f"Descrição {i}", 'cod_serial': f"D{i}", 'descricao': descricao}
+            for i, descricao in enumerate(DESCRICOES)
+        ])
+        session.commit()
+
+
+def _descricoes() -> dict[int, str | None]:
+    with Database.get_session() as session:
+        return dict(session.execute(select(Sensor.id, Sensor.descricao)).all())
+
+
+def _ordem_esperada(order_by) -> list[int]:
+    # ordena em Python: nulos como os menores valores, a menos que nulls_first/nulls_last diga o contrário
+    sql = str(order_by[0].compile())
+    desc = 'DESC' in sql
+    nulos_primeiro = 'NULLS FIRST' in sql or ('NULLS LAST' not in sql and not desc)
+    desempate_desc = desc if len(order_by) == 1 else False
+
+    linhas = [(descricao, id) for id, descricao in _descricoes().items()]
+    valores = sorted({descricao for descricao, _ in linhas if descricao is not None}, reverse=desc)
+    grupos = [None] + valores if nulos_primeiro else valores + [None]
+
+    return [
+        id
+        for grupo in grupos
+        for _, id in sorted((linha for linha in linhas if linha[0] == grupo), key=lambda linha: linha[1], reverse=desempate_desc)
+    ]
+
+
+@pytest.mark.parametrize("order_by", ORDENACOES, ids=lambda order_by: str(order_by[0].compile()))
+def test_paginas_percorrem_todas_as_linhas_nos_dois_sentidos(sensores_com_descricao, order_by):
+    esperado = _ordem_esperada(order_by)
+
+    # próximas páginas
+    paginas = [Sensor.pagina_dataframe(order_by=order_by, limit=3)]
+    while paginas[-1].tem_proxima:
+        paginas.append(Sensor.pagina_dataframe(order_by=order_by, limit=3, cursor=CursorPaginacao(paginas[-1].ultima_chave)))
+
+    assert [id for pagina in paginas for id in pagina.dataframe['id']] == esperado
+    assert not paginas[0].tem_anterior
+
+    # páginas anteriores, a partir da última
+    pagina = paginas[-1]
+    ids = list(pagina.dataframe['id'])
+    while pagina.tem_anterior:
+        pagina = Sensor.pagina_dataframe(order_by=order_by, limit=3, cursor=CursorPaginacao(pagina.primeira_chave, anterior=True))
+        ids = list(pagina.dataframe['id']) + ids
+
+    assert ids == esperado
+
+
+@pytest.mark.parametrize("order_by", ORDENACOES[:4], ids=lambda order_by: str(order_by[0].compile()))
+@pytest.mark.parametrize("valor", [None, 'b'])
+def test_salto_inclusivo_para_um_valor(sensores_com_descricao, order_by, valor):
+    esperado = _ordem_esperada(order_by)
+    descricoes = _descricoes()
+    inicio = next(i for i, id in enumerate(esperado) if descricoes[id] == valor)
+
+    pagina = Sensor.pagina_dataframe(order_by=order_by, limit=3, cursor=CursorPaginacao((valor,), inclusivo=True))
+
+    assert list(pagina.dataframe['id']) == esperado[inicio:inicio + 3]
+    assert pagina.tem_anterior == (inicio > 0)
+
+
+def test_salto_para_uma_data_calcula_a_pagina_anterior(sensores):
+    inicio = datetime(2025, 1, 1)
+
+    with Database.get_session() as session:
+        session.execute(insert(LeituraSensor), [
+            {'sensor_id': sensores[0], 'data_leitura': inicio + timedelta(minutes=i // 2), 'valor': float(i)}
+            for i in range(20)
+        ])
+        session.commit()
+
+    order_by = [LeituraSensor.data_leitura.desc(), LeituraSensor.id.desc()]
+
+    def saltar(data: datetime):
+        return LeituraSensor.pagina_dataframe(order_by=order_by, limit=4, cursor=CursorPaginacao((data,), inclusivo=True))
+
+    # depois da leitura mais recente: é a primeira página
+    pagina = saltar(inicio + timedelta(days=1))
+    assert not pagina.tem_anterior and pagina.tem_proxima
+    assert list(pagina.dataframe['valor']) == [19.0, 18.0, 17.0, 16.0]
+
+    # no meio: as duas leituras do instante (empate na data) começam a página
+    pagina = saltar(inicio + timedelta(minutes=5))
+    assert pagina.tem_anterior and pagina.tem_proxima
+    assert list(pagina.dataframe['valor']) == [11.0, 10.0, 9.0, 8.0]
+
+    # antes da leitura mais antiga: página vazia, com as leituras antes dela
+    pagina = saltar(inicio - timedelta(days=1))
+    assert pagina.dataframe.empty
+    assert pagina.tem_anterior and not pagina.tem_proxima
@@ -0,0 +1,32 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.wokwi_api.ingestao import cache_sensores
+from src.wokwi_api.receber_leitura import receber_router
+
+
+@pytest.fixture
+def cliente(banco):
+    cache_sensores.invalidar()
+
+    app = FastAPI()
+    app.include_router(receber_router, prefix='/leitura')
+
+    with TestClient(app) as cliente:
+        yield cliente
+
+    cache_sensores.invalidar()
+
+
+def test_serial_desconhecido_mantem_resposta_original(cliente):
+    resposta = cliente.post('/leitura/', json={
+        'serial': "DESCONHECIDO", 'lux': 1.0, 'temperatura': 2.0, 'vibracao_media': 3.0,
+        'acelerometro_x': 0.0, 'acelerometro_y': 0.0, 'acelerometro_z': 0.0,
+    })
+
+    assert resposta.status_code == 200
+    assert resposta.json() == {
+        "status": "error",
+        "message": "Sensor com serial 'DESCONHECIDO' não encontrado.",
+    }